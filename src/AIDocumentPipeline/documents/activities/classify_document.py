@@ -4,12 +4,19 @@ This module provides the blueprint for an Azure Function activity that classifie
 """
 
 from __future__ import annotations
-from pydantic import Field
-from documents.services.document_data_classifier import DocumentDataClassifier, DocumentDataClassifierOptions, ClassificationConfidenceResult
-from documents.models.document_classification import ClassificationDefinitions
+from pydantic import BaseModel, Field
+from typing import Optional
+from documents.services.document_data_classifier import AsyncDocumentDataClassifier, DocumentDataClassifierOptions
+from documents.models.document_classification import Classification, ClassificationDefinitions
+from documents.services.document_page_cache import DocumentPageCache, default_page_cache
+from documents.services.page_image_encoder import PageImageEncodingOptions, default_page_encoder
+from shared.clients.ai_client_registry import default_client_registry
+from shared.clients.rate_limiter import RateLimitOptions, default_rate_limiter
+from shared.clients.deployment_router import OpenAIDeployment, default_deployment_router
 from shared.workflows.base_request import BaseRequest
 from shared.workflows.validation_result import ValidationResult
-from storage.services.azure_storage_client_factory import AzureStorageClientFactory
+from documents.services.document_result_cache import create_document_result_cache
+from storage.services.azure_storage_client_factory import AzureStorageClientFactory, AsyncAzureStorageClientFactory
 import shared.identity as identity
 from shared import app_settings
 import azure.durable_functions as df
@@ -17,17 +24,30 @@ import logging
 
 name = "ClassifyDocument"
 bp = df.Blueprint()
-storage_factory = AzureStorageClientFactory(identity.default_credential)
-document_classifier = DocumentDataClassifier(identity.default_credential)
+storage_factory = AsyncAzureStorageClientFactory(
+    identity.default_async_credential)
+result_cache = create_document_result_cache(
+    app_settings.document_result_cache_store,
+    app_settings.document_result_cache_location,
+    AzureStorageClientFactory(identity.default_credential),
+    app_settings.azure_storage_account)
+openai_deployments = OpenAIDeployment.from_settings(
+    app_settings.azure_openai_chat_deployments,
+    app_settings.azure_openai_endpoint,
+    app_settings.azure_openai_chat_deployment)
+document_classifier = AsyncDocumentDataClassifier(
+    identity.default_async_credential, result_cache=result_cache)
 
 
 @bp.function_name(name)
 @bp.activity_trigger(input_name="input", activity=name)
-def run(input: Request) -> ClassificationConfidenceResult:
+async def run(input: Request) -> Result:
     """Classifies a document using Azure OpenAI.
 
+    The full classification result is stored in the output blob, so only the page classifications and overall confidence are returned to the orchestration.
+
     :param input: The request containing the container name and blob name of the document.
-    :return: The classifications if successful; otherwise, None.
+    :return: The summary of the classifications if successful; otherwise, None.
     """
 
     validation_result = input.validate()
@@ -35,10 +55,10 @@ def run(input: Request) -> ClassificationConfidenceResult:
         logging.error(f"Invalid input: {validation_result.to_str()}")
         return None
 
-    blob_content = storage_factory.get_blob_content(
+    blob_content, blob_etag = await storage_factory.get_blob_content_and_etag(
         app_settings.azure_storage_account, input.container_name, input.blob_name)
 
-    data = document_classifier.from_bytes(
+    data = await document_classifier.from_bytes(
         blob_content,
         DocumentDataClassifierOptions(
             classification_definitions=input.classification_definitions,
@@ -46,10 +66,41 @@ def run(input: Request) -> ClassificationConfidenceResult:
             deployment_name=app_settings.azure_openai_chat_deployment,
             max_tokens=4096,
             temperature=0.1,
-            top_p=0.1
-        ))
+            top_p=0.1,
+            image_encoding=PageImageEncodingOptions.thumbnail(),
+            rate_limit=RateLimitOptions(
+                requests_per_minute=app_settings.azure_openai_chat_requests_per_minute,
+                tokens_per_minute=app_settings.azure_openai_chat_tokens_per_minute),
+            deployments=openai_deployments
+        ),
+        cache_key=DocumentPageCache.create_key(input.container_name, input.blob_name, blob_etag))
+
+    logging.debug(
+        f"Document page cache stats: {default_page_cache.get_stats()}")
+    logging.debug(
+        f"Document page encoder stats: {default_page_encoder.get_stats()}")
+    logging.debug(
+        f"AI client registry stats: {default_client_registry.get_stats()}")
+    logging.debug(
+        f"Azure OpenAI rate limiter stats: {default_rate_limiter.get_stats()}")
+    logging.debug(
+        f"Azure OpenAI deployment router stats: {default_deployment_router.get_stats()}")
+    if result_cache:
+        logging.debug(
+            f"Document result cache stats: {result_cache.get_stats()}")
+
+    if not data or not data.data:
+        return None
 
-    return data
+    if input.output_blob_name:
+        await storage_factory.upload_blob_content(
+            app_settings.azure_storage_account, input.container_name, input.output_blob_name,
+            data.model_dump_json().encode("utf-8"))
+
+    return Result(
+        blob_name=input.output_blob_name,
+        overall_confidence=data.overall_confidence,
+        page_classifications=data.data.page_classifications)
 
 
 class Request(BaseRequest):
@@ -61,6 +112,9 @@ class Request(BaseRequest):
         description="The name of the document blob to classify.")
     classification_definitions: ClassificationDefinitions = Field(
         description="The classification definitions to use for classifying the document.")
+    output_blob_name: Optional[str] = Field(
+        default=None,
+        description="The optional name of the blob in the same container to store the classification result in.")
 
     def validate(self) -> ValidationResult:
         result = ValidationResult()
@@ -95,3 +149,27 @@ class Request(BaseRequest):
         https://learn.microsoft.com/en-us/azure/azure-functions/durable/durable-functions-serialization-and-persistence?tabs=python
         """
         return Request.model_validate_json(json_str)
+
+
+class Result(BaseModel):
+    """Defines the result payload for the `ClassifyDocument` activity."""
+
+    blob_name: Optional[str] = Field(
+        default=None,
+        description="The name of the blob the classification result was stored in, if an output blob was requested.")
+    overall_confidence: float = Field(
+        description="The overall confidence score of the classifications.")
+    page_classifications: list[Classification] = Field(
+        description="The classifications of the document's page ranges.")
+
+    @staticmethod
+    def to_json(obj: Result) -> str:
+        """Converts the object instance to a JSON string. Required for serialization in Azure Functions when passing the result between functions."""
+
+        return obj.model_dump_json()
+
+    @staticmethod
+    def from_json(json_str: str) -> Result:
+        """Converts a JSON string to the object instance. Required for deserialization in Azure Functions when receiving the result from another function."""
+
+        return Result.model_validate_json(json_str)
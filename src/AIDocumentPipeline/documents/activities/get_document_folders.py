@@ -5,37 +5,73 @@ This module provides the blueprint for an Azure Function activity that retrieves
 
 from __future__ import annotations
 from documents.models.document_batch_request import DocumentBatchRequest
-from documents.models.document_folder import DocumentFolders, DocumentFolder
-from storage.services.azure_storage_client_factory import AzureStorageClientFactory
+from documents.models.document_folder import DocumentFolders, DocumentFolder, SOURCE_ETAG_METADATA_KEY
+from storage.services.azure_storage_client_factory import AsyncAzureStorageClientFactory
 import shared.identity as identity
 from shared import app_settings
 import azure.durable_functions as df
 import logging
+import re
 
 name = "GetDocumentFolders"
 bp = df.Blueprint()
-storage_factory = AzureStorageClientFactory(identity.default_credential)
+document_filter = re.compile(r".*\.(pdf)$")
+storage_factory = AsyncAzureStorageClientFactory(
+    identity.default_async_credential)
 
 
 @bp.function_name(name)
 @bp.activity_trigger(input_name="input", activity=name)
-def run(input: DocumentBatchRequest) -> DocumentFolders:
-    """Retrieves the document folders from a container in Azure Blob Storage.
+async def run(input: DocumentBatchRequest) -> DocumentFolders:
+    """Retrieves a page of the document folders from a container in Azure Blob Storage.
 
-    :param input: The document batch request containing the container name.
-    :return: A list of `DocumentFolder` objects representing the document folders in the container.
+    In incremental mode, documents whose classification output is stamped with the current ETag of the document are skipped, and folders without new or changed documents are omitted.
+
+    :param input: The document batch request containing the container name, the page size, the per-folder concurrency, the continuation token of the page, and the incremental flag.
+    :return: A list of `DocumentFolder` objects representing the document folders in the page, and the continuation token of the next page.
     """
 
-    grouped_documents = storage_factory.get_blobs_by_folder_at_root(
-        app_settings.azure_storage_account, input.container_name, ".*\\.(pdf)$")
+    # In incremental mode, the metadata of the output blobs listed alongside the documents is compared with the current ETag of each document.
+    folders, continuation_token = await storage_factory.get_blob_properties_by_folder_page(
+        app_settings.azure_storage_account,
+        input.container_name,
+        continuation_token=input.continuation_token,
+        page_size=input.max_folders_per_instance,
+        include=["metadata"] if input.incremental else None)
 
-    logging.info(
-        f"Found {len(grouped_documents)} folders in {input.container_name}")
+    result = DocumentFolders(folders=[], continuation_token=continuation_token)
+    skipped_documents = 0
+
+    for folder_name, blobs in folders.items():
+        output_etags = {
+            blob.name: blob.metadata.get(SOURCE_ETAG_METADATA_KEY)
+            for blob in blobs if blob.metadata
+        }
+
+        folder = DocumentFolder(container_name=input.container_name,
+                                name=folder_name,
+                                document_file_names=[],
+                                max_concurrency=input.max_concurrency)
+
+        for blob in blobs:
+            if not document_filter.match(blob.name):
+                continue
 
-    result = DocumentFolders(folders=[])
-    for folder_name, document_file_names in grouped_documents.items():
-        result.folders.append(DocumentFolder(container_name=input.container_name,
-                                             name=folder_name,
-                                             document_file_names=document_file_names))
+            # Blobs in the root of the container are grouped by the folder name.
+            document_file_name = blob.name if blob.name.find('/') != -1 else f"{input.container_name}/{blob.name}"
+            etag = blob.etag.strip('"')
+
+            if input.incremental and output_etags.get(f"{document_file_name}.Classification.json") == etag:
+                skipped_documents += 1
+                continue
+
+            folder.document_file_names.append(document_file_name)
+            folder.document_etags[document_file_name] = etag
+
+        if folder.document_file_names:
+            result.folders.append(folder)
+
+    logging.info(
+        f"Found {len(result.folders)} folders to process in {input.container_name}, skipped {skipped_documents} up-to-date documents, more folders remaining: {continuation_token is not None}")
 
     return result
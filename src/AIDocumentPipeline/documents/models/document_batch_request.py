@@ -1,8 +1,55 @@
 from __future__ import annotations
-from pydantic import Field
+from typing import Optional
+from pydantic import BaseModel, Field
 from shared.workflows.validation_result import ValidationResult
+from shared.workflows.workflow_result import WorkflowResult
 from shared.workflows.base_request import BaseRequest
 
+# The maximum number of failed folder names carried in the summary, keeping the input of the orchestration small when many folders fail.
+MAX_FAILED_FOLDER_NAMES = 100
+
+
+class DocumentBatchSummary(BaseModel):
+    """Defines the running summary of a batch of document folders, carried across the instances of the orchestration when it continues as new."""
+
+    processed_folders: int = Field(
+        default=0,
+        description='The number of document folders processed so far.'
+    )
+    failed_folders: int = Field(
+        default=0,
+        description='The number of processed document folders with errors.'
+    )
+    failed_folder_names: list[str] = Field(
+        default_factory=list,
+        description=f'The names of the first {MAX_FAILED_FOLDER_NAMES} document folders with errors.'
+    )
+
+    def add_folder_result(self, folder_name: str, result: WorkflowResult):
+        """Adds the result of a processed document folder to the summary.
+
+        :param folder_name: The name of the document folder.
+        :param result: The `WorkflowResult` of processing the document folder.
+        """
+
+        self.processed_folders += 1
+
+        if not result.is_valid:
+            self.failed_folders += 1
+            if len(self.failed_folder_names) < MAX_FAILED_FOLDER_NAMES:
+                self.failed_folder_names.append(folder_name)
+
+    def to_str(self) -> str:
+        """Returns a string representation of the summary."""
+
+        summary = f"Processed {self.processed_folders} folders, {self.failed_folders} with errors."
+        if self.failed_folder_names:
+            summary += f" Failed folders: {', '.join(self.failed_folder_names)}"
+            if self.failed_folders > len(self.failed_folder_names):
+                summary += f" and {self.failed_folders - len(self.failed_folder_names)} more"
+            summary += "."
+        return summary
+
 
 class DocumentBatchRequest(BaseRequest):
     """Defines a request to process a batch of documents in a Storage container."""
@@ -10,6 +57,30 @@ class DocumentBatchRequest(BaseRequest):
     container_name: str = Field(
         description='The name of the Azure Blob Storage container containing the document folders.'
     )
+    max_concurrent_folders: int = Field(
+        default=10,
+        description='The maximum number of document folders processed in parallel. Default is 10.'
+    )
+    max_concurrency: int = Field(
+        default=10,
+        description='The maximum number of activities run in parallel when processing the documents in each folder. Default is 10.'
+    )
+    max_folders_per_instance: int = Field(
+        default=100,
+        description='The maximum number of document folders listed and processed before the orchestration continues as new, bounding the size of its history. Default is 100.'
+    )
+    incremental: bool = Field(
+        default=False,
+        description='A flag indicating whether to only process new or changed documents, skipping documents whose outputs are stamped with the current ETag of the document. Default is `False`.'
+    )
+    continuation_token: Optional[str] = Field(
+        default=None,
+        description='The continuation token of the next page of document folders to process. Set when the orchestration continues as new.'
+    )
+    summary: DocumentBatchSummary = Field(
+        default_factory=DocumentBatchSummary,
+        description='The running summary of the document folders processed by previous instances of the orchestration. Set when the orchestration continues as new.'
+    )
 
     def validate(self) -> ValidationResult:
         result = ValidationResult()
@@ -17,6 +88,15 @@ class DocumentBatchRequest(BaseRequest):
         if not self.container_name:
             result.add_error("container_name is required")
 
+        if self.max_concurrent_folders < 1:
+            result.add_error("max_concurrent_folders must be greater than 0")
+
+        if self.max_concurrency < 1:
+            result.add_error("max_concurrency must be greater than 0")
+
+        if self.max_folders_per_instance < 1:
+            result.add_error("max_folders_per_instance must be greater than 0")
+
         return result
 
     @staticmethod
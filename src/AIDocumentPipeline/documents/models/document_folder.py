@@ -3,6 +3,9 @@ from typing import Optional
 from pydantic import BaseModel, Field
 from shared.workflows.validation_result import ValidationResult
 
+# The metadata key of output blobs that records the ETag of the document they were produced from.
+SOURCE_ETAG_METADATA_KEY = "source_etag"
+
 
 class DocumentFolder(BaseModel):
     """Defines a folder containing a set of documents."""
@@ -16,6 +19,14 @@ class DocumentFolder(BaseModel):
     document_file_names: Optional[list[str]] = Field(
         description='A list of the blob names of the document files in the container.'
     )
+    document_etags: dict[str, str] = Field(
+        default_factory=dict,
+        description='The ETags of the document files at the time they were listed, keyed by blob name. Stamped on the output blobs of fully processed documents.'
+    )
+    max_concurrency: int = Field(
+        default=10,
+        description='The maximum number of activities run in parallel when processing the documents in the folder. Default is 10.'
+    )
 
     @staticmethod
     def to_json(obj: DocumentFolder) -> str:
@@ -48,6 +59,9 @@ class DocumentFolder(BaseModel):
         if not self.document_file_names or len(self.document_file_names) == 0:
             result.add_error("document_file_names is required")
 
+        if self.max_concurrency < 1:
+            result.add_error("max_concurrency must be greater than 0")
+
         return result
 
 
@@ -58,6 +72,10 @@ class DocumentFolders(BaseModel):
         default_factory=list,
         description='A list of DocumentFolder objects.'
     )
+    continuation_token: Optional[str] = Field(
+        default=None,
+        description='The continuation token of the next page of document folders, or None if there are no more folders.'
+    )
 
     @staticmethod
     def to_json(obj: DocumentFolders) -> str:
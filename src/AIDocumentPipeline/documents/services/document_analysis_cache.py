@@ -0,0 +1,180 @@
+from __future__ import annotations
+from typing import Awaitable, Callable, Optional
+from collections import OrderedDict
+from azure.ai.documentintelligence.models import AnalyzeResult
+import asyncio
+import hashlib
+import threading
+
+
+class KeyLock:
+    """Defines the lock of a cache key and the number of callers holding or waiting for it."""
+
+    def __init__(self, lock: threading.Lock | asyncio.Lock):
+        self.lock = lock
+        self.waiters = 0
+
+
+class DocumentAnalysisCache:
+    """Defines an in-process cache of Azure AI Document Intelligence layout results for whole documents.
+
+    A document is analyzed once and the results for each page range are sliced from the cached result, so a document containing many invoices pays the polling latency and per-page cost of the analysis once.
+    Concurrent requests for the same document wait for the first analysis to complete rather than starting their own.
+    """
+
+    def __init__(self, max_documents: int = 16):
+        """Initializes a new instance of the DocumentAnalysisCache class.
+
+        :param max_documents: The maximum number of document analysis results to keep. The least recently used result is evicted when the limit is reached. Default is 16.
+        """
+
+        self.max_documents = max_documents
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict[str, AnalyzeResult] = OrderedDict()
+        self._key_locks: dict[str, KeyLock] = {}
+        self._async_key_locks: dict[str, KeyLock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def create_key(document_bytes: bytes, cache_key: Optional[str] = None) -> str:
+        """Creates a cache key for the analysis of a document.
+
+        :param document_bytes: The byte array content of the document, hashed if no cache key is provided.
+        :param cache_key: The optional cache key of the document, e.g., created using `DocumentPageCache.create_key`.
+        :return: The cache key for the analysis of the document.
+        """
+
+        return cache_key or hashlib.sha256(document_bytes).hexdigest()
+
+    def get_or_analyze(self, key: str, analyze: Callable[[], AnalyzeResult]) -> AnalyzeResult:
+        """Retrieves the cached analysis result of a document, analyzing the document if it is not cached.
+
+        :param key: The cache key created using `create_key`.
+        :param analyze: The function that analyzes the whole document.
+        :return: The analysis result of the whole document.
+        """
+
+        key_lock = self.__acquire_key_lock__(
+            self._key_locks, key, threading.Lock)
+
+        try:
+            with key_lock.lock:
+                result = self.__get_result__(key)
+                if result is None:
+                    result = analyze()
+                    self.__set_result__(key, result)
+        finally:
+            self.__release_key_lock__(self._key_locks, key, key_lock)
+
+        return result
+
+    async def get_or_analyze_async(self, key: str, analyze: Callable[[], Awaitable[AnalyzeResult]]) -> AnalyzeResult:
+        """Retrieves the cached analysis result of a document, analyzing the document if it is not cached.
+
+        :param key: The cache key created using `create_key`.
+        :param analyze: The coroutine function that analyzes the whole document.
+        :return: The analysis result of the whole document.
+        """
+
+        key_lock = self.__acquire_key_lock__(
+            self._async_key_locks, key, asyncio.Lock)
+
+        try:
+            async with key_lock.lock:
+                result = self.__get_result__(key)
+                if result is None:
+                    result = await analyze()
+                    self.__set_result__(key, result)
+        finally:
+            self.__release_key_lock__(self._async_key_locks, key, key_lock)
+
+        return result
+
+    def get_stats(self) -> dict[str, float]:
+        """Retrieves the hit and miss counters of the cache.
+
+        :return: A dictionary containing the number of cached documents, hits, misses, and the hit rate.
+        """
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "documents": len(self._results),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def __acquire_key_lock__(self, key_locks: dict[str, KeyLock], key: str, create_lock: Callable[[], threading.Lock | asyncio.Lock]) -> KeyLock:
+        # The lock of a key is shared by every caller that references it, so a caller arriving while the lock is held waits for the analysis in progress.
+        with self._lock:
+            key_lock = key_locks.get(key)
+            if key_lock is None:
+                key_lock = key_locks[key] = KeyLock(create_lock())
+            key_lock.waiters += 1
+            return key_lock
+
+    def __release_key_lock__(self, key_locks: dict[str, KeyLock], key: str, key_lock: KeyLock):
+        # The lock is only discarded once no caller holds or waits for it, whether the analysis succeeded or raised.
+        with self._lock:
+            key_lock.waiters -= 1
+            if key_lock.waiters == 0:
+                key_locks.pop(key, None)
+
+    def __get_result__(self, key: str) -> Optional[AnalyzeResult]:
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def __set_result__(self, key: str, result: AnalyzeResult):
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_documents:
+                self._results.popitem(last=False)
+
+
+def slice_analyze_result(analyze_result: AnalyzeResult, page_start: Optional[int], page_end: Optional[int]) -> AnalyzeResult:
+    """Creates an analysis result containing only the pages in a page range, and the markdown content of those pages.
+
+    The spans of the pages keep their offsets in the content of the whole document, so words and lines can still be matched within each page.
+
+    :param analyze_result: The analysis result of the whole document.
+    :param page_start: The optional 1-based starting page number of the range.
+    :param page_end: The optional 1-based ending page number of the range.
+    :return: The analysis result of the page range, or the original result if no page range is specified.
+    """
+
+    if not page_start or not page_end:
+        return analyze_result
+
+    pages = [
+        page for page in analyze_result.pages or []
+        if page_start <= page.page_number <= page_end
+    ]
+
+    spans = [span for page in pages for span in page.spans or []]
+    if spans:
+        content_start = min(span.offset for span in spans)
+        content_end = max(span.offset + span.length for span in spans)
+        content = analyze_result.content[content_start:content_end]
+    else:
+        content = ""
+
+    return AnalyzeResult(
+        api_version=analyze_result.api_version,
+        model_id=analyze_result.model_id,
+        string_index_type=analyze_result.string_index_type,
+        content_format=analyze_result.content_format,
+        content=content,
+        pages=pages)
+
+
+default_analysis_cache = DocumentAnalysisCache()
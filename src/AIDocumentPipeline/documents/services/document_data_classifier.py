@@ -1,8 +1,16 @@
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from pdf2image import convert_from_bytes
-import base64
-from openai import AzureOpenAI
-import io
+from azure.identity import DefaultAzureCredential
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
+from openai import AzureOpenAI, AsyncAzureOpenAI
+from openai.types.chat import ParsedChatCompletion
+import asyncio
+from typing import Optional
+from documents.services.document_page_renderer import DocumentPageRenderer, default_page_renderer, to_image_uri
+from documents.services.page_image_encoder import EncodedPageImage, PageImageEncoder, PageImageEncodingOptions, default_page_encoder
+from documents.services.document_result_cache import DocumentResultCache
+from shared.clients.ai_client_registry import AIClientRegistry, DEFAULT_OPENAI_API_VERSION, default_client_registry
+from shared.clients.completion_usage import estimate_completion_tokens, get_total_tokens
+from shared.clients.rate_limiter import RateLimitOptions
+from shared.clients.deployment_router import DeploymentRouter, OpenAIDeployment, default_deployment_router
 from documents.models.document_classification import Classifications, ClassificationDefinitions
 from shared.confidence.openai_confidence import evaluate_confidence as evaluate_confidence_openai
 from shared.confidence.confidence_result import ConfidenceResult, OVERALL_CONFIDENCE_KEY
@@ -13,7 +21,7 @@ ClassificationConfidenceResult = ConfidenceResult[Classifications | None]
 class DocumentDataClassifierOptions:
     """Defines the configuration options for classifying data from a document using Azure OpenAI."""
 
-    def __init__(self, classification_definitions: ClassificationDefinitions, endpoint: str, deployment_name: str, max_tokens: int = 4096, temperature: float = 0.1, top_p: float = 0.1):
+    def __init__(self, classification_definitions: ClassificationDefinitions, endpoint: str, deployment_name: str, max_tokens: int = 4096, temperature: float = 0.1, top_p: float = 0.1, image_encoding: Optional[PageImageEncodingOptions] = None, rate_limit: Optional[RateLimitOptions] = None, deployments: Optional[list[OpenAIDeployment]] = None):
         """Initializes a new instance of the DocumentDataClassifierOptions class.
 
         :param classification_definitions: The classification definitions to use for classifying data from the document.
@@ -22,6 +30,9 @@ class DocumentDataClassifierOptions:
         :param max_tokens: The maximum number of tokens to generate in the response. Default is 4096.
         :param temperature: The sampling temperature for the model. Default is 0.1.
         :param top_p: The nucleus sampling parameter for the model. Default is 0.1.
+        :param image_encoding: The options for encoding the document page images sent to the model. Default is full-resolution PNG.
+        :param rate_limit: The options for rate limiting and retrying requests to the model deployment. Default is `RateLimitOptions()`, retrying throttled requests without limiting them.
+        :param deployments: The optional pool of equivalent model deployments to balance requests across. Defaults to the deployment of the endpoint and deployment name.
         """
 
         self.system_prompt = f"""You are an AI assistant that helps detect the boundaries of sub-section or sub-documents using the provided classifications.
@@ -39,34 +50,52 @@ class DocumentDataClassifierOptions:
         self.max_tokens = max_tokens
         self.temperature = temperature
         self.top_p = top_p
+        self.image_encoding = image_encoding or PageImageEncodingOptions()
+        self.rate_limit = rate_limit or RateLimitOptions()
+        self.deployments = deployments or [
+            OpenAIDeployment(endpoint, deployment_name)]
 
 
-class DocumentDataClassifier:
-    """Defines a class for classifying structured data from a document using Azure OpenAI GPT models that support image inputs."""
+class DocumentDataClassifierBase:
+    """Defines the shared behavior of the synchronous and asynchronous document data classifiers."""
 
-    def __init__(self, credential: DefaultAzureCredential):
-        """Initializes a new instance of the DocumentDataClassifier class.
+    def __init__(self, credential: DefaultAzureCredential | AsyncDefaultAzureCredential, page_renderer: Optional[DocumentPageRenderer] = None, page_encoder: Optional[PageImageEncoder] = None, client_registry: Optional[AIClientRegistry] = None, result_cache: Optional[DocumentResultCache] = None, deployment_router: Optional[DeploymentRouter] = None):
+        """Initializes a new instance of the document data classifier.
 
-        :param credential: The Azure credential to use for authenticating with the Azure OpenAI service.
+        :param credential: The Azure credential to use for authenticating with the Azure OpenAI service. Asynchronous classifiers require an `azure.identity.aio` credential.
+        :param page_renderer: The renderer to use for converting document pages to images. Defaults to the process-wide page renderer.
+        :param page_encoder: The encoder to use for encoding rendered page images. Defaults to the process-wide page encoder.
+        :param client_registry: The registry to retrieve shared Azure OpenAI clients from. Defaults to the process-wide client registry.
+        :param result_cache: The optional cache of classification results. If provided, unchanged documents classified with the same options are not sent to the model again.
+        :param deployment_router: The router to balance requests to the model deployments through. Defaults to the process-wide deployment router.
         """
 
         self.credential = credential
-
-    def from_bytes(self, document_bytes: bytes, options: DocumentDataClassifierOptions) -> ClassificationConfidenceResult:
-        """Classifies the specified document bytes using an Azure OpenAI model.
-
-        :param document_bytes: The byte array content of the document to classify data from.
-        :param options: The options for configuring the Azure OpenAI request for classifying data.
-        :return: The classification result as a Classifications object.
-        """
-
-        client = self.__get_openai_client__(options)
-
-        image_uris = self.__get_document_image_uris__(document_bytes)
-
+        self.page_renderer = page_renderer or default_page_renderer
+        self.page_encoder = page_encoder or default_page_encoder
+        self.client_registry = client_registry or default_client_registry
+        self.result_cache = result_cache
+        self.deployment_router = deployment_router or default_deployment_router
+
+    def __get_result_cache_key__(self, document_bytes: bytes, options: DocumentDataClassifierOptions) -> Optional[str]:
+        if not self.result_cache:
+            return None
+
+        return DocumentResultCache.create_key(
+            document_bytes,
+            operation="classify",
+            system_prompt=options.system_prompt,
+            deployments=[deployment.key for deployment in options.deployments],
+            api_version=DEFAULT_OPENAI_API_VERSION,
+            max_tokens=options.max_tokens,
+            temperature=options.temperature,
+            top_p=options.top_p,
+            image_encoding=vars(options.image_encoding))
+
+    def __get_completion_args__(self, options: DocumentDataClassifierOptions, images: list[EncodedPageImage]) -> dict:
         user_content = []
 
-        for i, image_uri in enumerate(image_uris):
+        for i, image in enumerate(images):
             user_content.append({
                 "type": "text",
                 "text": f"Page {i + 1}:"
@@ -75,13 +104,13 @@ class DocumentDataClassifier:
             user_content.append({
                 "type": "image_url",
                 "image_url": {
-                    "url": image_uri
+                    "url": to_image_uri(image.data, image.mime_type)
                 }
             })
 
-        classify_completion = client.beta.chat.completions.parse(
-            model=options.deployment_name,
-            messages=[
+        return {
+            "model": options.deployment_name,
+            "messages": [
                 {
                     "role": "system",
                     "content": options.system_prompt,
@@ -91,14 +120,15 @@ class DocumentDataClassifier:
                     "content": user_content
                 }
             ],
-            response_format=Classifications,
-            max_tokens=4096,
-            temperature=0.1,
-            top_p=0.1,
+            "response_format": Classifications,
+            "max_tokens": options.max_tokens,
+            "temperature": options.temperature,
+            "top_p": options.top_p,
             # Enabled to determine the confidence of the response.
-            logprobs=True
-        )
+            "logprobs": True
+        }
 
+    def __get_result__(self, classify_completion: ParsedChatCompletion) -> ClassificationConfidenceResult:
         response_obj = classify_completion.choices[0].message.parsed
         response_obj_dict = response_obj.model_dump()
 
@@ -113,30 +143,105 @@ class DocumentDataClassifier:
             overall_confidence=confidence_openai[OVERALL_CONFIDENCE_KEY],
         )
 
-    def __get_openai_client__(self, options: DocumentDataClassifierOptions) -> AzureOpenAI:
-        token_provider = get_bearer_token_provider(
-            self.credential, "https://cognitiveservices.azure.com/.default")
+    def __get_routing_args__(self, options: DocumentDataClassifierOptions, completion_args: dict, images: list[EncodedPageImage]) -> dict:
+        return {
+            "deployments": options.deployments,
+            "options": options.rate_limit,
+            "estimated_tokens": estimate_completion_tokens(
+                completion_args, [(image.width, image.height) for image in images]),
+            "get_used_tokens": get_total_tokens
+        }
+
+    def __get_document_images__(self, document_bytes: bytes, image_encoding: PageImageEncodingOptions, cache_key: Optional[str]) -> list[EncodedPageImage]:
+        """Streams the pages of the specified document bytes from the page renderer and encodes them.
 
-        client = AzureOpenAI(
-            api_version="2024-12-01-preview",
-            azure_endpoint=options.endpoint,
-            azure_ad_token_provider=token_provider)
+        To call this method, poppler-utils must be installed on the system.
+        """
 
-        return client
+        return [
+            self.page_encoder.encode(page, image_encoding)
+            for page in self.page_renderer.iter_pages(document_bytes, cache_key, dpi=image_encoding.dpi)
+        ]
 
-    def __get_document_image_uris__(self, document_bytes: bytes) -> list:
-        """Converts the specified document bytes to images using the pdf2image library and returns the image URIs.
 
-        To call this method, poppler-utils must be installed on the system.
+class DocumentDataClassifier(DocumentDataClassifierBase):
+    """Defines a class for classifying structured data from a document using Azure OpenAI GPT models that support image inputs."""
+
+    def from_bytes(self, document_bytes: bytes, options: DocumentDataClassifierOptions, cache_key: Optional[str] = None) -> ClassificationConfidenceResult:
+        """Classifies the specified document bytes using an Azure OpenAI model.
+
+        :param document_bytes: The byte array content of the document to classify data from.
+        :param options: The options for configuring the Azure OpenAI request for classifying data.
+        :param cache_key: The optional cache key of the document used to share rendered pages with other activities.
+        :return: The classification result as a Classifications object.
+        """
+
+        result_cache_key = self.__get_result_cache_key__(
+            document_bytes, options)
+        if result_cache_key:
+            cached_result = self.result_cache.get(result_cache_key)
+            if cached_result is not None:
+                return cached_result
+
+        images = self.__get_document_images__(
+            document_bytes, options.image_encoding, cache_key)
+
+        completion_args = self.__get_completion_args__(options, images)
+        classify_completion = self.deployment_router.call(
+            request=lambda deployment: self.__get_openai_client__(deployment).beta.chat.completions.with_raw_response.parse(
+                **{**completion_args, "model": deployment.deployment_name}),
+            **self.__get_routing_args__(options, completion_args, images))
+
+        result = self.__get_result__(classify_completion)
+
+        if result_cache_key:
+            self.result_cache.set(
+                result_cache_key, result, get_total_tokens(classify_completion))
+
+        return result
+
+    def __get_openai_client__(self, deployment: OpenAIDeployment) -> AzureOpenAI:
+        return self.client_registry.get_openai_client(self.credential, deployment.endpoint)
+
+
+class AsyncDocumentDataClassifier(DocumentDataClassifierBase):
+    """Defines an asyncio-native class for classifying structured data from a document using Azure OpenAI GPT models that support image inputs.
+
+    Page rendering runs in a worker thread so that the event loop can keep other documents in flight.
+    """
+
+    async def from_bytes(self, document_bytes: bytes, options: DocumentDataClassifierOptions, cache_key: Optional[str] = None) -> ClassificationConfidenceResult:
+        """Classifies the specified document bytes using an Azure OpenAI model.
+
+        :param document_bytes: The byte array content of the document to classify data from.
+        :param options: The options for configuring the Azure OpenAI request for classifying data.
+        :param cache_key: The optional cache key of the document used to share rendered pages with other activities.
+        :return: The classification result as a Classifications object.
         """
 
-        pages = convert_from_bytes(document_bytes)
+        result_cache_key = self.__get_result_cache_key__(
+            document_bytes, options)
+        if result_cache_key:
+            cached_result = await asyncio.to_thread(self.result_cache.get, result_cache_key)
+            if cached_result is not None:
+                return cached_result
+
+        images = await asyncio.to_thread(
+            self.__get_document_images__, document_bytes, options.image_encoding, cache_key)
+
+        completion_args = self.__get_completion_args__(options, images)
+        classify_completion = await self.deployment_router.call_async(
+            request=lambda deployment: self.__get_openai_client__(deployment).beta.chat.completions.with_raw_response.parse(
+                **{**completion_args, "model": deployment.deployment_name}),
+            **self.__get_routing_args__(options, completion_args, images))
+
+        result = self.__get_result__(classify_completion)
+
+        if result_cache_key:
+            await asyncio.to_thread(
+                self.result_cache.set, result_cache_key, result, get_total_tokens(classify_completion))
 
-        image_uris = []
-        for page in pages:
-            byteIO = io.BytesIO()
-            page.save(byteIO, format='PNG')
-            base64_data = base64.b64encode(byteIO.getvalue()).decode('utf-8')
-            image_uris.append(f"data:image/png;base64,{base64_data}")
+        return result
 
-        return image_uris
+    def __get_openai_client__(self, deployment: OpenAIDeployment) -> AsyncAzureOpenAI:
+        return self.client_registry.get_async_openai_client(self.credential, deployment.endpoint)
@@ -1,15 +1,25 @@
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from pdf2image import convert_from_bytes
-import base64
-from openai import AzureOpenAI
-import io
+from azure.identity import DefaultAzureCredential
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
+from openai import AzureOpenAI, AsyncAzureOpenAI
+from openai.types.chat import ParsedChatCompletion
 from typing import TypeVar, Optional
 from azure.ai.documentintelligence import DocumentIntelligenceClient
+from azure.ai.documentintelligence.aio import DocumentIntelligenceClient as AsyncDocumentIntelligenceClient
+import asyncio
 from azure.ai.documentintelligence.models import AnalyzeResult, DocumentContentFormat
 from shared.confidence.confidence_utils import merge_confidence_values
 from shared.confidence.openai_confidence import evaluate_confidence as evaluate_confidence_openai
-from shared.confidence.document_intelligence_confidence import evaluate_confidence as evaluate_confidence_di
+from shared.confidence.document_intelligence_confidence import ConfidenceDetail, evaluate_confidence as evaluate_confidence_di
 from shared.confidence.confidence_result import ConfidenceResult, OVERALL_CONFIDENCE_KEY
+from documents.services.document_page_renderer import DocumentPageRenderer, default_page_renderer, to_image_uri
+from documents.services.page_image_encoder import EncodedPageImage, PageImageEncoder, PageImageEncodingOptions, default_page_encoder
+from documents.services.document_result_cache import DocumentResultCache
+from documents.services.document_analysis_cache import DocumentAnalysisCache, default_analysis_cache, slice_analyze_result
+from shared.clients.ai_client_registry import AIClientRegistry, DEFAULT_OPENAI_API_VERSION, default_client_registry
+from shared.clients.completion_usage import estimate_completion_tokens, get_total_tokens
+from shared.clients.adaptive_polling import AdaptivePollingOptions, AdaptiveLROPolling, AsyncAdaptiveLROPolling
+from shared.clients.rate_limiter import RateLimitOptions
+from shared.clients.deployment_router import DeploymentRouter, OpenAIDeployment, default_deployment_router
 
 ResponseFormatT = TypeVar(
     "ResponseFormatT"
@@ -21,7 +31,7 @@ ExtractionConfidenceResult = ConfidenceResult[ResponseFormatT | None]
 class DocumentDataExtractorOptions:
     """Defines the configuration options for extracting data from a document using Azure OpenAI."""
 
-    def __init__(self, extraction_prompt: str, page_start: Optional[int], page_end: Optional[int], aiservices_endpoint: Optional[str], openai_endpoint: str, deployment_name: str, max_tokens: int = 4096, temperature: float = 0.1, top_p: float = 0.1):
+    def __init__(self, extraction_prompt: str, page_start: Optional[int], page_end: Optional[int], aiservices_endpoint: Optional[str], openai_endpoint: str, deployment_name: str, max_tokens: int = 4096, temperature: float = 0.1, top_p: float = 0.1, image_encoding: Optional[PageImageEncodingOptions] = None, polling: Optional[AdaptivePollingOptions] = None, rate_limit: Optional[RateLimitOptions] = None, deployments: Optional[list[OpenAIDeployment]] = None):
         """Initializes a new instance of the DocumentDataExtractorOptions class.
 
         :param extraction_prompt: The prompt to use for extracting data from the document, including the expected output format.
@@ -32,6 +42,10 @@ class DocumentDataExtractorOptions:
         :param max_tokens: The maximum number of tokens to generate in the response. Default is 4096.
         :param temperature: The sampling temperature for the model. Default is 0.1.
         :param top_p: The nucleus sampling parameter for the model. Default is 0.1.
+        :param image_encoding: The options for encoding the document page images sent to the model. Default is full-resolution PNG.
+        :param polling: The options for polling the Document Intelligence analysis of the document. Default is `AdaptivePollingOptions()`.
+        :param rate_limit: The options for rate limiting and retrying requests to the model deployment. Default is `RateLimitOptions()`, retrying throttled requests without limiting them.
+        :param deployments: The optional pool of equivalent model deployments to balance requests across. Defaults to the deployment of the OpenAI endpoint and deployment name.
         """
 
         self.system_prompt = f"""You are an AI assistant that extracts data from documents."""
@@ -44,52 +58,72 @@ class DocumentDataExtractorOptions:
         self.max_tokens = max_tokens
         self.temperature = temperature
         self.top_p = top_p
-
-
-class DocumentDataExtractor:
-    """Defines a class for extracting structured data from a document using Azure OpenAI GPT models that support image inputs."""
-
-    def __init__(self, credential: DefaultAzureCredential):
-        """Initializes a new instance of the DocumentDataExtractor class.
-
-        :param credential: The Azure credential to use for authenticating with the Azure OpenAI service.
+        self.image_encoding = image_encoding or PageImageEncodingOptions()
+        self.polling = polling or AdaptivePollingOptions()
+        self.rate_limit = rate_limit or RateLimitOptions()
+        self.deployments = deployments or [
+            OpenAIDeployment(openai_endpoint, deployment_name)]
+
+
+class DocumentDataExtractorBase:
+    """Defines the shared behavior of the synchronous and asynchronous document data extractors."""
+
+    def __init__(self, credential: DefaultAzureCredential | AsyncDefaultAzureCredential, page_renderer: Optional[DocumentPageRenderer] = None, page_encoder: Optional[PageImageEncoder] = None, client_registry: Optional[AIClientRegistry] = None, result_cache: Optional[DocumentResultCache] = None, analysis_cache: Optional[DocumentAnalysisCache] = None, deployment_router: Optional[DeploymentRouter] = None):
+        """Initializes a new instance of the document data extractor.
+
+        :param credential: The Azure credential to use for authenticating with the Azure OpenAI service. Asynchronous extractors require an `azure.identity.aio` credential.
+        :param page_renderer: The renderer to use for converting document pages to images. Defaults to the process-wide page renderer.
+        :param page_encoder: The encoder to use for encoding rendered page images. Defaults to the process-wide page encoder.
+        :param client_registry: The registry to retrieve shared Azure OpenAI and Document Intelligence clients from. Defaults to the process-wide client registry.
+        :param result_cache: The optional cache of extraction results. If provided, unchanged documents extracted with the same options are not sent to the models again.
+        :param analysis_cache: The cache of whole-document Document Intelligence layout results, sliced per page range. Defaults to the process-wide analysis cache.
+        :param deployment_router: The router to balance requests to the model deployments through. Defaults to the process-wide deployment router.
         """
 
         self.credential = credential
-
-    def from_bytes(self, document_bytes: bytes, response_format: type[ResponseFormatT], options: DocumentDataExtractorOptions) -> ExtractionConfidenceResult:
-        """Extracts structured data from the specified document bytes by converting the document to images and using an Azure OpenAI model to extract the data.
-
-        :param document_bytes: The byte array content of the document to extract data from.
-        :param options: The options for configuring the Azure OpenAI request for extracting data.
-        :return: The structured data extracted from the document as a dictionary.
-        """
-
-        client = self.__get_openai_client__(options)
-        di_client = self.__get_document_intelligence_client__(options)
-
+        self.page_renderer = page_renderer or default_page_renderer
+        self.page_encoder = page_encoder or default_page_encoder
+        self.client_registry = client_registry or default_client_registry
+        self.result_cache = result_cache
+        self.analysis_cache = analysis_cache or default_analysis_cache
+        self.deployment_router = deployment_router or default_deployment_router
+
+    def __get_page_range__(self, options: DocumentDataExtractorOptions) -> Optional[str]:
         if options.page_start and options.page_end:
-            page_range = f"{options.page_start}-{options.page_end}"
-        else:
-            page_range = None
+            return f"{options.page_start}-{options.page_end}"
 
-        # For a more accurate extraction, we can use the Document Intelligence service to extract the document layout and convert it to markdown.
-        if di_client:
-            poller = di_client.begin_analyze_document(
-                model_id="prebuilt-layout",
-                body=document_bytes,
-                pages=page_range,
-                output_content_format=DocumentContentFormat.MARKDOWN,
-                content_type="application/pdf"
-            )
-            result: AnalyzeResult = poller.result()
-            document_markdown = result.content
-        else:
-            document_markdown = None
+        return None
 
-        image_uris = self.__get_document_image_uris__(
-            document_bytes, options.page_start, options.page_end)
+    def __get_result_cache_key__(self, document_bytes: bytes, response_format: type[ResponseFormatT], options: DocumentDataExtractorOptions) -> Optional[str]:
+        if not self.result_cache:
+            return None
 
+        return DocumentResultCache.create_key(
+            document_bytes,
+            operation="extract",
+            response_format=f"{response_format.__module__}.{response_format.__qualname__}",
+            response_schema=response_format.model_json_schema(),
+            system_prompt=options.system_prompt,
+            extraction_prompt=options.extraction_prompt,
+            page_range=self.__get_page_range__(options),
+            document_intelligence=bool(options.aiservices_endpoint),
+            deployments=[deployment.key for deployment in options.deployments],
+            api_version=DEFAULT_OPENAI_API_VERSION,
+            max_tokens=options.max_tokens,
+            temperature=options.temperature,
+            top_p=options.top_p,
+            image_encoding=vars(options.image_encoding))
+
+    def __get_analyze_args__(self, document_bytes: bytes) -> dict:
+        # The whole document is analyzed once and cached, with page ranges sliced from the cached result.
+        return {
+            "model_id": "prebuilt-layout",
+            "body": document_bytes,
+            "output_content_format": DocumentContentFormat.MARKDOWN,
+            "content_type": "application/pdf"
+        }
+
+    def __get_completion_args__(self, response_format: type[ResponseFormatT], options: DocumentDataExtractorOptions, document_markdown: Optional[str], images: list[EncodedPageImage]) -> dict:
         user_content = []
         user_content.append({
             "type": "text",
@@ -102,17 +136,17 @@ class DocumentDataExtractor:
                 "text": document_markdown
             })
 
-        for image_uri in image_uris:
+        for image in images:
             user_content.append({
                 "type": "image_url",
                 "image_url": {
-                    "url": image_uri
+                    "url": to_image_uri(image.data, image.mime_type)
                 }
             })
 
-        completion = client.beta.chat.completions.parse(
-            model=options.deployment_name,
-            messages=[
+        return {
+            "model": options.deployment_name,
+            "messages": [
                 {
                     "role": "system",
                     "content": options.system_prompt,
@@ -122,14 +156,15 @@ class DocumentDataExtractor:
                     "content": user_content
                 }
             ],
-            response_format=response_format,
-            max_tokens=4096,
-            temperature=0.1,
-            top_p=0.1,
+            "response_format": response_format,
+            "max_tokens": options.max_tokens,
+            "temperature": options.temperature,
+            "top_p": options.top_p,
             # Enabled to determine the confidence of the response.
-            logprobs=True
-        )
+            "logprobs": True
+        }
 
+    def __get_result__(self, completion: ParsedChatCompletion, analyze_result: Optional[AnalyzeResult]) -> ExtractionConfidenceResult:
         response_obj = completion.choices[0].message.parsed
         response_obj_dict = response_obj.model_dump()
 
@@ -138,10 +173,12 @@ class DocumentDataExtractor:
             choice=completion.choices[0]
         )
 
-        if di_client:
+        if analyze_result:
+            # Only the scores are kept when merging, so no polygons or lines are produced.
             confidence_di = evaluate_confidence_di(
                 extract_result=response_obj_dict,
-                analyze_result=result
+                analyze_result=analyze_result,
+                detail=ConfidenceDetail.SCORES
             )
             confidence = merge_confidence_values(
                 confidence_a=confidence_di,
@@ -156,45 +193,160 @@ class DocumentDataExtractor:
             overall_confidence=confidence[OVERALL_CONFIDENCE_KEY]
         )
 
-    def __get_openai_client__(self, options: DocumentDataExtractorOptions) -> AzureOpenAI:
-        token_provider = get_bearer_token_provider(
-            self.credential, "https://cognitiveservices.azure.com/.default")
+    def __get_routing_args__(self, options: DocumentDataExtractorOptions, completion_args: dict, images: list[EncodedPageImage]) -> dict:
+        return {
+            "deployments": options.deployments,
+            "options": options.rate_limit,
+            "estimated_tokens": estimate_completion_tokens(
+                completion_args, [(image.width, image.height) for image in images]),
+            "get_used_tokens": get_total_tokens
+        }
+
+    def __get_document_images__(self, document_bytes: bytes, page_start: Optional[int], page_end: Optional[int], image_encoding: PageImageEncodingOptions, cache_key: Optional[str]) -> list[EncodedPageImage]:
+        """Streams the pages of the specified document bytes from the page renderer and encodes them.
+
+        To call this method, poppler-utils must be installed on the system.
+        """
+
+        return [
+            self.page_encoder.encode(page, image_encoding)
+            for page in self.page_renderer.iter_pages(document_bytes, cache_key, page_start, page_end, dpi=image_encoding.dpi)
+        ]
+
+
+class DocumentDataExtractor(DocumentDataExtractorBase):
+    """Defines a class for extracting structured data from a document using Azure OpenAI GPT models that support image inputs."""
+
+    def from_bytes(self, document_bytes: bytes, response_format: type[ResponseFormatT], options: DocumentDataExtractorOptions, cache_key: Optional[str] = None) -> ExtractionConfidenceResult:
+        """Extracts structured data from the specified document bytes by converting the document to images and using an Azure OpenAI model to extract the data.
+
+        :param document_bytes: The byte array content of the document to extract data from.
+        :param options: The options for configuring the Azure OpenAI request for extracting data.
+        :param cache_key: The optional cache key of the document used to share rendered pages with other activities.
+        :return: The structured data extracted from the document as a dictionary.
+        """
+
+        result_cache_key = self.__get_result_cache_key__(
+            document_bytes, response_format, options)
+        if result_cache_key:
+            cached_result = self.result_cache.get(result_cache_key)
+            if cached_result is not None:
+                return cached_result
+
+        di_client = self.__get_document_intelligence_client__(options)
+
+        # For a more accurate extraction, we can use the Document Intelligence service to extract the document layout and convert it to markdown.
+        if di_client:
+            document_result = self.analysis_cache.get_or_analyze(
+                DocumentAnalysisCache.create_key(document_bytes, cache_key),
+                lambda: di_client.begin_analyze_document(
+                    **self.__get_analyze_args__(document_bytes),
+                    polling=AdaptiveLROPolling(options.polling, path_format_arguments={"endpoint": options.aiservices_endpoint})).result())
+            result: Optional[AnalyzeResult] = slice_analyze_result(
+                document_result, options.page_start, options.page_end)
+            document_markdown = result.content
+        else:
+            result = None
+            document_markdown = None
+
+        images = self.__get_document_images__(
+            document_bytes, options.page_start, options.page_end, options.image_encoding, cache_key)
+
+        completion_args = self.__get_completion_args__(
+            response_format, options, document_markdown, images)
+        completion = self.deployment_router.call(
+            request=lambda deployment: self.__get_openai_client__(deployment).beta.chat.completions.with_raw_response.parse(
+                **{**completion_args, "model": deployment.deployment_name}),
+            **self.__get_routing_args__(options, completion_args, images))
+
+        extraction_result = self.__get_result__(completion, result)
 
-        client = AzureOpenAI(
-            api_version="2024-12-01-preview",
-            azure_endpoint=options.openai_endpoint,
-            azure_ad_token_provider=token_provider)
+        if result_cache_key:
+            self.result_cache.set(
+                result_cache_key, extraction_result, get_total_tokens(completion))
 
-        return client
+        return extraction_result
+
+    def __get_openai_client__(self, deployment: OpenAIDeployment) -> AzureOpenAI:
+        return self.client_registry.get_openai_client(self.credential, deployment.endpoint)
 
     def __get_document_intelligence_client__(self, options: DocumentDataExtractorOptions) -> Optional[DocumentIntelligenceClient]:
         if not options.aiservices_endpoint:
             return None
 
-        document_intelligence_client = DocumentIntelligenceClient(
-            endpoint=options.aiservices_endpoint,
-            credential=self.credential
-        )
+        return self.client_registry.get_document_intelligence_client(self.credential, options.aiservices_endpoint)
 
-        return document_intelligence_client
 
-    def __get_document_image_uris__(self, document_bytes: bytes, page_start: Optional[int], page_end: Optional[int]) -> list:
-        """Converts the specified document bytes to images using the pdf2image library and returns the image URIs.
+class AsyncDocumentDataExtractor(DocumentDataExtractorBase):
+    """Defines an asyncio-native class for extracting structured data from a document using Azure OpenAI GPT models that support image inputs.
 
-        To call this method, poppler-utils must be installed on the system.
+    The Document Intelligence analysis and page rendering run concurrently, with rendering and confidence evaluation in worker threads so that the event loop can keep other documents in flight.
+    """
+
+    async def from_bytes(self, document_bytes: bytes, response_format: type[ResponseFormatT], options: DocumentDataExtractorOptions, cache_key: Optional[str] = None) -> ExtractionConfidenceResult:
+        """Extracts structured data from the specified document bytes by converting the document to images and using an Azure OpenAI model to extract the data.
+
+        :param document_bytes: The byte array content of the document to extract data from.
+        :param options: The options for configuring the Azure OpenAI request for extracting data.
+        :param cache_key: The optional cache key of the document used to share rendered pages with other activities.
+        :return: The structured data extracted from the document as a dictionary.
         """
 
-        pages = convert_from_bytes(document_bytes)
+        result_cache_key = self.__get_result_cache_key__(
+            document_bytes, response_format, options)
+        if result_cache_key:
+            cached_result = await asyncio.to_thread(self.result_cache.get, result_cache_key)
+            if cached_result is not None:
+                return cached_result
+
+        di_client = self.__get_document_intelligence_client__(options)
+
+        images_task = asyncio.to_thread(
+            self.__get_document_images__, document_bytes, options.page_start, options.page_end, options.image_encoding, cache_key)
 
-        image_uris = []
+        # For a more accurate extraction, we can use the Document Intelligence service to extract the document layout and convert it to markdown.
+        if di_client:
+            result, images = await asyncio.gather(
+                self.__analyze_document__(di_client, document_bytes, options, cache_key),
+                images_task)
+            document_markdown = result.content
+        else:
+            result = None
+            document_markdown = None
+            images = await images_task
 
-        if page_start and page_end:
-            pages = pages[page_start-1:page_end]
+        completion_args = self.__get_completion_args__(
+            response_format, options, document_markdown, images)
+        completion = await self.deployment_router.call_async(
+            request=lambda deployment: self.__get_openai_client__(deployment).beta.chat.completions.with_raw_response.parse(
+                **{**completion_args, "model": deployment.deployment_name}),
+            **self.__get_routing_args__(options, completion_args, images))
 
-        for page in pages:
-            byteIO = io.BytesIO()
-            page.save(byteIO, format='PNG')
-            base64_data = base64.b64encode(byteIO.getvalue()).decode('utf-8')
-            image_uris.append(f"data:image/png;base64,{base64_data}")
+        extraction_result = await asyncio.to_thread(self.__get_result__, completion, result)
+
+        if result_cache_key:
+            await asyncio.to_thread(
+                self.result_cache.set, result_cache_key, extraction_result, get_total_tokens(completion))
+
+        return extraction_result
+
+    async def __analyze_document__(self, di_client: AsyncDocumentIntelligenceClient, document_bytes: bytes, options: DocumentDataExtractorOptions, cache_key: Optional[str]) -> AnalyzeResult:
+        async def analyze() -> AnalyzeResult:
+            poller = await di_client.begin_analyze_document(
+                **self.__get_analyze_args__(document_bytes),
+                polling=AsyncAdaptiveLROPolling(options.polling, path_format_arguments={"endpoint": options.aiservices_endpoint}))
+            return await poller.result()
+
+        document_result = await self.analysis_cache.get_or_analyze_async(
+            DocumentAnalysisCache.create_key(document_bytes, cache_key), analyze)
+
+        return slice_analyze_result(document_result, options.page_start, options.page_end)
+
+    def __get_openai_client__(self, deployment: OpenAIDeployment) -> AsyncAzureOpenAI:
+        return self.client_registry.get_async_openai_client(self.credential, deployment.endpoint)
+
+    def __get_document_intelligence_client__(self, options: DocumentDataExtractorOptions) -> Optional[AsyncDocumentIntelligenceClient]:
+        if not options.aiservices_endpoint:
+            return None
 
-        return image_uris
+        return self.client_registry.get_async_document_intelligence_client(self.credential, options.aiservices_endpoint)
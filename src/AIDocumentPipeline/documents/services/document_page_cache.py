@@ -0,0 +1,149 @@
+from typing import Optional
+from collections import OrderedDict
+import threading
+
+
+class DocumentPageCache:
+    """Defines a thread-safe, in-process cache of rendered document page images.
+
+    Pages are keyed by the document blob name and ETag so that a document rendered once for classification can be reused by subsequent extraction activities running in the same worker, without rasterizing the PDF again.
+    """
+
+    def __init__(self, max_documents: int = 32, max_bytes: int = 256 * 1024 * 1024):
+        """Initializes a new instance of the DocumentPageCache class.
+
+        :param max_documents: The maximum number of documents to keep rendered pages for. The least recently used document is evicted when the limit is reached. Default is 32.
+        :param max_bytes: The maximum total size of the cached page images in bytes. Least recently used documents are evicted until the cache fits, and pages that cannot fit are not cached. Default is 256 MiB.
+        """
+
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        self._documents: OrderedDict[str, dict[int, bytes]] = OrderedDict()
+        self._document_bytes: dict[str, int] = {}
+        self._page_counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def create_key(container_name: str, blob_name: str, etag: str) -> str:
+        """Creates a cache key for a document blob.
+
+        :param container_name: The name of the container within the storage account.
+        :param blob_name: The name of the document blob.
+        :param etag: The ETag of the document blob, used to invalidate pages when the document changes.
+        :return: The cache key for the document.
+        """
+
+        return f"{container_name}/{blob_name}@{etag}"
+
+    def get_page_count(self, key: str) -> Optional[int]:
+        """Retrieves the total number of pages for a cached document.
+
+        :param key: The cache key of the document.
+        :return: The number of pages in the document if known; otherwise, None.
+        """
+
+        with self._lock:
+            return self._page_counts.get(key)
+
+    def set_page_count(self, key: str, page_count: int):
+        """Stores the total number of pages for a document.
+
+        :param key: The cache key of the document.
+        :param page_count: The number of pages in the document.
+        """
+
+        with self._lock:
+            self.__get_or_add_document__(key)
+            self._page_counts[key] = page_count
+
+    def get_page(self, key: str, page_number: int) -> Optional[bytes]:
+        """Retrieves the rendered image bytes of a document page, recording a cache hit or miss.
+
+        :param key: The cache key of the document.
+        :param page_number: The 1-based page number to retrieve.
+        :return: The rendered image bytes of the page if cached; otherwise, None.
+        """
+
+        with self._lock:
+            pages = self._documents.get(key)
+            page = pages.get(page_number) if pages is not None else None
+
+            if page is None:
+                self.misses += 1
+                return None
+
+            self._documents.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def set_page(self, key: str, page_number: int, data: bytes):
+        """Stores the rendered image bytes of a document page.
+
+        :param key: The cache key of the document.
+        :param page_number: The 1-based page number to store.
+        :param data: The rendered image bytes of the page.
+        """
+
+        with self._lock:
+            pages = self.__get_or_add_document__(key)
+            self.__remove_page__(key, pages, page_number)
+
+            # Evict other documents first, so the pages of the document being rendered are kept together.
+            while self.total_bytes + len(data) > self.max_bytes and len(self._documents) > 1:
+                evicted_key = next(iter(self._documents))
+                if evicted_key == key:
+                    self._documents.move_to_end(key)
+                    continue
+                self.__evict__(evicted_key)
+
+            if self.total_bytes + len(data) > self.max_bytes:
+                return
+
+            pages[page_number] = data
+            self._document_bytes[key] = self._document_bytes.get(key, 0) + len(data)
+            self.total_bytes += len(data)
+
+    def get_stats(self) -> dict[str, float]:
+        """Retrieves the hit and miss counters of the cache.
+
+        :return: A dictionary containing the number of cached documents, the total and maximum bytes of the cached pages, hits, misses, and the hit rate.
+        """
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "documents": len(self._documents),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def __get_or_add_document__(self, key: str) -> dict[int, bytes]:
+        pages = self._documents.get(key)
+        if pages is None:
+            pages = {}
+            self._documents[key] = pages
+            while len(self._documents) > self.max_documents:
+                self.__evict__(next(iter(self._documents)))
+        else:
+            self._documents.move_to_end(key)
+        return pages
+
+    def __remove_page__(self, key: str, pages: dict[int, bytes], page_number: int):
+        page = pages.pop(page_number, None)
+        if page is not None:
+            self._document_bytes[key] -= len(page)
+            self.total_bytes -= len(page)
+
+    def __evict__(self, key: str):
+        self._documents.pop(key)
+        self._page_counts.pop(key, None)
+        self.total_bytes -= self._document_bytes.pop(key, 0)
+
+
+default_page_cache = DocumentPageCache()
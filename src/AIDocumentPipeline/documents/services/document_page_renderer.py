@@ -0,0 +1,229 @@
+from typing import Iterator, Optional
+from pdf2image import convert_from_bytes, pdfinfo_from_bytes
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import base64
+import multiprocessing
+import os
+import tempfile
+import threading
+from documents.services.document_page_cache import DocumentPageCache, default_page_cache
+
+IMAGE_MIME_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg"
+}
+
+
+class DocumentPageRenderer:
+    """Defines a class for rendering the pages of a document to images, sharing rendered pages across callers via a `DocumentPageCache`.
+
+    If more than one worker is configured, large page ranges are split into chunks that are rasterized in parallel by a pool of worker processes, with pages returned in order.
+    """
+
+    def __init__(self, page_cache: Optional[DocumentPageCache] = None, max_workers: int = 1, dpi: int = 200, fmt: str = "png", pages_per_worker: int = 4):
+        """Initializes a new instance of the DocumentPageRenderer class.
+
+        :param page_cache: The cache to store rendered pages in. Defaults to the process-wide page cache.
+        :param max_workers: The maximum number of worker processes used to rasterize a document. Default is 1, rasterizing in the calling thread without starting a process pool.
+        :param dpi: The default resolution to rasterize pages at. Default is 200.
+        :param fmt: The image format of rendered pages, either png or jpeg. Default is png.
+        :param pages_per_worker: The number of consecutive pages rasterized by a worker process per task. Default is 4.
+        """
+
+        if fmt not in IMAGE_MIME_TYPES:
+            raise ValueError(
+                f"Unsupported image format '{fmt}'. Supported formats are: {', '.join(IMAGE_MIME_TYPES)}.")
+
+        self.page_cache = page_cache or default_page_cache
+        self.max_workers = max(max_workers or 1, 1)
+        self.dpi = dpi
+        self.fmt = fmt
+        self.pages_per_worker = max(pages_per_worker, 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def mime_type(self) -> str:
+        """The MIME type of the rendered page images."""
+
+        return IMAGE_MIME_TYPES[self.fmt]
+
+    def iter_pages(self, document_bytes: bytes, cache_key: Optional[str] = None, page_start: Optional[int] = None, page_end: Optional[int] = None, dpi: Optional[int] = None) -> Iterator[bytes]:
+        """Renders the requested pages of the specified document bytes to images, yielding the image bytes one page at a time.
+
+        Only the requested page range is rasterized, and pages are written by poppler to a temporary folder and read back individually, so peak memory is bounded by the pages in flight rather than the whole document.
+        If a cache key is provided, previously rendered pages are read from the cache instead of rasterizing the document again.
+        To call this method, poppler-utils must be installed on the system.
+
+        :param document_bytes: The byte array content of the document to render.
+        :param cache_key: The optional cache key of the document, e.g., created using `DocumentPageCache.create_key`.
+        :param page_start: The optional 1-based starting page number to render.
+        :param page_end: The optional 1-based ending page number to render.
+        :param dpi: The optional resolution to rasterize pages at. Defaults to the renderer's resolution.
+        :return: An iterator of the image bytes of the requested pages, in page order.
+        """
+
+        dpi = dpi or self.dpi
+
+        if cache_key:
+            # Pages rendered with different settings must not be shared.
+            cache_key = f"{cache_key}:{dpi}:{self.fmt}"
+
+        page_count = self.__get_page_count__(document_bytes, cache_key)
+
+        if page_start and page_end:
+            first_page, last_page = page_start, min(page_end, page_count)
+        else:
+            first_page, last_page = 1, page_count
+
+        # Render contiguous runs of uncached pages together.
+        missing_start = None
+        for page_number in range(first_page, last_page + 1):
+            page = self.page_cache.get_page(
+                cache_key, page_number) if cache_key else None
+
+            if page is None:
+                if missing_start is None:
+                    missing_start = page_number
+                continue
+
+            if missing_start is not None:
+                yield from self.__render_page_range__(document_bytes, missing_start, page_number - 1, dpi, cache_key)
+                missing_start = None
+
+            yield page
+
+        if missing_start is not None:
+            yield from self.__render_page_range__(document_bytes, missing_start, last_page, dpi, cache_key)
+
+    def close(self):
+        """Shuts down the worker process pool, if started."""
+
+        with self._executor_lock:
+            if self._executor:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __get_page_count__(self, document_bytes: bytes, cache_key: Optional[str]) -> int:
+        page_count = self.page_cache.get_page_count(
+            cache_key) if cache_key else None
+
+        if page_count is None:
+            page_count = pdfinfo_from_bytes(document_bytes)["Pages"]
+            if cache_key:
+                self.page_cache.set_page_count(cache_key, page_count)
+
+        return page_count
+
+    def __render_page_range__(self, document_bytes: bytes, first_page: int, last_page: int, dpi: int, cache_key: Optional[str]) -> Iterator[bytes]:
+        if self.max_workers == 1 or last_page - first_page + 1 <= self.pages_per_worker:
+            pages = iter_rendered_pages(
+                document_bytes, first_page, last_page, dpi, self.fmt)
+        else:
+            pages = self.__render_page_range_parallel__(
+                document_bytes, first_page, last_page, dpi)
+
+        for page_number, page in enumerate(pages, start=first_page):
+            if cache_key:
+                self.page_cache.set_page(cache_key, page_number, page)
+
+            yield page
+
+    def __render_page_range_parallel__(self, document_bytes: bytes, first_page: int, last_page: int, dpi: int) -> Iterator[bytes]:
+        chunks = [
+            (chunk_start, min(chunk_start + self.pages_per_worker - 1, last_page))
+            for chunk_start in range(first_page, last_page + 1, self.pages_per_worker)
+        ]
+
+        executor = self.__get_executor__()
+        pending_chunks = iter(chunks)
+        futures: deque[Future] = deque()
+
+        def submit_next() -> None:
+            chunk = next(pending_chunks, None)
+            if chunk is not None:
+                futures.append(executor.submit(
+                    render_pages, document_bytes, chunk[0], chunk[1], dpi, self.fmt))
+
+        # Only a window of chunks is in flight, so the pages of a chunk are released once yielded rather than held until the whole range is rendered.
+        for _ in range(self.max_workers):
+            submit_next()
+
+        try:
+            while futures:
+                pages = futures.popleft().result()
+                submit_next()
+                yield from pages
+                del pages
+        finally:
+            # Stop rendering chunks that will not be consumed, e.g., if the caller stops iterating early.
+            for future in futures:
+                future.cancel()
+
+    def __get_executor__(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # Worker processes are spawned rather than forked, so they do not inherit a copy of the Functions worker's memory, threads and open connections.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+
+def iter_rendered_pages(document_bytes: bytes, first_page: int, last_page: int, dpi: int = 200, fmt: str = "png") -> Iterator[bytes]:
+    """Rasterizes a page range of the specified document bytes with poppler, yielding the image bytes one page at a time.
+
+    :param document_bytes: The byte array content of the document to render.
+    :param first_page: The 1-based first page number to render.
+    :param last_page: The 1-based last page number to render.
+    :param dpi: The resolution to rasterize pages at. Default is 200.
+    :param fmt: The image format of rendered pages, either png or jpeg. Default is png.
+    :return: An iterator of the image bytes of the rendered pages, in page order.
+    """
+
+    with tempfile.TemporaryDirectory() as output_folder:
+        page_paths = convert_from_bytes(
+            document_bytes,
+            dpi=dpi,
+            first_page=first_page,
+            last_page=last_page,
+            output_folder=output_folder,
+            fmt=fmt,
+            paths_only=True)
+
+        for page_path in page_paths:
+            with open(page_path, 'rb') as page_file:
+                page = page_file.read()
+            os.remove(page_path)
+
+            yield page
+
+
+def render_pages(document_bytes: bytes, first_page: int, last_page: int, dpi: int = 200, fmt: str = "png") -> list[bytes]:
+    """Rasterizes a page range of the specified document bytes with poppler. Used as the unit of work for worker processes.
+
+    :param document_bytes: The byte array content of the document to render.
+    :param first_page: The 1-based first page number to render.
+    :param last_page: The 1-based last page number to render.
+    :param dpi: The resolution to rasterize pages at. Default is 200.
+    :param fmt: The image format of rendered pages, either png or jpeg. Default is png.
+    :return: The image bytes of the rendered pages, in page order.
+    """
+
+    return list(iter_rendered_pages(document_bytes, first_page, last_page, dpi, fmt))
+
+
+def to_image_uri(image_bytes: bytes, mime_type: str = "image/png") -> str:
+    """Converts the specified image bytes to a base64 data URI.
+
+    :param image_bytes: The image bytes to convert.
+    :param mime_type: The MIME type of the image. Default is image/png.
+    :return: The base64 data URI of the image.
+    """
+
+    base64_data = base64.b64encode(image_bytes).decode('utf-8')
+    return f"data:{mime_type};base64,{base64_data}"
+
+
+default_page_renderer = DocumentPageRenderer()
@@ -0,0 +1,266 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from collections import OrderedDict
+from azure.core.exceptions import AzureError, ResourceNotFoundError
+from shared.confidence.confidence_result import ConfidenceResult
+from storage.services.azure_storage_client_factory import AzureStorageClientFactory
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import zlib
+
+# The errors raised when reading a cached entry that is corrupt or was written by an incompatible version, e.g., invalid JSON or compressed data, or a data model that no longer exists.
+DESERIALIZATION_ERRORS = (ValueError, KeyError, TypeError, AttributeError, ImportError, zlib.error)
+
+
+class ResultCacheStore(ABC):
+    """Defines the interface of a backing store for a `DocumentResultCache`.
+
+    Stores must be safe to call from multiple threads, as asynchronous callers access them from worker threads.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Retrieves the value stored for a key.
+
+        :param key: The content-addressed key of the entry.
+        :return: The stored value if present; otherwise, None.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: bytes):
+        """Stores the value for a key, replacing any existing value.
+
+        :param key: The content-addressed key of the entry.
+        :param value: The value to store.
+        """
+
+
+class MemoryResultCacheStore(ResultCacheStore):
+    """Defines an in-process, least recently used store for cached results."""
+
+    def __init__(self, max_entries: int = 1024):
+        """Initializes a new instance of the MemoryResultCacheStore class.
+
+        :param max_entries: The maximum number of results to keep. The least recently used result is evicted when the limit is reached. Default is 1024.
+        """
+
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DiskResultCacheStore(ResultCacheStore):
+    """Defines a store for cached results as files in a local directory, shared by all workers on the same host."""
+
+    def __init__(self, directory: str):
+        """Initializes a new instance of the DiskResultCacheStore class.
+
+        :param directory: The directory to store cached results in. Created if it does not exist.
+        """
+
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self.__get_path__(key), 'rb') as entry_file:
+                return entry_file.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, value: bytes):
+        # Write to a temporary file and rename it, so concurrent readers never see a partial entry.
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(file_descriptor, 'wb') as entry_file:
+                entry_file.write(value)
+            os.replace(temp_path, self.__get_path__(key))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def __get_path__(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+
+class BlobResultCacheStore(ResultCacheStore):
+    """Defines a store for cached results as blobs in an Azure Storage container, shared by all workers and re-runs.
+
+    Storage errors are logged and treated as cache misses or skipped writes, so an unavailable cache never fails the request it caches.
+    """
+
+    def __init__(self, storage_factory: AzureStorageClientFactory, storage_account_name: str, container_name: str, prefix: str = ""):
+        """Initializes a new instance of the BlobResultCacheStore class.
+
+        :param storage_factory: The factory to retrieve the container client from.
+        :param storage_account_name: The name of the Azure Storage account.
+        :param container_name: The name of the container to store cached results in. The container must exist.
+        :param prefix: The optional blob name prefix of cached results, e.g., a virtual folder. Default is no prefix.
+        """
+
+        self.storage_factory = storage_factory
+        self.storage_account_name = storage_account_name
+        self.container_name = container_name
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.__get_blob_client__(key).download_blob().readall()
+        except ResourceNotFoundError:
+            return None
+        except AzureError as e:
+            logging.warning(f"Failed to read cached result {key}: {e}")
+            return None
+
+    def set(self, key: str, value: bytes):
+        try:
+            self.__get_blob_client__(key).upload_blob(value, overwrite=True)
+        except AzureError as e:
+            logging.warning(f"Failed to write cached result {key}: {e}")
+
+    def __get_blob_client__(self, key: str):
+        return self.storage_factory.get_container_client(
+            self.storage_account_name, self.container_name).get_blob_client(f"{self.prefix}{key}.json")
+
+
+class DocumentResultCache:
+    """Defines a content-addressed cache of `ConfidenceResult` objects produced by classifying or extracting data from documents.
+
+    Results are keyed by a hash of the document bytes and every input that affects the result, so unchanged documents re-processed with the same configuration skip the Azure OpenAI and Document Intelligence requests.
+    """
+
+    def __init__(self, store: Optional[ResultCacheStore] = None):
+        """Initializes a new instance of the DocumentResultCache class.
+
+        :param store: The backing store of cached results. Defaults to an in-memory store.
+        """
+
+        self.store = store or MemoryResultCacheStore()
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def create_key(document_bytes: bytes, **inputs) -> str:
+        """Creates a content-addressed cache key for a document and the inputs used to process it.
+
+        :param document_bytes: The byte array content of the document.
+        :param inputs: The JSON-serializable inputs that affect the result, e.g., the prompt, page range, and model deployment.
+        :return: The SHA-256 hex digest of the document bytes and inputs.
+        """
+
+        key_hash = hashlib.sha256(hashlib.sha256(document_bytes).digest())
+        key_hash.update(json.dumps(
+            inputs, sort_keys=True, default=str).encode("utf-8"))
+        return key_hash.hexdigest()
+
+    def get(self, key: str) -> Optional[ConfidenceResult]:
+        """Retrieves a cached result, recording a cache hit or miss.
+
+        Entries that cannot be deserialized, e.g., written by an incompatible version, are logged and treated as misses.
+
+        :param key: The cache key created using `create_key`.
+        :return: The cached result if present; otherwise, None.
+        """
+
+        value = self.store.get(key)
+
+        result = None
+        if value is not None:
+            try:
+                entry = json.loads(value)
+                result = ConfidenceResult.from_json(entry["result"])
+                total_tokens = entry.get("total_tokens", 0)
+            except DESERIALIZATION_ERRORS as e:
+                logging.warning(f"Failed to read cached result {key}: {e}")
+                result = None
+
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.tokens_saved += total_tokens
+
+        return result
+
+    def set(self, key: str, result: ConfidenceResult, total_tokens: int = 0):
+        """Stores a result in the cache.
+
+        :param key: The cache key created using `create_key`.
+        :param result: The result to store.
+        :param total_tokens: The number of tokens used to produce the result, reported as saved on subsequent hits.
+        """
+
+        entry = {
+            "result": ConfidenceResult.to_json(result),
+            "total_tokens": total_tokens
+        }
+        self.store.set(key, json.dumps(entry).encode("utf-8"))
+
+    def get_stats(self) -> dict[str, float]:
+        """Retrieves the hit and miss counters of the cache.
+
+        :return: A dictionary containing the hits, misses, hit rate, and the number of tokens saved by cache hits.
+        """
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "tokens_saved": self.tokens_saved
+            }
+
+
+def create_document_result_cache(store_type: Optional[str], location: Optional[str] = None, storage_factory: Optional[AzureStorageClientFactory] = None, storage_account_name: Optional[str] = None) -> Optional[DocumentResultCache]:
+    """Creates a document result cache with the specified type of backing store.
+
+    :param store_type: The type of backing store, one of memory, disk, or blob. If None or none, caching is disabled.
+    :param location: The directory of a disk store, or the container name of a blob store.
+    :param storage_factory: The factory to retrieve the container client of a blob store from.
+    :param storage_account_name: The name of the Azure Storage account of a blob store.
+    :return: The document result cache, or None if caching is disabled.
+    """
+
+    store_type = (store_type or "none").lower()
+
+    if store_type == "none":
+        return None
+
+    if store_type == "memory":
+        return DocumentResultCache(MemoryResultCacheStore())
+
+    if store_type == "disk":
+        return DocumentResultCache(DiskResultCacheStore(location or os.path.join(tempfile.gettempdir(), "document-result-cache")))
+
+    if store_type == "blob":
+        if not location or not storage_factory:
+            raise ValueError(
+                "A container name and storage factory are required for a blob result cache store.")
+
+        return DocumentResultCache(BlobResultCacheStore(storage_factory, storage_account_name, location))
+
+    raise ValueError(
+        f"Unsupported result cache store '{store_type}'. Supported stores are: none, memory, disk, blob.")
@@ -0,0 +1,155 @@
+from __future__ import annotations
+from typing import Optional
+from PIL import Image
+import io
+import threading
+
+ENCODER_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp")
+}
+
+
+class PageImageEncodingOptions:
+    """Defines the configuration options for encoding rendered document pages as images for Azure OpenAI requests."""
+
+    def __init__(self, fmt: str = "png", dpi: int = 200, max_dimension: Optional[int] = None, grayscale: bool = False, colors: Optional[int] = None, quality: int = 85):
+        """Initializes a new instance of the PageImageEncodingOptions class.
+
+        :param fmt: The image format to encode pages as, one of png, jpeg, or webp. Default is png.
+        :param dpi: The resolution to rasterize pages at. Default is 200.
+        :param max_dimension: The optional maximum width or height of encoded pages in pixels. Larger pages are downscaled, preserving the aspect ratio.
+        :param grayscale: A flag indicating whether to convert pages to grayscale. Default is False.
+        :param colors: The optional number of colors to quantize pages to, reducing the size of PNG images.
+        :param quality: The quality of lossy formats (jpeg and webp) from 1 to 100. Default is 85.
+        """
+
+        if fmt not in ENCODER_FORMATS:
+            raise ValueError(
+                f"Unsupported image format '{fmt}'. Supported formats are: {', '.join(ENCODER_FORMATS)}.")
+
+        self.fmt = fmt
+        self.dpi = dpi
+        self.max_dimension = max_dimension
+        self.grayscale = grayscale
+        self.colors = colors
+        self.quality = quality
+
+    @property
+    def mime_type(self) -> str:
+        """The MIME type of the encoded page images."""
+
+        return ENCODER_FORMATS[self.fmt][1]
+
+    @property
+    def has_transforms(self) -> bool:
+        """Indicates whether pages are downscaled, converted to grayscale, or quantized when encoded."""
+
+        return bool(self.max_dimension or self.grayscale or self.colors)
+
+    @staticmethod
+    def thumbnail() -> PageImageEncodingOptions:
+        """Creates options for small grayscale page thumbnails, suitable for classifying the layout of a document rather than reading its content.
+
+        Pages are rasterized at the default resolution and downscaled, so the rendered pages can still be shared with extraction via the page cache.
+        """
+
+        return PageImageEncodingOptions(fmt="jpeg", max_dimension=1024, grayscale=True, quality=70)
+
+
+class EncodedPageImage:
+    """Defines an encoded document page image."""
+
+    def __init__(self, data: bytes, mime_type: str, width: int, height: int):
+        """Initializes a new instance of the EncodedPageImage class.
+
+        :param data: The encoded image bytes.
+        :param mime_type: The MIME type of the encoded image.
+        :param width: The width of the encoded image in pixels.
+        :param height: The height of the encoded image in pixels.
+        """
+
+        self.data = data
+        self.mime_type = mime_type
+        self.width = width
+        self.height = height
+
+
+class PageImageEncoder:
+    """Defines a class for encoding rendered document pages using `PageImageEncodingOptions`, recording the size of encoded pages."""
+
+    def __init__(self):
+        """Initializes a new instance of the PageImageEncoder class."""
+
+        self.pages_encoded = 0
+        self.source_bytes = 0
+        self.encoded_bytes = 0
+        self._lock = threading.Lock()
+
+    def encode(self, page: bytes, options: Optional[PageImageEncodingOptions] = None) -> EncodedPageImage:
+        """Encodes the specified rendered page image bytes.
+
+        :param page: The rendered image bytes of the page.
+        :param options: The options for encoding the page. Defaults to full-resolution PNG.
+        :return: The encoded page image.
+        """
+
+        options = options or PageImageEncodingOptions()
+
+        with Image.open(io.BytesIO(page)) as image:
+            # Rendered pages already in the requested format are used as-is.
+            if not options.has_transforms and image.format == ENCODER_FORMATS[options.fmt][0]:
+                encoded = EncodedPageImage(
+                    page, options.mime_type, image.width, image.height)
+            else:
+                encoded = self.__encode_image__(image, options)
+
+        with self._lock:
+            self.pages_encoded += 1
+            self.source_bytes += len(page)
+            self.encoded_bytes += len(encoded.data)
+
+        return encoded
+
+    def get_stats(self) -> dict[str, float]:
+        """Retrieves the size metrics of encoded pages.
+
+        :return: A dictionary containing the number of pages encoded and the average rendered and encoded bytes per page.
+        """
+
+        with self._lock:
+            pages = self.pages_encoded or 1
+            return {
+                "pages": self.pages_encoded,
+                "source_bytes_per_page": self.source_bytes / pages,
+                "encoded_bytes_per_page": self.encoded_bytes / pages,
+                "compression_ratio": self.source_bytes / self.encoded_bytes if self.encoded_bytes else 0.0
+            }
+
+    def __encode_image__(self, image: Image.Image, options: PageImageEncodingOptions) -> EncodedPageImage:
+        if options.max_dimension and max(image.size) > options.max_dimension:
+            image = image.copy()
+            image.thumbnail(
+                (options.max_dimension, options.max_dimension), Image.Resampling.LANCZOS)
+
+        if options.grayscale:
+            image = image.convert("L")
+        elif image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        save_kwargs = {}
+        if options.fmt == "png":
+            if options.colors:
+                image = image.quantize(colors=options.colors)
+            save_kwargs["optimize"] = True
+        else:
+            save_kwargs["quality"] = options.quality
+
+        byteIO = io.BytesIO()
+        image.save(byteIO, format=ENCODER_FORMATS[options.fmt][0], **save_kwargs)
+
+        return EncodedPageImage(byteIO.getvalue(), options.mime_type, image.width, image.height)
+
+
+default_page_encoder = PageImageEncoder()
@@ -8,8 +8,9 @@ from shared.workflows.workflow_result import WorkflowResult
 from documents.workflows import process_document_workflow
 from documents.models.document_folder import DocumentFolders
 from documents.models.document_batch_request import DocumentBatchRequest
+from shared.workflows.task_scheduler import task_all_bounded
+from functools import partial
 import azure.durable_functions as df
-from azure.durable_functions.models.Task import TaskBase
 import azure.functions as func
 import logging
 from documents.activities import get_document_folders
@@ -71,7 +72,7 @@ def run(context: df.DurableOrchestrationContext):
     """Orchestrates the processing of a batch of document folders in a Storage container.
 
     :param context: The Durable Orchestration Context containing the input data for the workflow.
-    :return: The `WorkflowResult` of the workflow operation containing the validation messages and activity results.
+    :return: The `WorkflowResult` of the workflow operation containing the validation messages and activity results of the last page of folders, and a summary of all the folders processed.
     """
 
     # Step 1: Extract the input from the context
@@ -86,25 +87,39 @@ def run(context: df.DurableOrchestrationContext):
 
     result.add_message("DocumentBatchRequest.validate", "input is valid")
 
-    # Step 3: Get the document folders from the blob container
+    # Step 3: Get the next page of document folders from the blob container
     document_folders: DocumentFolders = yield context.call_activity(get_document_folders.name, input)
 
     result.add_message(get_document_folders.name,
                        f"Retrieved {len(document_folders.folders)} document folders.")
 
-    # Step 4: Process the documents in each folder.
-    process_document_tasks: list[TaskBase] = []
-    for folder in document_folders.folders:
-        process_document_task = context.call_sub_orchestrator(
-            process_document_workflow.name, folder)
-        process_document_tasks.append(process_document_task)
+    # Step 4: Process the documents in each folder, keeping a bounded number of sub-orchestrations in flight.
+    folders = document_folders.folders
 
-    yield context.task_all(process_document_tasks)
+    folder_results = yield from task_all_bounded(context, [
+        partial(context.call_sub_orchestrator,
+                process_document_workflow.name, folder)
+        for folder in folders
+    ], input.max_concurrent_folders)
 
-    for task in process_document_tasks:
-        task_result = WorkflowResult.model_validate(task.result)
+    # The summary of the folders processed by previous instances is carried forward, as their results are discarded when the orchestration continues as new.
+    summary = input.summary.model_copy(deep=True)
+
+    for folder, folder_result in zip(folders, folder_results):
+        task_result = WorkflowResult.model_validate(folder_result)
         result.add_activity_result(process_document_workflow.name,
                                    "Processed document folder.",
                                    task_result)
+        summary.add_folder_result(folder.name, task_result)
+
+    result.add_message("DocumentBatchSummary", summary.to_str())
+
+    # Step 5: Continue as new with the next page of folders to keep the orchestration history bounded.
+    if document_folders.continuation_token:
+        result.add_message("ContinueAsNew",
+                           f"Processed {len(folders)} folders, continuing with the next page of folders.")
+        context.continue_as_new(
+            input.model_copy(update={"continuation_token": document_folders.continuation_token,
+                                     "summary": summary}))
 
     return result.model_dump()
@@ -5,14 +5,15 @@ The workflows orchestrate the detection of the document type, and if it's an inv
 
 from __future__ import annotations
 from invoices.activities import validate_invoice
-from invoices.models.invoice import Invoice
-from storage.activities import write_bytes_to_blob
+from storage.activities import set_blob_metadata
 from invoices.activities import extract_invoice
-from shared.confidence.confidence_result import ConfidenceResult
 from shared.workflows.workflow_result import WorkflowResult
 from documents.activities import classify_document
-from documents.models.document_classification import Classifications, ClassificationDefinitions, ClassificationDefinition
-from documents.models.document_folder import DocumentFolder
+from documents.models.document_classification import ClassificationDefinitions, ClassificationDefinition
+from documents.models.document_folder import DocumentFolder, SOURCE_ETAG_METADATA_KEY
+from typing import Optional
+from shared.workflows.task_scheduler import task_all_bounded
+from functools import partial
 import azure.durable_functions as df
 from shared import app_settings
 
@@ -21,6 +22,22 @@ bp = df.Blueprint()
 
 CONFIDENCE_THRESHOLD = 0.8
 
+CLASSIFICATION_DEFINITIONS = ClassificationDefinitions(
+    classifications=[
+        ClassificationDefinition(
+            classification="Invoice",
+            description="A document that serves as a bill for goods or services provided, often used for payment processing and record-keeping."
+        ),
+        ClassificationDefinition(
+            classification="Email",
+            description="A digital message sent electronically, typically containing text, images, or attachments."
+        ),
+        ClassificationDefinition(
+            classification="None",
+            description="No classification available for the document."
+        ),
+    ])
+
 
 @bp.function_name(name)
 @bp.orchestration_trigger(context_name="context", orchestration=name)
@@ -37,52 +54,36 @@ def run(context: df.DurableOrchestrationContext):
 
     result.add_message("DocumentFolder.validate", "input is valid")
 
-    # Step 3: Process each file
-    for document in input.document_file_names:
-        # Classify the document
-        classification: ConfidenceResult[Classifications | None] = yield context.call_activity(
-            classify_document.name,
-            classify_document.Request(
-                container_name=input.container_name,
-                blob_name=document,
-                classification_definitions=ClassificationDefinitions(
-                    classifications=[
-                        ClassificationDefinition(
-                            classification="Invoice",
-                            description="A document that serves as a bill for goods or services provided, often used for payment processing and record-keeping."
-                        ),
-                        ClassificationDefinition(
-                            classification="Email",
-                            description="A digital message sent electronically, typically containing text, images, or attachments."
-                        ),
-                        ClassificationDefinition(
-                            classification="None",
-                            description="No classification available for the document."
-                        ),
-                    ])))
-
-        if not classification or not classification.data:
+    # Tasks are fanned out with bounded concurrency. Results are processed in the order of the inputs, so the orchestration replays deterministically.
+    max_concurrency = input.max_concurrency
+
+    # Step 3: Classify all documents in parallel. Activities store their results in blobs and return only their scores, keeping the orchestration history small.
+    classifications: list[classify_document.Result | None] = yield from task_all_bounded(context, [
+        partial(context.call_activity, classify_document.name, classify_document.Request(
+            container_name=input.container_name,
+            blob_name=document,
+            classification_definitions=CLASSIFICATION_DEFINITIONS,
+            output_blob_name=f"{document}.Classification.json"))
+        for document in input.document_file_names
+    ], max_concurrency)
+
+    classified_documents = []
+    for document, classification in zip(input.document_file_names, classifications):
+        if not classification:
             result.add_error(
                 classify_document.name,
                 f"Failed to classify document {document}.")
             continue
 
-        document_classification_stored = yield context.call_activity(
-            write_bytes_to_blob.name,
-            write_bytes_to_blob.Request(
-                storage_account_name=app_settings.azure_storage_account,
-                container_name=input.container_name,
-                blob_name=f"{document}.Classification.json",
-                content=classification.model_dump_json().encode("utf-8"),
-                overwrite=True))
+        classified_documents.append((document, classification))
 
-        if not document_classification_stored:
-            result.add_error(
-                write_bytes_to_blob.name,
-                f"Failed to store classification for {document}.")
-            continue
+    # Documents with a failed or low-confidence step are not stamped as processed, so they are processed again in incremental mode.
+    failed_documents = set()
 
+    invoice_ranges = []
+    for document, classification in classified_documents:
         if classification.overall_confidence < CONFIDENCE_THRESHOLD:
+            failed_documents.add(document)
             result.add_error(
                 classify_document.name,
                 f"Document {document} classified with low confidence {classification.overall_confidence}.")
@@ -92,79 +93,105 @@ def run(context: df.DurableOrchestrationContext):
             classify_document.name,
             f"Document {document} classified with confidence {classification.overall_confidence}.")
 
-        if len(classification.data.page_classifications) == 0:
+        if len(classification.page_classifications) == 0:
             result.add_message(
                 classify_document.name,
                 f"Document {document} has no valid classifications.")
             continue
 
-        for page_classification in classification.data.page_classifications:
+        for page_classification in classification.page_classifications:
             result.add_message(
                 classify_document.name,
                 f"Document {document} classified as {page_classification.classification} from page {page_classification.image_range_start} to {page_classification.image_range_end}.")
 
             # If the document is classified as an invoice, extract the invoice data
             if page_classification.classification == "Invoice":
-                invoice: ConfidenceResult[Invoice | None] = yield context.call_activity(
-                    extract_invoice.name,
-                    extract_invoice.Request(
-                        container_name=input.container_name,
-                        blob_name=document,
-                        page_range_start=page_classification.image_range_start,
-                        page_range_end=page_classification.image_range_end))
-
-                if not invoice or not invoice.data:
-                    result.add_error(
-                        extract_invoice.name,
-                        f"Failed to extract invoice data for {document} from page {page_classification.image_range_start} to {page_classification.image_range_end}.")
-                    continue
-
-                invoice_stored = yield context.call_activity(
-                    write_bytes_to_blob.name,
-                    write_bytes_to_blob.Request(
-                        storage_account_name=app_settings.azure_storage_account,
-                        container_name=input.container_name,
-                        blob_name=f"{document}.{page_classification.image_range_start}-{page_classification.image_range_end}.Data.json",
-                        content=invoice.model_dump_json().encode("utf-8"),
-                        overwrite=True))
-
-                if not invoice_stored:
-                    result.add_error(
-                        write_bytes_to_blob.name,
-                        f"Failed to store invoice data for {document} from page {page_classification.image_range_start} to {page_classification.image_range_end}.")
-                    continue
-
-                if invoice.overall_confidence < CONFIDENCE_THRESHOLD:
-                    result.add_error(
-                        extract_invoice.name,
-                        f"Invoice {document} extracted with low confidence {invoice.overall_confidence}.")
-                    continue
-
-                result.add_message(
-                    extract_invoice.name,
-                    f"Invoice {document} extracted with confidence {invoice.overall_confidence}.")
-
-                invoice_validation: validate_invoice.Result = yield context.call_activity(
-                    validate_invoice.name,
-                    validate_invoice.Request(
-                        name=document,
-                        data=invoice.data))
-
-                result.merge(invoice_validation)
-
-                yield context.call_activity(
-                    write_bytes_to_blob.name,
-                    write_bytes_to_blob.Request(
-                        storage_account_name=app_settings.azure_storage_account,
-                        container_name=input.container_name,
-                        blob_name=f"{document}.{page_classification.image_range_start}-{page_classification.image_range_end}.Validation.json",
-                        content=validate_invoice.Result.to_json(
-                            invoice_validation).encode("utf-8"),
-                        overwrite=True))
+                invoice_ranges.append((document, page_classification))
             else:
                 result.add_message(
                     classify_document.name,
                     f"Skipping {page_classification.classification} document {document}.")
-                continue
+
+    # Step 4: Extract and store the data for every invoice range in parallel
+    invoices: list[extract_invoice.Result | None] = yield from task_all_bounded(context, [
+        partial(context.call_activity, extract_invoice.name, extract_invoice.Request(
+            container_name=input.container_name,
+            blob_name=document,
+            page_range_start=page_classification.image_range_start,
+            page_range_end=page_classification.image_range_end,
+            output_blob_name=f"{document}.{page_classification.image_range_start}-{page_classification.image_range_end}.Data.json",
+            output_metadata=get_output_metadata(input, document)))
+        for document, page_classification in invoice_ranges
+    ], max_concurrency)
+
+    confident_invoices = []
+    for (document, page_classification), invoice in zip(invoice_ranges, invoices):
+        if not invoice:
+            failed_documents.add(document)
+            result.add_error(
+                extract_invoice.name,
+                f"Failed to extract invoice data for {document} from page {page_classification.image_range_start} to {page_classification.image_range_end}.")
+            continue
+
+        if invoice.overall_confidence < CONFIDENCE_THRESHOLD:
+            failed_documents.add(document)
+            result.add_error(
+                extract_invoice.name,
+                f"Invoice {document} extracted with low confidence {invoice.overall_confidence}.")
+            continue
+
+        result.add_message(
+            extract_invoice.name,
+            f"Invoice {document} extracted with confidence {invoice.overall_confidence}.")
+
+        confident_invoices.append((document, page_classification, invoice))
+
+    # Step 5: Validate the stored invoices and store the validations in parallel
+    invoice_validations: list[validate_invoice.Result] = yield from task_all_bounded(context, [
+        partial(context.call_activity, validate_invoice.name, validate_invoice.Request(
+            name=document,
+            container_name=input.container_name,
+            blob_name=invoice.blob_name,
+            output_blob_name=f"{document}.{page_classification.image_range_start}-{page_classification.image_range_end}.Validation.json",
+            output_metadata=get_output_metadata(input, document)))
+        for document, page_classification, invoice in confident_invoices
+    ], max_concurrency)
+
+    for invoice_validation in invoice_validations:
+        result.merge(invoice_validation)
+
+    # Step 6: Stamp the stored classifications of fully processed documents with their ETag in parallel, marking the documents as processed. This is done last, so documents are only marked once all their outputs are stored.
+    processed_documents = []
+    for document, _ in classified_documents:
+        metadata = get_output_metadata(input, document)
+        if metadata and document not in failed_documents:
+            processed_documents.append((document, metadata))
+
+    classifications_stamped: list[bool] = yield from task_all_bounded(context, [
+        partial(context.call_activity, set_blob_metadata.name, set_blob_metadata.Request(
+            storage_account_name=app_settings.azure_storage_account,
+            container_name=input.container_name,
+            blob_name=f"{document}.Classification.json",
+            metadata=metadata))
+        for document, metadata in processed_documents
+    ], max_concurrency)
+
+    for (document, _), classification_stamped in zip(processed_documents, classifications_stamped):
+        if not classification_stamped:
+            result.add_error(
+                set_blob_metadata.name,
+                f"Failed to mark document {document} as processed.")
 
     return result.model_dump()
+
+
+def get_output_metadata(input: DocumentFolder, document: str) -> Optional[dict[str, str]]:
+    """Creates the metadata of an output blob, recording the ETag of the document it was produced from.
+
+    :param input: The document folder containing the ETags of the documents.
+    :param document: The blob name of the document.
+    :return: The metadata of the output blob, or None if the ETag of the document is unknown.
+    """
+
+    etag = input.document_etags.get(document)
+    return {SOURCE_ETAG_METADATA_KEY: etag} if etag else None
@@ -3,6 +3,11 @@ import azure.durable_functions as df
 from documents.setup import register_documents
 from invoices.setup import register_invoices
 from storage.setup import register_storage
+from documents.services.document_page_renderer import default_page_renderer
+from shared import app_settings
+
+# Pages are rasterized in the calling thread unless a pool of rendering worker processes is enabled.
+default_page_renderer.max_workers = app_settings.document_render_max_workers
 
 app = df.DFApp(http_auth_level=func.AuthLevel.ANONYMOUS)
 
@@ -4,13 +4,20 @@ This module provides the blueprint for an Azure Function activity that extracts
 """
 
 from __future__ import annotations
-from pydantic import Field
-from documents.services.document_data_extractor import DocumentDataExtractor, DocumentDataExtractorOptions
+from pydantic import BaseModel, Field
+from documents.services.document_data_extractor import AsyncDocumentDataExtractor, DocumentDataExtractorOptions
+from documents.services.document_page_cache import DocumentPageCache, default_page_cache
+from documents.services.page_image_encoder import default_page_encoder
+from documents.services.document_analysis_cache import default_analysis_cache
+from shared.clients.ai_client_registry import default_client_registry
+from shared.clients.adaptive_polling import default_polling_metrics
+from shared.clients.rate_limiter import RateLimitOptions, default_rate_limiter
+from shared.clients.deployment_router import OpenAIDeployment, default_deployment_router
 from invoices.models.invoice import Invoice
 from shared.workflows.base_request import BaseRequest
 from shared.workflows.validation_result import ValidationResult
-from storage.services.azure_storage_client_factory import AzureStorageClientFactory
-from shared.confidence.confidence_result import ConfidenceResult
+from documents.services.document_result_cache import create_document_result_cache
+from storage.services.azure_storage_client_factory import AzureStorageClientFactory, AsyncAzureStorageClientFactory
 import shared.identity as identity
 from shared import app_settings
 import azure.durable_functions as df
@@ -19,17 +26,30 @@ from typing import Optional
 
 name = "ExtractInvoice"
 bp = df.Blueprint()
-storage_factory = AzureStorageClientFactory(identity.default_credential)
-document_extractor = DocumentDataExtractor(identity.default_credential)
+storage_factory = AsyncAzureStorageClientFactory(
+    identity.default_async_credential)
+result_cache = create_document_result_cache(
+    app_settings.document_result_cache_store,
+    app_settings.document_result_cache_location,
+    AzureStorageClientFactory(identity.default_credential),
+    app_settings.azure_storage_account)
+openai_deployments = OpenAIDeployment.from_settings(
+    app_settings.azure_openai_chat_deployments,
+    app_settings.azure_openai_endpoint,
+    app_settings.azure_openai_chat_deployment)
+document_extractor = AsyncDocumentDataExtractor(
+    identity.default_async_credential, result_cache=result_cache)
 
 
 @bp.function_name(name)
 @bp.activity_trigger(input_name="input", activity=name)
-def run(input: Request) -> ConfidenceResult[Invoice]:
+async def run(input: Request) -> Result:
     """Extracts invoice data from a document using Azure OpenAI.
 
+    The extracted invoice data is stored in the output blob, so only its location and overall confidence are returned to the orchestration.
+
     :param input: The request containing the container name and blob name of the document.
-    :return: The extracted invoice data if successful; otherwise, None.
+    :return: The summary of the extracted invoice data if successful; otherwise, None.
     """
 
     validation_result = input.validate()
@@ -37,10 +57,10 @@ def run(input: Request) -> ConfidenceResult[Invoice]:
         logging.error(f"Invalid input: {validation_result.to_str()}")
         return None
 
-    blob_content = storage_factory.get_blob_content(
+    blob_content, blob_etag = await storage_factory.get_blob_content_and_etag(
         app_settings.azure_storage_account, input.container_name, input.blob_name)
 
-    data = document_extractor.from_bytes(
+    data = await document_extractor.from_bytes(
         blob_content,
         Invoice,
         DocumentDataExtractorOptions(
@@ -56,10 +76,43 @@ def run(input: Request) -> ConfidenceResult[Invoice]:
             deployment_name=app_settings.azure_openai_chat_deployment,
             max_tokens=4096,
             temperature=0.1,
-            top_p=0.1
-        ))
+            top_p=0.1,
+            rate_limit=RateLimitOptions(
+                requests_per_minute=app_settings.azure_openai_chat_requests_per_minute,
+                tokens_per_minute=app_settings.azure_openai_chat_tokens_per_minute),
+            deployments=openai_deployments
+        ),
+        cache_key=DocumentPageCache.create_key(input.container_name, input.blob_name, blob_etag))
+
+    logging.debug(
+        f"Document page cache stats: {default_page_cache.get_stats()}")
+    logging.debug(
+        f"Document page encoder stats: {default_page_encoder.get_stats()}")
+    logging.debug(
+        f"AI client registry stats: {default_client_registry.get_stats()}")
+    logging.debug(
+        f"Azure OpenAI rate limiter stats: {default_rate_limiter.get_stats()}")
+    logging.debug(
+        f"Azure OpenAI deployment router stats: {default_deployment_router.get_stats()}")
+    logging.debug(
+        f"Document analysis cache stats: {default_analysis_cache.get_stats()}")
+    logging.debug(
+        f"Document analysis polling stats: {default_polling_metrics.get_stats()}")
+    if result_cache:
+        logging.debug(
+            f"Document result cache stats: {result_cache.get_stats()}")
+
+    if not data or not data.data:
+        return None
 
-    return data
+    if input.output_blob_name:
+        await storage_factory.upload_blob_content(
+            app_settings.azure_storage_account, input.container_name, input.output_blob_name,
+            data.model_dump_json().encode("utf-8"), metadata=input.output_metadata)
+
+    return Result(
+        blob_name=input.output_blob_name,
+        overall_confidence=data.overall_confidence)
 
 
 class Request(BaseRequest):
@@ -73,6 +126,12 @@ class Request(BaseRequest):
         default=None, description="The starting page number of the document to extract data from.")
     page_range_end: Optional[int] = Field(
         default=None, description="The ending page number of the document to extract data from.")
+    output_blob_name: Optional[str] = Field(
+        default=None,
+        description="The optional name of the blob in the same container to store the extracted invoice data in.")
+    output_metadata: Optional[dict[str, str]] = Field(
+        default=None,
+        description="The optional metadata to set on the output blob.")
 
     def validate(self) -> ValidationResult:
         result = ValidationResult()
@@ -112,3 +171,25 @@ class Request(BaseRequest):
         https://learn.microsoft.com/en-us/azure/azure-functions/durable/durable-functions-serialization-and-persistence?tabs=python
         """
         return Request.model_validate_json(json_str)
+
+
+class Result(BaseModel):
+    """Defines the result payload for the `ExtractInvoice` activity."""
+
+    blob_name: Optional[str] = Field(
+        default=None,
+        description="The name of the blob the extracted invoice data was stored in, if an output blob was requested.")
+    overall_confidence: float = Field(
+        description="The overall confidence score of the extracted invoice data.")
+
+    @staticmethod
+    def to_json(obj: Result) -> str:
+        """Converts the object instance to a JSON string. Required for serialization in Azure Functions when passing the result between functions."""
+
+        return obj.model_dump_json()
+
+    @staticmethod
+    def from_json(json_str: str) -> Result:
+        """Converts a JSON string to the object instance. Required for deserialization in Azure Functions when receiving the result from another function."""
+
+        return Result.model_validate_json(json_str)
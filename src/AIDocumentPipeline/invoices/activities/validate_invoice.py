@@ -6,22 +6,29 @@ This module provides the blueprint for an Azure Function activity that validates
 from __future__ import annotations
 from pydantic import Field
 from enum import Flag, auto
+from typing import Optional
 from shared.workflows.workflow_result import WorkflowResult
 from invoices.models.invoice import Invoice
 from shared.workflows.base_request import BaseRequest
 from shared.workflows.validation_result import ValidationResult
+from storage.services.azure_storage_client_factory import AsyncAzureStorageClientFactory
+import shared.identity as identity
+from shared import app_settings
 import azure.durable_functions as df
+import json
 
 name = "ValidateInvoice"
 bp = df.Blueprint()
+storage_factory = AsyncAzureStorageClientFactory(
+    identity.default_async_credential)
 
 
 @bp.function_name(name)
 @bp.activity_trigger(input_name="input", activity=name)
-def run(input: Request) -> Result:
+async def run(input: Request) -> Result:
     """Validates extracted data from an invoice for expected fields.
 
-    :param input: The request containing the extracted invoice data.
+    :param input: The request containing the extracted invoice data, or the blob the extracted invoice data is stored in.
     :return: The validation result.
     """
 
@@ -33,6 +40,12 @@ def run(input: Request) -> Result:
         return result
 
     data = input.data
+    if data is None:
+        # The blob contains the extraction confidence result stored by the `ExtractInvoice` activity.
+        content = await storage_factory.get_blob_content(
+            app_settings.azure_storage_account, input.container_name, input.blob_name)
+        data = Invoice.model_validate(json.loads(content)["data"])
+
     if not data.invoice_id:
         result.status |= ResultStatus.InvoiceIdMissing
         result.add_error(name, "invoice_id is required")
@@ -44,6 +57,11 @@ def run(input: Request) -> Result:
     else:
         result.status = ResultStatus.Fail
 
+    if input.output_blob_name:
+        await storage_factory.upload_blob_content(
+            app_settings.azure_storage_account, input.container_name, input.output_blob_name,
+            Result.to_json(result).encode("utf-8"), metadata=input.output_metadata)
+
     return result
 
 
@@ -70,8 +88,25 @@ class Request(BaseRequest):
     name: str = Field(
         description="The name of the invoice blob."
     )
-    data: Invoice = Field(
-        description="The extracted invoice data."
+    data: Optional[Invoice] = Field(
+        default=None,
+        description="The extracted invoice data. Required if no blob name is provided."
+    )
+    container_name: Optional[str] = Field(
+        default=None,
+        description="The name of the container within the storage account of the blobs."
+    )
+    blob_name: Optional[str] = Field(
+        default=None,
+        description="The name of the blob containing the extracted invoice data, as stored by the `ExtractInvoice` activity. Required if no data is provided."
+    )
+    output_blob_name: Optional[str] = Field(
+        default=None,
+        description="The optional name of the blob in the same container to store the validation result in."
+    )
+    output_metadata: Optional[dict[str, str]] = Field(
+        default=None,
+        description="The optional metadata to set on the output blob."
     )
 
     def validate(self) -> ValidationResult:
@@ -80,8 +115,12 @@ class Request(BaseRequest):
         if not self.name:
             result.add_error("name is required")
 
-        if not self.data:
-            result.add_error("data is required")
+        if not self.data and not self.blob_name:
+            result.add_error("data or blob_name is required")
+
+        if (self.blob_name or self.output_blob_name) and not self.container_name:
+            result.add_error(
+                "container_name is required when blob_name or output_blob_name is provided")
 
         return result
 
@@ -14,8 +14,20 @@ azure_aiservices_endpoint = config.get_value(
 azure_openai_endpoint = config.get_value("AZURE_OPENAI_ENDPOINT", None)
 azure_openai_chat_deployment = config.get_value(
     "AZURE_OPENAI_CHAT_DEPLOYMENT", None)
+azure_openai_chat_deployments = config.get_value(
+    "AZURE_OPENAI_CHAT_DEPLOYMENTS", None)
+azure_openai_chat_requests_per_minute = int(config.get_value(
+    "AZURE_OPENAI_CHAT_REQUESTS_PER_MINUTE", None) or 0) or None
+azure_openai_chat_tokens_per_minute = int(config.get_value(
+    "AZURE_OPENAI_CHAT_TOKENS_PER_MINUTE", None) or 0) or None
 azure_client_id = config.get_value("AZURE_CLIENT_ID", None)
 azure_storage_account = config.get_value(
     "AZURE_STORAGE_ACCOUNT", None)
 azure_storage_queues_connection_string = config.get_value(
     "AZURE_STORAGE_QUEUES_CONNECTION_STRING", None)
+document_render_max_workers = int(config.get_value(
+    "DOCUMENT_RENDER_MAX_WORKERS", None) or 1)
+document_result_cache_store = config.get_value(
+    "DOCUMENT_RESULT_CACHE_STORE", "memory")
+document_result_cache_location = config.get_value(
+    "DOCUMENT_RESULT_CACHE_LOCATION", None)
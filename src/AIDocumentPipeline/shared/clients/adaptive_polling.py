@@ -0,0 +1,149 @@
+"""Defines adaptive polling strategies for Azure SDK long-running operations, such as Azure AI Document Intelligence analysis.
+
+Polling starts with a short delay so small documents complete quickly, and backs off for larger documents to reduce the number of status requests, with an optional deadline per operation.
+"""
+
+from __future__ import annotations
+from typing import Optional
+from azure.core.polling.base_polling import LROBasePolling
+from azure.core.polling.async_base_polling import AsyncLROBasePolling
+from shared.clients.retry_after import parse_retry_after
+import threading
+import time
+
+
+class AdaptivePollingOptions:
+    """Defines the configuration options for adaptively polling a long-running operation."""
+
+    def __init__(self, initial_delay: float = 0.5, backoff_factor: float = 1.5, max_delay: float = 5.0, respect_retry_after: bool = True, deadline: Optional[float] = None):
+        """Initializes a new instance of the AdaptivePollingOptions class.
+
+        :param initial_delay: The number of seconds to wait before the first status request. Default is 0.5.
+        :param backoff_factor: The factor the delay is multiplied by after each status request. Default is 1.5.
+        :param max_delay: The maximum number of seconds to wait between status requests. Default is 5.
+        :param respect_retry_after: A flag indicating whether the service's Retry-After hint overrides the backoff delay, capped at the maximum delay. Default is True.
+        :param deadline: The optional maximum number of seconds to wait for the operation to complete. A `TimeoutError` is raised when exceeded.
+        """
+
+        self.initial_delay = initial_delay
+        self.backoff_factor = backoff_factor
+        self.max_delay = max_delay
+        self.respect_retry_after = respect_retry_after
+        self.deadline = deadline
+
+
+class PollingMetrics:
+    """Defines thread-safe counters of the time long-running operations spend waiting between status requests versus running in total."""
+
+    def __init__(self):
+        """Initializes a new instance of the PollingMetrics class."""
+
+        self.operations = 0
+        self.status_requests = 0
+        self.deadlines_exceeded = 0
+        self.wait_seconds = 0.0
+        self.operation_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float):
+        """Records a wait between status requests.
+
+        :param seconds: The number of seconds waited.
+        """
+
+        with self._lock:
+            self.status_requests += 1
+            self.wait_seconds += seconds
+
+    def record_operation(self, seconds: float, deadline_exceeded: bool = False):
+        """Records a completed long-running operation.
+
+        :param seconds: The total number of seconds from starting to polling the operation to its completion.
+        :param deadline_exceeded: A flag indicating whether the operation was abandoned as it exceeded its deadline.
+        """
+
+        with self._lock:
+            self.operations += 1
+            self.operation_seconds += seconds
+            if deadline_exceeded:
+                self.deadlines_exceeded += 1
+
+    def get_stats(self) -> dict[str, float]:
+        """Retrieves the polling metrics.
+
+        :return: A dictionary containing the number of operations and status requests, and the average seconds spent waiting versus running per operation.
+        """
+
+        with self._lock:
+            operations = self.operations or 1
+            return {
+                "operations": self.operations,
+                "status_requests": self.status_requests,
+                "deadlines_exceeded": self.deadlines_exceeded,
+                "wait_seconds_per_operation": self.wait_seconds / operations,
+                "operation_seconds_per_operation": self.operation_seconds / operations,
+                "wait_ratio": self.wait_seconds / self.operation_seconds if self.operation_seconds else 0.0
+            }
+
+
+class AdaptivePollingBase:
+    """Defines the delay calculation and metrics shared by the synchronous and asynchronous adaptive polling methods."""
+
+    def __init__(self, options: Optional[AdaptivePollingOptions] = None, metrics: Optional[PollingMetrics] = None, **kwargs):
+        """Initializes a new instance of the adaptive polling method.
+
+        :param options: The options for adaptively polling the operation. Defaults to `AdaptivePollingOptions()`.
+        :param metrics: The metrics to record the polling time to. Defaults to the process-wide polling metrics.
+        :param kwargs: The additional arguments of the Azure Core polling method, e.g., `path_format_arguments`.
+        """
+
+        self.options = options or AdaptivePollingOptions()
+        self.metrics = metrics or default_polling_metrics
+        self._next_delay = self.options.initial_delay
+        self._started_at = time.monotonic()
+        super().__init__(timeout=self.options.initial_delay, **kwargs)
+
+    def _extract_delay(self) -> float:
+        delay = self._next_delay
+        self._next_delay = min(
+            self._next_delay * self.options.backoff_factor, self.options.max_delay)
+
+        if self.options.respect_retry_after:
+            retry_after = parse_retry_after(
+                self._pipeline_response.http_response.headers if self._pipeline_response else None)
+            if retry_after:
+                delay = min(retry_after, self.options.max_delay)
+
+        if self.options.deadline is not None:
+            remaining = self.options.deadline - self.__get_elapsed__()
+            if remaining <= 0:
+                self.metrics.record_operation(
+                    self.__get_elapsed__(), deadline_exceeded=True)
+                raise TimeoutError(
+                    f"The long-running operation did not complete within the deadline of {self.options.deadline} seconds.")
+            delay = min(delay, remaining)
+
+        self.metrics.record_wait(delay)
+        return delay
+
+    def __get_elapsed__(self) -> float:
+        return time.monotonic() - self._started_at
+
+
+class AdaptiveLROPolling(AdaptivePollingBase, LROBasePolling):
+    """Defines an adaptive polling method for synchronous Azure SDK long-running operations, passed as the `polling` argument of a `begin_*` method."""
+
+    def run(self) -> None:
+        super().run()
+        self.metrics.record_operation(self.__get_elapsed__())
+
+
+class AsyncAdaptiveLROPolling(AdaptivePollingBase, AsyncLROBasePolling):
+    """Defines an adaptive polling method for asynchronous Azure SDK long-running operations, passed as the `polling` argument of a `begin_*` method."""
+
+    async def run(self) -> None:
+        await super().run()
+        self.metrics.record_operation(self.__get_elapsed__())
+
+
+default_polling_metrics = PollingMetrics()
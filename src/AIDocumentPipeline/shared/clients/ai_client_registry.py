@@ -0,0 +1,230 @@
+"""Defines a process-wide registry of Azure OpenAI and Azure AI Document Intelligence clients.
+
+Clients are created once per endpoint and API version and reused across activity invocations, sharing HTTP connection pools and cached bearer tokens.
+"""
+
+from typing import Optional
+import threading
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from azure.core.credentials import TokenCredential
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.core.pipeline.transport import RequestsTransport
+from azure.identity import get_bearer_token_provider
+from azure.identity.aio import get_bearer_token_provider as get_async_bearer_token_provider
+from azure.ai.documentintelligence import DocumentIntelligenceClient
+from azure.ai.documentintelligence.aio import DocumentIntelligenceClient as AsyncDocumentIntelligenceClient
+from openai import AzureOpenAI, AsyncAzureOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+
+DEFAULT_OPENAI_API_VERSION = "2024-12-01-preview"
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+
+class AIClientRegistry:
+    """Defines a thread-safe registry of Azure AI service clients keyed by endpoint and API version."""
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20, keepalive_expiry: float = 30.0):
+        """Initializes a new instance of the AIClientRegistry class.
+
+        :param max_connections: The maximum number of concurrent connections per shared connection pool. Default is 100.
+        :param max_keepalive_connections: The maximum number of idle connections kept alive per shared connection pool. Default is 20.
+        :param keepalive_expiry: The number of seconds an idle connection is kept alive. Default is 30.
+        """
+
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.clients_created = 0
+        self.clients_reused = 0
+        self.token_requests = 0
+        self._clients: dict[tuple, object] = {}
+        self._token_providers: dict[int, callable] = {}
+        self._http_client: Optional[httpx.Client] = None
+        self._async_http_client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[RequestsTransport] = None
+        self._lock = threading.Lock()
+
+    def get_openai_client(self, credential: TokenCredential, endpoint: str, api_version: str = DEFAULT_OPENAI_API_VERSION) -> AzureOpenAI:
+        """Retrieves a shared `AzureOpenAI` client for the specified endpoint and API version.
+
+        :param credential: The Azure credential to use for authenticating with the Azure OpenAI service.
+        :param endpoint: The Azure OpenAI endpoint.
+        :param api_version: The Azure OpenAI API version. Default is 2024-12-01-preview.
+        :return: The shared `AzureOpenAI` client.
+        """
+
+        return self.__get_or_create__(
+            ("openai", id(credential), endpoint, api_version),
+            lambda: AzureOpenAI(
+                api_version=api_version,
+                azure_endpoint=endpoint,
+                azure_ad_token_provider=self.__get_token_provider__(
+                    credential),
+                # Retries are handled by the rate limiter, which paces them across all requests to the deployment.
+                max_retries=0,
+                http_client=self.__get_http_client__()))
+
+    def get_document_intelligence_client(self, credential: TokenCredential, endpoint: str, api_version: Optional[str] = None) -> DocumentIntelligenceClient:
+        """Retrieves a shared `DocumentIntelligenceClient` for the specified endpoint and API version.
+
+        :param credential: The Azure credential to use for authenticating with the Azure AI Document Intelligence service.
+        :param endpoint: The Azure AI services endpoint.
+        :param api_version: The optional Azure AI Document Intelligence API version. Defaults to the SDK's version.
+        :return: The shared `DocumentIntelligenceClient`.
+        """
+
+        kwargs = {"api_version": api_version} if api_version else {}
+
+        return self.__get_or_create__(
+            ("documentintelligence", id(credential), endpoint, api_version),
+            lambda: DocumentIntelligenceClient(
+                endpoint=endpoint,
+                credential=credential,
+                transport=self.__get_transport__(),
+                **kwargs))
+
+    def get_async_openai_client(self, credential: AsyncTokenCredential, endpoint: str, api_version: str = DEFAULT_OPENAI_API_VERSION) -> AsyncAzureOpenAI:
+        """Retrieves a shared `AsyncAzureOpenAI` client for the specified endpoint and API version.
+
+        Asynchronous clients are bound to the event loop they are first used on, which is shared by all async activities in a Functions worker.
+
+        :param credential: The asynchronous Azure credential to use for authenticating with the Azure OpenAI service.
+        :param endpoint: The Azure OpenAI endpoint.
+        :param api_version: The Azure OpenAI API version. Default is 2024-12-01-preview.
+        :return: The shared `AsyncAzureOpenAI` client.
+        """
+
+        return self.__get_or_create__(
+            ("openai-async", id(credential), endpoint, api_version),
+            lambda: AsyncAzureOpenAI(
+                api_version=api_version,
+                azure_endpoint=endpoint,
+                azure_ad_token_provider=self.__get_async_token_provider__(
+                    credential),
+                max_retries=0,
+                http_client=self.__get_async_http_client__()))
+
+    def get_async_document_intelligence_client(self, credential: AsyncTokenCredential, endpoint: str, api_version: Optional[str] = None) -> AsyncDocumentIntelligenceClient:
+        """Retrieves a shared asynchronous `DocumentIntelligenceClient` for the specified endpoint and API version.
+
+        :param credential: The asynchronous Azure credential to use for authenticating with the Azure AI Document Intelligence service.
+        :param endpoint: The Azure AI services endpoint.
+        :param api_version: The optional Azure AI Document Intelligence API version. Defaults to the SDK's version.
+        :return: The shared asynchronous `DocumentIntelligenceClient`.
+        """
+
+        kwargs = {"api_version": api_version} if api_version else {}
+
+        # The client's aiohttp session is opened on first use and kept open, so connections are reused across invocations.
+        return self.__get_or_create__(
+            ("documentintelligence-async", id(credential), endpoint, api_version),
+            lambda: AsyncDocumentIntelligenceClient(
+                endpoint=endpoint,
+                credential=credential,
+                **kwargs))
+
+    def get_stats(self) -> dict[str, int]:
+        """Retrieves the pool sizes and reuse counters of the registry.
+
+        :return: A dictionary containing the number of clients, the client reuse counts, the number of bearer token requests, and the connection pool limits.
+        """
+
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "clients_created": self.clients_created,
+                "clients_reused": self.clients_reused,
+                "token_requests": self.token_requests,
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections
+            }
+
+    def __get_or_create__(self, key: tuple, factory: callable):
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.clients_reused += 1
+                return client
+
+        # Create outside of the lock as client construction may be slow, keeping the first client created on a race.
+        client = factory()
+
+        with self._lock:
+            existing_client = self._clients.get(key)
+            if existing_client is not None:
+                self.clients_reused += 1
+                return existing_client
+
+            self._clients[key] = client
+            self.clients_created += 1
+            return client
+
+    def __get_token_provider__(self, credential: TokenCredential) -> callable:
+        with self._lock:
+            token_provider = self._token_providers.get(id(credential))
+            if token_provider is None:
+                # The bearer token policy behind the provider caches the token until shortly before it expires.
+                bearer_token_provider = get_bearer_token_provider(
+                    credential, COGNITIVE_SERVICES_SCOPE)
+
+                def token_provider() -> str:
+                    with self._lock:
+                        self.token_requests += 1
+                    return bearer_token_provider()
+
+                self._token_providers[id(credential)] = token_provider
+
+            return token_provider
+
+    def __get_async_token_provider__(self, credential: AsyncTokenCredential) -> callable:
+        with self._lock:
+            token_provider = self._token_providers.get(id(credential))
+            if token_provider is None:
+                bearer_token_provider = get_async_bearer_token_provider(
+                    credential, COGNITIVE_SERVICES_SCOPE)
+
+                async def token_provider() -> str:
+                    with self._lock:
+                        self.token_requests += 1
+                    return await bearer_token_provider()
+
+                self._token_providers[id(credential)] = token_provider
+
+            return token_provider
+
+    def __get_http_client__(self) -> httpx.Client:
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_keepalive_connections,
+                        keepalive_expiry=self.keepalive_expiry))
+            return self._http_client
+
+    def __get_async_http_client__(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._async_http_client is None:
+                self._async_http_client = DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_keepalive_connections,
+                        keepalive_expiry=self.keepalive_expiry))
+            return self._async_http_client
+
+    def __get_transport__(self) -> RequestsTransport:
+        with self._lock:
+            if self._transport is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.max_keepalive_connections,
+                    pool_maxsize=self.max_connections)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._transport = RequestsTransport(
+                    session=session, session_owner=False)
+            return self._transport
+
+
+default_client_registry = AIClientRegistry()
@@ -0,0 +1,73 @@
+"""Defines helpers for estimating and reading the token usage of Azure OpenAI chat completions."""
+
+from typing import Iterable
+from openai.types.chat import ChatCompletion
+import math
+
+CHARACTERS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+IMAGE_BASE_TOKENS = 85
+IMAGE_TILE_TOKENS = 170
+IMAGE_TILE_SIZE = 512
+IMAGE_MAX_DIMENSION = 2048
+IMAGE_SHORT_SIDE = 768
+
+
+def get_total_tokens(completion: ChatCompletion) -> int:
+    """Retrieves the total number of prompt and completion tokens used by a chat completion.
+
+    :param completion: The chat completion returned by the model.
+    :return: The total number of tokens used, or 0 if the usage was not reported.
+    """
+
+    return completion.usage.total_tokens if completion.usage else 0
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """Estimates the number of prompt tokens of a high detail image input.
+
+    The image is scaled to fit within 2048 x 2048 pixels and then so its shortest side is at most 768 pixels, costing a base amount plus an amount per 512 pixel tile.
+
+    :param width: The width of the image in pixels.
+    :param height: The height of the image in pixels.
+    :return: The estimated number of tokens.
+    """
+
+    scale = min(1.0, IMAGE_MAX_DIMENSION / max(width, height, 1))
+    width, height = width * scale, height * scale
+
+    scale = min(1.0, IMAGE_SHORT_SIDE / max(min(width, height), 1))
+    width, height = width * scale, height * scale
+
+    tiles = math.ceil(width / IMAGE_TILE_SIZE) * \
+        math.ceil(height / IMAGE_TILE_SIZE)
+    return IMAGE_BASE_TOKENS + IMAGE_TILE_TOKENS * tiles
+
+
+def estimate_completion_tokens(completion_args: dict, image_sizes: Iterable[tuple[int, int]] = ()) -> int:
+    """Estimates the number of tokens of a chat completion request, as counted against a deployment's tokens per minute.
+
+    Azure OpenAI counts the prompt and the maximum number of completion tokens when a request is received, so the estimate includes `max_tokens`. Text is estimated at four characters per token, as tokenizing the prompt would cost more than the accuracy is worth for rate limiting.
+
+    :param completion_args: The arguments of the chat completion request, including its messages.
+    :param image_sizes: The width and height in pixels of each image in the messages.
+    :return: The estimated number of tokens.
+    """
+
+    characters = 0
+    messages = completion_args.get("messages", [])
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            characters += len(content)
+        elif content:
+            for part in content:
+                if part.get("type") == "text":
+                    characters += len(part.get("text", ""))
+
+    tokens = math.ceil(characters / CHARACTERS_PER_TOKEN) + \
+        MESSAGE_OVERHEAD_TOKENS * len(messages)
+    tokens += sum(estimate_image_tokens(width, height)
+                  for width, height in image_sizes)
+
+    return tokens + (completion_args.get("max_tokens") or 0)
@@ -0,0 +1,371 @@
+"""Defines a router balancing Azure OpenAI requests across a pool of equivalent model deployments, e.g., in different regions.
+
+Each request is sent to the least-loaded healthy deployment, based on the observed latency and requests in flight, the remaining quota reported in the response headers, the recent rate of throttled responses, and the queue of the deployment's rate limiter. Deployments that are throttled or failing are taken out of rotation until they recover, and failed requests fail over to the next deployment immediately.
+"""
+
+from __future__ import annotations
+from typing import Awaitable, Callable, Optional, TypeVar
+from openai import APIConnectionError, APIStatusError
+from shared.clients.rate_limiter import RateLimiter, RateLimitOptions, default_rate_limiter, get_retry_after, is_retryable_error
+import asyncio
+import json
+import random
+import threading
+import time
+
+T = TypeVar("T")
+
+LATENCY_SMOOTHING = 0.2
+THROTTLE_SMOOTHING = 0.1
+THROTTLE_PENALTY = 4.0
+REMAINING_QUOTA_TTL = 60.0
+DEPLOYMENTS_SETTING = "AZURE_OPENAI_CHAT_DEPLOYMENTS"
+DEPLOYMENT_REQUIRED_KEYS = frozenset({"endpoint", "deployment_name"})
+DEPLOYMENT_OPTIONAL_KEYS = frozenset({"requests_per_minute", "tokens_per_minute"})
+
+
+class OpenAIDeployment:
+    """Defines an Azure OpenAI model deployment that requests can be routed to."""
+
+    def __init__(self, endpoint: str, deployment_name: str, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        """Initializes a new instance of the OpenAIDeployment class.
+
+        :param endpoint: The Azure OpenAI endpoint of the deployment.
+        :param deployment_name: The name of the model deployment.
+        :param requests_per_minute: The optional maximum number of requests per minute sent to the deployment. Defaults to the limit of the request's `RateLimitOptions`.
+        :param tokens_per_minute: The optional maximum number of estimated tokens per minute sent to the deployment. Defaults to the limit of the request's `RateLimitOptions`.
+        """
+
+        self.endpoint = endpoint
+        self.deployment_name = deployment_name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+    @property
+    def key(self) -> tuple[str, str]:
+        """The key identifying the deployment, its endpoint and deployment name."""
+
+        return (self.endpoint, self.deployment_name)
+
+    @staticmethod
+    def from_settings(deployments_json: Optional[str], endpoint: Optional[str], deployment_name: Optional[str]) -> list[OpenAIDeployment]:
+        """Creates the pool of deployments from the application settings.
+
+        :param deployments_json: The optional JSON array of deployments, each an object with an `endpoint`, a `deployment_name`, and optional `requests_per_minute` and `tokens_per_minute`.
+        :param endpoint: The Azure OpenAI endpoint of the single deployment used if no pool is configured.
+        :param deployment_name: The name of the single deployment used if no pool is configured.
+        :return: The deployments of the pool.
+        :raises ValueError: If the JSON array of deployments is invalid.
+        """
+
+        if not deployments_json:
+            return [OpenAIDeployment(endpoint, deployment_name)] if endpoint and deployment_name else []
+
+        try:
+            deployments = json.loads(deployments_json)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{DEPLOYMENTS_SETTING} is not valid JSON: {e}") from e
+
+        if not isinstance(deployments, list) or not deployments:
+            raise ValueError(f"{DEPLOYMENTS_SETTING} must be a non-empty JSON array of deployments.")
+
+        for index, deployment in enumerate(deployments):
+            if not isinstance(deployment, dict):
+                raise ValueError(f"{DEPLOYMENTS_SETTING} deployment {index} must be a JSON object.")
+
+            missing_keys = DEPLOYMENT_REQUIRED_KEYS - deployment.keys()
+            if missing_keys:
+                raise ValueError(
+                    f"{DEPLOYMENTS_SETTING} deployment {index} is missing {', '.join(sorted(missing_keys))}.")
+
+            unknown_keys = deployment.keys() - DEPLOYMENT_REQUIRED_KEYS - DEPLOYMENT_OPTIONAL_KEYS
+            if unknown_keys:
+                raise ValueError(
+                    f"{DEPLOYMENTS_SETTING} deployment {index} has unknown keys {', '.join(sorted(unknown_keys))}.")
+
+        return [OpenAIDeployment(**deployment) for deployment in deployments]
+
+
+class DeploymentHealth:
+    """Defines the observed load and health of a single Azure OpenAI deployment. Not thread-safe, guarded by the router's lock."""
+
+    def __init__(self):
+        """Initializes a new instance of the DeploymentHealth class."""
+
+        self.requests = 0
+        self.failures = 0
+        self.throttled_requests = 0
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.latency: Optional[float] = None
+        self.throttle_rate = 0.0
+        self.remaining_tokens: Optional[int] = None
+        self.remaining_requests: Optional[int] = None
+        self.remaining_updated_at = 0.0
+        self.unhealthy_until = 0.0
+
+    def get_load(self, estimated_tokens: int, queue_wait: float, now: float) -> float:
+        """Estimates the number of seconds until a new request to the deployment would complete, relative to the other deployments.
+
+        :param estimated_tokens: The estimated number of prompt and completion tokens of the request.
+        :param queue_wait: The number of seconds the request would be queued by the deployment's rate limiter.
+        :param now: The current monotonic time.
+        :return: The load of the deployment, lower is better.
+        """
+
+        load = (self.latency or 0.0) * (self.in_flight + 1)
+
+        # The reported quota refills within a minute, so stale headers are ignored.
+        if now - self.remaining_updated_at < REMAINING_QUOTA_TTL:
+            if self.remaining_tokens is not None:
+                load *= 1 + estimated_tokens / max(self.remaining_tokens, 1)
+            if self.remaining_requests is not None:
+                load *= 1 + 1 / max(self.remaining_requests, 1)
+
+        return (queue_wait + load) * (1 + THROTTLE_PENALTY * self.throttle_rate)
+
+    def get_stats(self, now: float) -> dict[str, float]:
+        """Retrieves the health metrics of the deployment.
+
+        :param now: The current monotonic time.
+        :return: A dictionary containing the request, failure and throttling counts, the smoothed latency and throttle rate, the last reported remaining quota, and whether the deployment is in rotation.
+        """
+
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "throttled_requests": self.throttled_requests,
+            "in_flight": self.in_flight,
+            "latency_seconds": self.latency or 0.0,
+            "throttle_rate": self.throttle_rate,
+            "remaining_tokens": self.remaining_tokens,
+            "remaining_requests": self.remaining_requests,
+            "healthy": self.unhealthy_until <= now
+        }
+
+
+class DeploymentRouter:
+    """Defines a thread-safe router of Azure OpenAI requests across pools of deployments, sharing the health of each deployment across pools and requests."""
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
+        """Initializes a new instance of the DeploymentRouter class.
+
+        :param rate_limiter: The rate limiter to send the requests to each deployment through. Defaults to the process-wide rate limiter.
+        """
+
+        self.rate_limiter = rate_limiter or default_rate_limiter
+        self.failovers = 0
+        self._health: dict[tuple, DeploymentHealth] = {}
+        self._lock = threading.Lock()
+
+    def call(self, deployments: list[OpenAIDeployment], options: RateLimitOptions, request: Callable[[OpenAIDeployment], T], estimated_tokens: int, get_used_tokens: Optional[Callable[[T], int]] = None) -> T:
+        """Sends a raw response request to the least-loaded healthy deployment of the pool, failing over to other deployments on throttled and transient failures.
+
+        :param deployments: The pool of equivalent deployments to route the request to.
+        :param options: The options for rate limiting and retrying requests. The retries are counted across all deployments of the pool.
+        :param request: The function sending the request to a deployment, returning the raw response, e.g., using `with_raw_response`.
+        :param estimated_tokens: The estimated number of prompt and completion tokens of the request.
+        :param get_used_tokens: The optional function retrieving the number of tokens used from the parsed response, recorded in the rate limiter's metrics.
+        :return: The parsed response of the request.
+        """
+
+        attempt = 0
+        while True:
+            deployment, unhealthy_wait = self.__select__(
+                deployments, options, estimated_tokens, attempt)
+            if unhealthy_wait > 0:
+                time.sleep(unhealthy_wait)
+
+            try:
+                raw_response = self.rate_limiter.call(
+                    deployment.key, self.__get_rate_limit__(deployment, options),
+                    lambda: request(deployment), estimated_tokens)
+            except (APIStatusError, APIConnectionError) as error:
+                if not self.__record_failure__(deployment, options, error) or attempt >= options.max_retries:
+                    raise
+                attempt += 1
+                continue
+            except BaseException:
+                self.__release__(deployment)
+                raise
+
+            return self.__record_success__(deployment, raw_response, get_used_tokens)
+
+    async def call_async(self, deployments: list[OpenAIDeployment], options: RateLimitOptions, request: Callable[[OpenAIDeployment], Awaitable[T]], estimated_tokens: int, get_used_tokens: Optional[Callable[[T], int]] = None) -> T:
+        """Sends an asynchronous raw response request to the least-loaded healthy deployment of the pool, failing over to other deployments on throttled and transient failures.
+
+        :param deployments: The pool of equivalent deployments to route the request to.
+        :param options: The options for rate limiting and retrying requests. The retries are counted across all deployments of the pool.
+        :param request: The function returning the awaitable sending the request to a deployment, returning the raw response, e.g., using `with_raw_response`.
+        :param estimated_tokens: The estimated number of prompt and completion tokens of the request.
+        :param get_used_tokens: The optional function retrieving the number of tokens used from the parsed response, recorded in the rate limiter's metrics.
+        :return: The parsed response of the request.
+        """
+
+        attempt = 0
+        while True:
+            deployment, unhealthy_wait = self.__select__(
+                deployments, options, estimated_tokens, attempt)
+            if unhealthy_wait > 0:
+                await asyncio.sleep(unhealthy_wait)
+
+            try:
+                raw_response = await self.rate_limiter.call_async(
+                    deployment.key, self.__get_rate_limit__(deployment, options),
+                    lambda: request(deployment), estimated_tokens)
+            except (APIStatusError, APIConnectionError) as error:
+                if not self.__record_failure__(deployment, options, error) or attempt >= options.max_retries:
+                    raise
+                attempt += 1
+                continue
+            except BaseException:
+                self.__release__(deployment)
+                raise
+
+            return self.__record_success__(deployment, raw_response, get_used_tokens)
+
+    def get_stats(self) -> dict[str, object]:
+        """Retrieves the routing metrics.
+
+        :return: A dictionary containing the number of failovers and the health metrics of each deployment, keyed by endpoint and deployment name.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "failovers": self.failovers,
+                "deployments": {
+                    f"{endpoint}/{deployment_name}": health.get_stats(now)
+                    for (endpoint, deployment_name), health in self._health.items()
+                }
+            }
+
+    def __get_health__(self, deployment: OpenAIDeployment) -> DeploymentHealth:
+        health = self._health.get(deployment.key)
+        if health is None:
+            health = self._health[deployment.key] = DeploymentHealth()
+        return health
+
+    def __get_rate_limit__(self, deployment: OpenAIDeployment, options: RateLimitOptions) -> RateLimitOptions:
+        # Each attempt is sent once to a deployment, as the router retries failed requests against the whole pool.
+        return RateLimitOptions(
+            requests_per_minute=deployment.requests_per_minute or options.requests_per_minute,
+            tokens_per_minute=deployment.tokens_per_minute or options.tokens_per_minute,
+            burst_seconds=options.burst_seconds,
+            max_retries=0,
+            initial_backoff=options.initial_backoff,
+            max_backoff=options.max_backoff,
+            jitter=options.jitter)
+
+    def __select__(self, deployments: list[OpenAIDeployment], options: RateLimitOptions, estimated_tokens: int, attempt: int) -> tuple[OpenAIDeployment, float]:
+        if not deployments:
+            raise ValueError("At least one Azure OpenAI deployment is required.")
+
+        queue_waits = [self.rate_limiter.get_wait(deployment.key, estimated_tokens)
+                       for deployment in deployments]
+
+        with self._lock:
+            now = time.monotonic()
+            healthy = []
+            for deployment, queue_wait in zip(deployments, queue_waits):
+                health = self.__get_health__(deployment)
+                if health.unhealthy_until <= now:
+                    # Deployments without observed latency tie at no load, so break ties by requests in flight and then at random to spread the first requests.
+                    healthy.append((health.get_load(estimated_tokens, queue_wait, now),
+                                   health.in_flight, random.random(), deployment))
+
+            if healthy:
+                deployment = min(healthy)[-1]
+                unhealthy_wait = 0.0
+            else:
+                # All deployments are out of rotation, so wait for the first to recover, spreading the waiting requests.
+                deployment = min(deployments, key=lambda d: self._health[d.key].unhealthy_until)
+                unhealthy_wait = (self._health[deployment.key].unhealthy_until - now) * \
+                    (1 + random.uniform(0, options.jitter))
+
+            if attempt:
+                self.failovers += 1
+            self.__get_health__(deployment).in_flight += 1
+
+        if attempt:
+            # The rate limiter does not retry requests sent by the router, so failovers are recorded as its retries.
+            self.rate_limiter.metrics.record_retry(unhealthy_wait)
+
+        return deployment, unhealthy_wait
+
+    def __release__(self, deployment: OpenAIDeployment):
+        with self._lock:
+            self.__get_health__(deployment).in_flight -= 1
+
+    def __record_success__(self, deployment: OpenAIDeployment, raw_response, get_used_tokens: Optional[Callable]):
+        headers = raw_response.headers
+        remaining_tokens = get_header_int(headers, "x-ratelimit-remaining-tokens")
+        remaining_requests = get_header_int(headers, "x-ratelimit-remaining-requests")
+        # The elapsed time of the HTTP response excludes the time queued by the rate limiter.
+        latency = raw_response.elapsed.total_seconds()
+
+        with self._lock:
+            health = self.__get_health__(deployment)
+            health.in_flight -= 1
+            health.requests += 1
+            health.consecutive_failures = 0
+            health.throttle_rate *= 1 - THROTTLE_SMOOTHING
+            health.latency = latency if health.latency is None else \
+                health.latency + LATENCY_SMOOTHING * (latency - health.latency)
+            if remaining_tokens is not None or remaining_requests is not None:
+                health.remaining_tokens = remaining_tokens
+                health.remaining_requests = remaining_requests
+                health.remaining_updated_at = time.monotonic()
+
+        response = raw_response.parse()
+        if get_used_tokens:
+            self.rate_limiter.metrics.record_usage(get_used_tokens(response))
+        return response
+
+    def __record_failure__(self, deployment: OpenAIDeployment, options: RateLimitOptions, error: Exception) -> bool:
+        retryable = is_retryable_error(error)
+        throttled = getattr(error, "status_code", None) == 429
+
+        with self._lock:
+            health = self.__get_health__(deployment)
+            health.in_flight -= 1
+            health.requests += 1
+
+            if not retryable:
+                # The request itself is invalid, so the deployment stays in rotation.
+                return False
+
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.throttle_rate = health.throttle_rate * \
+                (1 - THROTTLE_SMOOTHING) + (THROTTLE_SMOOTHING if throttled else 0.0)
+            if throttled:
+                health.throttled_requests += 1
+
+            # Take the deployment out of rotation until it is expected to recover, backing off exponentially if it keeps failing.
+            cooldown = get_retry_after(error)
+            if cooldown is None:
+                cooldown = min(options.initial_backoff * 2 **
+                               (health.consecutive_failures - 1), options.max_backoff)
+            health.unhealthy_until = max(
+                health.unhealthy_until, time.monotonic() + cooldown)
+
+        return True
+
+
+def get_header_int(headers, name: str) -> Optional[int]:
+    """Retrieves an integer response header.
+
+    :param headers: The response headers.
+    :param name: The name of the header.
+    :return: The value of the header, or None if it is missing or not an integer.
+    """
+
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+default_deployment_router = DeploymentRouter()
@@ -0,0 +1,372 @@
+"""Defines a client-side rate limiter and retry layer for Azure OpenAI requests.
+
+Requests reserve capacity from per-deployment token buckets for requests and tokens per minute before they are sent, so a large batch queues locally instead of exceeding the deployment's quota. Throttled requests are retried with jittered backoff based on the service's Retry-After headers, pausing all requests to the throttled deployment.
+"""
+
+from __future__ import annotations
+from typing import Awaitable, Callable, Optional, TypeVar
+from openai import APIConnectionError, APIStatusError
+from shared.clients.retry_after import parse_retry_after
+import asyncio
+import random
+import threading
+import time
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+
+
+class RateLimitOptions:
+    """Defines the configuration options for rate limiting and retrying requests to an Azure OpenAI deployment."""
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None, burst_seconds: float = 10.0, max_retries: int = 5, initial_backoff: float = 1.0, max_backoff: float = 60.0, jitter: float = 0.5):
+        """Initializes a new instance of the RateLimitOptions class.
+
+        :param requests_per_minute: The optional maximum number of requests per minute sent to the deployment. Unlimited if not provided.
+        :param tokens_per_minute: The optional maximum number of estimated tokens per minute sent to the deployment. Unlimited if not provided.
+        :param burst_seconds: The number of seconds of capacity that may be sent at once. Azure OpenAI enforces the limits over windows shorter than a minute, so a full minute of capacity sent at once is throttled. Default is 10.
+        :param max_retries: The maximum number of times a throttled or failed request is retried. Default is 5.
+        :param initial_backoff: The number of seconds to wait before the first retry when the service does not return a Retry-After header. Default is 1.
+        :param max_backoff: The maximum number of seconds to wait between retries when the service does not return a Retry-After header. Default is 60.
+        :param jitter: The maximum fraction of a delay added at random, so that throttled requests do not retry in lockstep. Default is 0.5.
+        """
+
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.burst_seconds = burst_seconds
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+
+class RateLimitMetrics:
+    """Defines thread-safe counters of the time requests spend queued by the rate limiter and backing off after being throttled."""
+
+    def __init__(self):
+        """Initializes a new instance of the RateLimitMetrics class."""
+
+        self.requests = 0
+        self.queued_requests = 0
+        self.throttled_requests = 0
+        self.retries = 0
+        self.queue_wait_seconds = 0.0
+        self.max_queue_wait_seconds = 0.0
+        self.backoff_seconds = 0.0
+        self.estimated_tokens = 0
+        self.used_tokens = 0
+        self._lock = threading.Lock()
+
+    def record_request(self, estimated_tokens: int, queue_wait: float):
+        """Records a request sent to the service.
+
+        :param estimated_tokens: The number of tokens reserved for the request.
+        :param queue_wait: The number of seconds the request was queued by the rate limiter before it was sent.
+        """
+
+        with self._lock:
+            self.requests += 1
+            self.estimated_tokens += estimated_tokens
+            self.queue_wait_seconds += queue_wait
+            if queue_wait > 0:
+                self.queued_requests += 1
+                self.max_queue_wait_seconds = max(
+                    self.max_queue_wait_seconds, queue_wait)
+
+    def record_throttled(self):
+        """Records a request that failed as the service returned 429 Too Many Requests."""
+
+        with self._lock:
+            self.throttled_requests += 1
+
+    def record_retry(self, backoff: float):
+        """Records a retry of a failed request.
+
+        :param backoff: The number of seconds waited before retrying.
+        """
+
+        with self._lock:
+            self.retries += 1
+            self.backoff_seconds += backoff
+
+    def record_usage(self, used_tokens: int):
+        """Records the tokens used by a completed request, as reported by the service.
+
+        :param used_tokens: The total number of prompt and completion tokens used.
+        """
+
+        with self._lock:
+            self.used_tokens += used_tokens
+
+    def get_stats(self) -> dict[str, float]:
+        """Retrieves the rate limiting metrics.
+
+        :return: A dictionary containing the number of requests, queued requests, throttled requests and retries, the average and maximum seconds queued, and the average estimated versus used tokens per request.
+        """
+
+        with self._lock:
+            requests = self.requests or 1
+            return {
+                "requests": self.requests,
+                "queued_requests": self.queued_requests,
+                "throttled_requests": self.throttled_requests,
+                "retries": self.retries,
+                "queue_wait_seconds_per_request": self.queue_wait_seconds / requests,
+                "max_queue_wait_seconds": self.max_queue_wait_seconds,
+                "backoff_seconds_per_request": self.backoff_seconds / requests,
+                "estimated_tokens_per_request": self.estimated_tokens / requests,
+                "used_tokens_per_request": self.used_tokens / requests
+            }
+
+
+class TokenBucket:
+    """Defines a token bucket refilled continuously at a rate per minute, from which capacity is reserved ahead of time.
+
+    Reservations may overdraw the bucket, returning the delay until the reserved capacity has refilled, so queued callers are served in the order they reserved without polling.
+    Reservations larger than the capacity are reserved in full, so they wait until their whole amount has refilled rather than being admitted at the capacity.
+    """
+
+    def __init__(self, rate_per_minute: int, burst_seconds: float = 60.0):
+        """Initializes a new instance of the TokenBucket class.
+
+        :param rate_per_minute: The capacity refilled every minute.
+        :param burst_seconds: The number of seconds of refilled capacity the bucket holds. Default is 60.
+        """
+
+        self.refill_rate = rate_per_minute / 60.0
+        self.capacity = max(self.refill_rate * burst_seconds, 1.0)
+        self.level = self.capacity
+        self._updated_at = time.monotonic()
+
+    def reserve(self, amount: int, now: float) -> float:
+        """Reserves capacity from the bucket. Not thread-safe, callers must hold a lock.
+
+        :param amount: The capacity to reserve.
+        :param now: The current monotonic time.
+        :return: The number of seconds to wait until the reserved capacity is available.
+        """
+
+        self.level = self.__get_level__(now)
+        self._updated_at = now
+        self.level -= amount
+
+        return -self.level / self.refill_rate if self.level < 0 else 0.0
+
+    def get_delay(self, amount: int, now: float) -> float:
+        """Retrieves the delay a reservation would wait for without reserving it. Not thread-safe, callers must hold a lock.
+
+        :param amount: The capacity to reserve.
+        :param now: The current monotonic time.
+        :return: The number of seconds until the capacity would be available.
+        """
+
+        level = self.__get_level__(now) - amount
+        return -level / self.refill_rate if level < 0 else 0.0
+
+    def __get_level__(self, now: float) -> float:
+        return min(self.capacity, self.level + (now - self._updated_at) * self.refill_rate)
+
+
+class DeploymentRateLimit:
+    """Defines the token buckets and throttling state of a single Azure OpenAI deployment."""
+
+    def __init__(self, options: RateLimitOptions):
+        """Initializes a new instance of the DeploymentRateLimit class.
+
+        :param options: The options for rate limiting requests to the deployment.
+        """
+
+        self.requests = TokenBucket(
+            options.requests_per_minute, options.burst_seconds) if options.requests_per_minute else None
+        self.tokens = TokenBucket(
+            options.tokens_per_minute, options.burst_seconds) if options.tokens_per_minute else None
+        self.throttled_until = 0.0
+
+
+class RateLimiter:
+    """Defines a thread-safe rate limiter and retry layer shared by the synchronous and asynchronous requests to Azure OpenAI deployments."""
+
+    def __init__(self, metrics: Optional[RateLimitMetrics] = None):
+        """Initializes a new instance of the RateLimiter class.
+
+        :param metrics: The metrics to record queued and retried requests to. Defaults to new metrics for the rate limiter.
+        """
+
+        self.metrics = metrics or RateLimitMetrics()
+        self._limits: dict[tuple, DeploymentRateLimit] = {}
+        self._lock = threading.Lock()
+
+    def call(self, key: tuple, options: RateLimitOptions, request: Callable[[], T], estimated_tokens: int, get_used_tokens: Optional[Callable[[T], int]] = None) -> T:
+        """Sends a request once capacity is available for the deployment, retrying throttled and transient failures.
+
+        :param key: The key of the deployment the request is sent to, e.g., its endpoint and deployment name.
+        :param options: The options for rate limiting requests to the deployment. The limits of the first request to a deployment are used.
+        :param request: The function sending the request.
+        :param estimated_tokens: The estimated number of prompt and completion tokens of the request.
+        :param get_used_tokens: The optional function retrieving the number of tokens used from the response, recorded in the metrics.
+        :return: The response of the request.
+        """
+
+        attempt = 0
+        while True:
+            queue_wait = self.__reserve__(key, options, estimated_tokens)
+            if queue_wait > 0:
+                time.sleep(queue_wait)
+            self.metrics.record_request(estimated_tokens, queue_wait)
+
+            try:
+                response = request()
+            except (APIStatusError, APIConnectionError) as error:
+                backoff = self.__get_backoff__(key, options, error, attempt)
+                if backoff is None:
+                    raise
+                time.sleep(backoff)
+                attempt += 1
+                continue
+
+            if get_used_tokens:
+                self.metrics.record_usage(get_used_tokens(response))
+            return response
+
+    async def call_async(self, key: tuple, options: RateLimitOptions, request: Callable[[], Awaitable[T]], estimated_tokens: int, get_used_tokens: Optional[Callable[[T], int]] = None) -> T:
+        """Sends an asynchronous request once capacity is available for the deployment, retrying throttled and transient failures.
+
+        :param key: The key of the deployment the request is sent to, e.g., its endpoint and deployment name.
+        :param options: The options for rate limiting requests to the deployment. The limits of the first request to a deployment are used.
+        :param request: The function returning the awaitable sending the request.
+        :param estimated_tokens: The estimated number of prompt and completion tokens of the request.
+        :param get_used_tokens: The optional function retrieving the number of tokens used from the response, recorded in the metrics.
+        :return: The response of the request.
+        """
+
+        attempt = 0
+        while True:
+            queue_wait = self.__reserve__(key, options, estimated_tokens)
+            if queue_wait > 0:
+                await asyncio.sleep(queue_wait)
+            self.metrics.record_request(estimated_tokens, queue_wait)
+
+            try:
+                response = await request()
+            except (APIStatusError, APIConnectionError) as error:
+                backoff = self.__get_backoff__(key, options, error, attempt)
+                if backoff is None:
+                    raise
+                await asyncio.sleep(backoff)
+                attempt += 1
+                continue
+
+            if get_used_tokens:
+                self.metrics.record_usage(get_used_tokens(response))
+            return response
+
+    def get_wait(self, key: tuple, estimated_tokens: int) -> float:
+        """Retrieves the number of seconds a request to the deployment would currently be queued for, without reserving capacity.
+
+        :param key: The key of the deployment.
+        :param estimated_tokens: The estimated number of prompt and completion tokens of the request.
+        :return: The number of seconds until capacity is available, or 0 if the deployment has not been used yet.
+        """
+
+        with self._lock:
+            limit = self._limits.get(key)
+            if limit is None:
+                return 0.0
+
+            now = time.monotonic()
+            delay = limit.throttled_until - now
+            if limit.requests:
+                delay = max(delay, limit.requests.get_delay(1, now))
+            if limit.tokens:
+                delay = max(delay, limit.tokens.get_delay(estimated_tokens, now))
+
+            return max(delay, 0.0)
+
+    def get_stats(self) -> dict[str, float]:
+        """Retrieves the rate limiting metrics.
+
+        :return: A dictionary containing the number of rate limited deployments and the metrics of the rate limiter.
+        """
+
+        with self._lock:
+            deployments = len(self._limits)
+
+        return {"deployments": deployments, **self.metrics.get_stats()}
+
+    def __get_limit__(self, key: tuple, options: RateLimitOptions) -> DeploymentRateLimit:
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = self._limits[key] = DeploymentRateLimit(options)
+        return limit
+
+    def __reserve__(self, key: tuple, options: RateLimitOptions, estimated_tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            limit = self.__get_limit__(key, options)
+
+            delay = 0.0
+            if limit.requests:
+                delay = limit.requests.reserve(1, now)
+            if limit.tokens:
+                delay = max(delay, limit.tokens.reserve(estimated_tokens, now))
+
+            throttled_delay = limit.throttled_until - now
+
+        if throttled_delay > delay:
+            # Spread the requests queued behind a throttled deployment, rather than releasing them all at once when the pause ends.
+            delay = throttled_delay * (1 + random.uniform(0, options.jitter))
+
+        return delay
+
+    def __get_backoff__(self, key: tuple, options: RateLimitOptions, error: Exception, attempt: int) -> Optional[float]:
+        if not is_retryable_error(error):
+            return None
+
+        retry_after = get_retry_after(error)
+        if retry_after is None:
+            retry_after = min(options.initial_backoff * 2 **
+                              attempt, options.max_backoff)
+
+        if getattr(error, "status_code", None) == 429:
+            self.metrics.record_throttled()
+            # The deployment's quota is shared, so pause every request to it rather than only the one that was throttled.
+            with self._lock:
+                limit = self.__get_limit__(key, options)
+                limit.throttled_until = max(
+                    limit.throttled_until, time.monotonic() + retry_after)
+
+        if attempt >= options.max_retries:
+            return None
+
+        backoff = retry_after * (1 + random.uniform(0, options.jitter))
+        self.metrics.record_retry(backoff)
+        return backoff
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Determines whether a failed Azure OpenAI request may succeed if retried, i.e., it was throttled, timed out, or failed with a server or connection error.
+
+    :param error: The error raised by the OpenAI client.
+    :return: True if the request may be retried; otherwise, False.
+    """
+
+    status_code = getattr(error, "status_code", None)
+    return status_code is None or status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Retrieves the number of seconds to wait before retrying from the Retry-After headers of a failed Azure OpenAI response.
+
+    :param error: The error raised by the OpenAI client.
+    :return: The number of seconds to wait, or None if the response did not include a valid Retry-After header.
+    """
+
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+
+    return parse_retry_after(response.headers)
+
+
+default_rate_limiter = RateLimiter()
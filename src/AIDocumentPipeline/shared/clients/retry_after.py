@@ -0,0 +1,44 @@
+"""Defines the parsing of the Retry-After headers returned by Azure services to throttle or pace clients."""
+
+from __future__ import annotations
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+import time
+
+# The headers that specify the number of milliseconds to wait, in order of precedence.
+RETRY_AFTER_MS_HEADERS = ("retry-after-ms", "x-ms-retry-after-ms")
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Retrieves the number of seconds to wait before the next request from the Retry-After headers of a response.
+
+    The millisecond headers returned by Azure services take precedence over the standard `Retry-After` header, which may be a number of seconds or an HTTP date.
+
+    :param headers: The case-insensitive headers of the response.
+    :return: The number of seconds to wait, or None if the response did not include a valid Retry-After header.
+    """
+
+    if not headers:
+        return None
+
+    for header in RETRY_AFTER_MS_HEADERS:
+        retry_after_ms = headers.get(header)
+        if retry_after_ms:
+            try:
+                return max(float(retry_after_ms) / 1000, 0.0)
+            except ValueError:
+                pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+
+        try:
+            return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            pass
+
+    return None
@@ -1,13 +1,24 @@
 from __future__ import annotations
-from typing import Generic, TypeVar
+from functools import lru_cache
+from typing import Generic, Optional, TypeVar
 from pydantic import BaseModel, Field
+import base64
 import json
 import importlib
+import zlib
 
 DataT = TypeVar("DataT")
 
 OVERALL_CONFIDENCE_KEY = "_overall"
 
+# The keys of debugging detail in confidence scores that are dropped from the serialized form, e.g., the Document Intelligence lines matched to each field.
+SERIALIZATION_EXCLUDED_KEYS = frozenset({"matching_lines"})
+
+# Serialized payloads larger than this number of characters are compressed.
+COMPRESSION_THRESHOLD = 64 * 1024
+
+COMPRESSED_KEY = "_zlib"
+
 
 class ConfidenceResult(BaseModel, Generic[DataT]):
     """Defines a class for wrapping the confidence score of a model."""
@@ -19,12 +30,16 @@ class ConfidenceResult(BaseModel, Generic[DataT]):
         description="The overall confidence score for the data.")
 
     @staticmethod
-    def to_json(obj: ConfidenceResult) -> str:
+    def to_json(obj: ConfidenceResult, compression_threshold: Optional[int] = COMPRESSION_THRESHOLD) -> str:
         """
-        Convert the ConfidenceResult object to a JSON string.
+        Convert the ConfidenceResult object to a compact JSON string.
+
+        Debugging detail in the confidence scores is dropped, and payloads larger than the compression threshold are compressed.
         """
 
-        obj_dict = obj.model_dump()
+        obj_dict = obj.model_dump(exclude={"confidence_scores"})
+        obj_dict["confidence_scores"] = compact_confidence_scores(
+            obj.confidence_scores)
 
         # As we are using a generic type and have limited control over how Azure Functions
         # serializes the object, we need to add the data model type to the JSON output.
@@ -32,7 +47,14 @@ class ConfidenceResult(BaseModel, Generic[DataT]):
             fqcn = obj.data.__class__.__module__ + "." + obj.data.__class__.__qualname__
             obj_dict["_data_model"] = fqcn
 
-        return json.dumps(obj_dict)
+        json_str = json.dumps(obj_dict, separators=(",", ":"))
+
+        if compression_threshold is not None and len(json_str) > compression_threshold:
+            compressed = zlib.compress(json_str.encode("utf-8"))
+            json_str = json.dumps(
+                {COMPRESSED_KEY: base64.b64encode(compressed).decode("ascii")})
+
+        return json_str
 
     @staticmethod
     def from_json(json_str: str) -> ConfidenceResult:
@@ -41,6 +63,10 @@ class ConfidenceResult(BaseModel, Generic[DataT]):
         """
 
         obj = json.loads(json_str)
+        if COMPRESSED_KEY in obj:
+            obj = json.loads(zlib.decompress(
+                base64.b64decode(obj[COMPRESSED_KEY])))
+
         data = obj.get("data")
 
         # As we are using a generic type and have limited control over how Azure Functions
@@ -48,12 +74,44 @@ class ConfidenceResult(BaseModel, Generic[DataT]):
         # serialization step to reconstruct the object.
         model_name = obj.get("_data_model")
         if model_name and isinstance(data, dict):
-            module_name, class_name = model_name.rsplit(".", 1)
-            module = importlib.import_module(module_name)
-            model_cls = getattr(module, class_name)
+            model_cls = resolve_data_model(model_name)
             if issubclass(model_cls, BaseModel):
                 obj["data"] = model_cls.model_validate(data)
 
         # Remove the extra key as it's not part of the model
         obj.pop("_data_model", None)
         return ConfidenceResult.model_validate(obj)
+
+
+@lru_cache(maxsize=None)
+def resolve_data_model(model_name: str) -> type:
+    """
+    Resolves the class of a data model from its fully qualified name, caching the result.
+    """
+
+    module_name, class_name = model_name.rsplit(".", 1)
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)
+
+
+def compact_confidence_scores(confidence_scores):
+    """
+    Copies a tree of confidence scores, excluding the serialization excluded keys from each field's confidence.
+
+    Only the fields' confidence dictionaries are copied, sharing their other values, e.g., polygons, with the original tree.
+    """
+
+    if isinstance(confidence_scores, dict):
+        if "confidence" in confidence_scores:
+            return {
+                key: value
+                for key, value in confidence_scores.items()
+                if key not in SERIALIZATION_EXCLUDED_KEYS
+            }
+        return {
+            key: compact_confidence_scores(value)
+            for key, value in confidence_scores.items()
+        }
+    if isinstance(confidence_scores, list):
+        return [compact_confidence_scores(item) for item in confidence_scores]
+    return confidence_scores
@@ -1,3 +1,4 @@
+from itertools import repeat, zip_longest
 from shared.confidence.confidence_result import OVERALL_CONFIDENCE_KEY
 
 
@@ -15,78 +16,128 @@ def get_confidence_values(data, key='confidence'):
 
     confidence_values = []
 
-    def recursive_search(d):
-        if isinstance(d, dict):
-            for k, v in d.items():
-                if k == key and (v is not None and v != 0):
-                    confidence_values.append(v)
-                if isinstance(v, (dict, list)):
-                    recursive_search(v)
-        elif isinstance(d, list):
-            for item in d:
-                recursive_search(item)
-
-    recursive_search(data)
+    # Walk the tree iteratively with a stack of (key, value) iterators, so values are found in document order without recursion.
+    stack = [iter(((None, data),))]
+    while stack:
+        for k, v in stack[-1]:
+            if k == key and (v is not None and v != 0):
+                confidence_values.append(v)
+            if isinstance(v, dict):
+                stack.append(iter(v.items()))
+                break
+            elif isinstance(v, list):
+                stack.append(zip(repeat(None), v))
+                break
+        else:
+            stack.pop()
+
     return confidence_values
 
 
-def merge_confidence_values(confidence_a: dict, confidence_b: dict):
+def merge_confidence_values(confidence_a: dict, confidence_b: dict, score_resolver: callable = min):
     """
     Merges to evaluations of confidence for the same set of fields as one.
-    This is achieved by summing the confidence values and averaging the scores.
+    This is achieved by resolving the confidence values of each field and averaging the scores.
+
+    Both evaluations are merged in a single iterative traversal, accumulating the overall score as fields are merged.
+    Fields or list items present in only one evaluation, e.g., when the lists have different lengths, keep the confidence of that evaluation.
 
     Args:
         confidence_a: The first confidence evaluation.
         confidence_b: The second confidence evaluation.
+        score_resolver: The function to resolve the confidence values of a field present in both evaluations. Defaults to min.
 
     Returns:
         dict: The merged confidence evaluation.
     """
 
-    def merge_field_confidence_value(
-        field_a: any,
-        field_b: any,
-        score_resolver: callable = min
-    ) -> dict:
-        """
-        Merges two field confidence values.
-        If the field is a dictionary or list, the function is called recursively.
-
-        Args:
-            field_a: The first field confidence value.
-            field_b: The second field confidence value.
-
-        Returns:
-            dict: The merged field confidence value.
-        """
-
-        if isinstance(field_a, dict) and 'confidence' not in field_a:
-            return {
-                key: merge_field_confidence_value(field_a[key], field_b[key])
-                for key in field_a if not key.startswith('_')
+    confidence_sum = 0.0
+    confidence_count = 0
+
+    merged_confidence = dict()
+
+    # Each frame is an iterator over the pairs of fields to merge, and the container to store the merged fields in.
+    # Fields are merged, and their scores summed, in document order.
+    stack = [(iter_field_pairs(confidence_a, confidence_b), merged_confidence)]
+    while stack:
+        field_pairs, merged = stack[-1]
+        for key, field_a, field_b in field_pairs:
+            field = field_a if field_a is not None else field_b
+
+            if isinstance(field, dict) and 'confidence' not in field:
+                merged[key] = merged_field = dict()
+                stack.append(
+                    (iter_field_pairs(field_a, field_b), merged_field))
+                break
+            elif isinstance(field, list):
+                merged[key] = merged_field = [None] * max(
+                    len(field_a) if isinstance(field_a, list) else 0,
+                    len(field_b) if isinstance(field_b, list) else 0)
+                stack.append(
+                    (iter_field_pairs(field_a, field_b), merged_field))
+                break
+
+            if isinstance(field_a, dict) and isinstance(field_b, dict):
+                score_a = field_a.get('confidence')
+                score_b = field_b.get('confidence')
+                value = field_a.get('value') if (score_a or 0) > (
+                    score_b or 0) else field_b.get('value')
+            elif isinstance(field_a, dict):
+                score_a, score_b = field_a.get('confidence'), None
+                value = field_a.get('value')
+            elif isinstance(field_b, dict):
+                score_a, score_b = None, field_b.get('confidence')
+                value = field_b.get('value')
+            else:
+                score_a = score_b = value = None
+
+            # Confidence values of None or 0 are not valid, and are resolved only if both evaluations have a valid value.
+            if score_a and score_b:
+                confidence = score_resolver([score_a, score_b])
+            else:
+                confidence = score_a or score_b or 0.0
+
+            if confidence:
+                confidence_sum += confidence
+                confidence_count += 1
+
+            merged[key] = {
+                'confidence': confidence,
+                'value': value
             }
-        elif isinstance(field_a, list):
-            return [
-                merge_field_confidence_value(field_a[i], field_b[i])
-                for i in range(len(field_a))
-            ]
         else:
-            valid_confidences = [conf for conf in [
-                field_a['confidence'], field_b['confidence']] if conf not in (None, 0)]
+            stack.pop()
 
-            return {
-                'confidence': score_resolver(valid_confidences) if valid_confidences else 0.0,
-                'value': field_a['value'] if field_a['confidence'] > field_b['confidence'] else field_b['value']
-            }
+    merged_confidence[OVERALL_CONFIDENCE_KEY] = confidence_sum / \
+        confidence_count if confidence_count else 0.0
 
-    merged_confidence = merge_field_confidence_value(
-        confidence_a, confidence_b)
+    return merged_confidence
 
-    confidence_scores = get_confidence_values(merged_confidence)
-    if confidence_scores:
-        merged_confidence[OVERALL_CONFIDENCE_KEY] = sum(
-            confidence_scores) / len(confidence_scores)
-    else:
-        merged_confidence[OVERALL_CONFIDENCE_KEY] = 0.0
 
-    return merged_confidence
+def iter_field_pairs(field_a: any, field_b: any):
+    """
+    Pairs the nested fields of two dictionaries or lists by key or index, excluding keys starting with an underscore.
+
+    Args:
+        field_a: The first dictionary or list, or None if not present.
+        field_b: The second dictionary or list, or None if not present.
+
+    Returns:
+        Iterator: The key or index, and the nested field of each, or None for a field present in only one.
+    """
+
+    if isinstance(field_a, list) or isinstance(field_b, list):
+        items_a = field_a if isinstance(field_a, list) else []
+        items_b = field_b if isinstance(field_b, list) else []
+        for index, (item_a, item_b) in enumerate(zip_longest(items_a, items_b)):
+            yield index, item_a, item_b
+        return
+
+    fields_a = field_a if isinstance(field_a, dict) else {}
+    fields_b = field_b if isinstance(field_b, dict) else {}
+    for key, value_a in fields_a.items():
+        if not (isinstance(key, str) and key.startswith('_')):
+            yield key, value_a, fields_b.get(key)
+    for key, value_b in fields_b.items():
+        if key not in fields_a and not (isinstance(key, str) and key.startswith('_')):
+            yield key, None, value_b
@@ -1,10 +1,25 @@
 import copy
+from bisect import bisect_left, bisect_right
+from enum import Enum
 from typing import Iterable, Optional
 from azure.ai.documentintelligence.models import AnalyzeResult, DocumentPage, DocumentLine, DocumentWord
-from shared.confidence.confidence_utils import get_confidence_values
 from shared.confidence.confidence_result import OVERALL_CONFIDENCE_KEY
 from shared.utils.value_utils import value_contains, value_match
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class ConfidenceDetail(Enum):
+    """
+    Defines the level of detail of the confidence evaluation of each field.
+
+    Attributes:
+        SCORES: The confidence score and value only.
+        POLYGONS: The confidence score and value, and the normalized polygons of the matching lines.
+        FULL: The confidence score and value, the normalized polygons, and the matching lines with their contained words, for debugging. The matching lines keep references to the analysis result.
+    """
+
+    SCORES = "scores"
+    POLYGONS = "polygons"
+    FULL = "full"
 
 
 class DIDocumentLine(DocumentLine):
@@ -146,9 +161,53 @@ def normalize_polygon(
     return result
 
 
+class WordSpanIndex:
+    """
+    An index of the words on a page, sorted by their span offsets, to find the words contained within a span in logarithmic time.
+
+    Attributes:
+        words (list[DocumentWord]): The words on the page, sorted by span offset.
+        offsets (list[int]): The span offsets of the sorted words.
+    """
+
+    def __init__(self, words: list[DocumentWord]) -> None:
+        """
+        Initializes a new instance of the WordSpanIndex class.
+
+        Args:
+            words: The words on the page to index.
+        """
+
+        # Words are typically already in reading order, in which case the sort is linear.
+        self.words = sorted(words, key=lambda word: word.span.offset)
+        self.offsets = [word.span.offset for word in self.words]
+
+    def find_contained_words(self, span_offset_start: int, span_offset_end: int) -> list[DocumentWord]:
+        """
+        Finds the words that are fully contained within a span.
+
+        Args:
+            span_offset_start: The inclusive start offset of the span.
+            span_offset_end: The exclusive end offset of the span.
+
+        Returns:
+            list: The words fully contained within the span, in offset order.
+        """
+
+        start_index = bisect_left(self.offsets, span_offset_start)
+        end_index = bisect_right(self.offsets, span_offset_end)
+
+        return [
+            word
+            for word in self.words[start_index:end_index]
+            if word.span.offset + word.span.length <= span_offset_end
+        ]
+
+
 def extract_lines(
     analyze_result: AnalyzeResult,
-    multiple_score_resolver: callable = min
+    multiple_score_resolver: callable = min,
+    normalize_polygons: bool = True
 ) -> list[DIDocumentLine]:
     """
     Extract lines from the Azure AI Document Intelligence analysis result, enriching with confidence, contained words, and normalized polygons.
@@ -156,6 +215,7 @@ def extract_lines(
     Args:
         result: The Azure AI Document Intelligence analysis result to extract lines from.
         multiple_score_resolver: The function to resolve multiple confidence scores of contained words.
+        normalize_polygons: A flag indicating whether to normalize the polygons of the lines. If False, the normalized polygons are None.
 
     Returns:
         list: The list of DIDocumentLine instances extracted from the analysis result.
@@ -163,20 +223,14 @@ def extract_lines(
 
     di_lines = list()
     for page_number, page in enumerate(analyze_result.pages):
+        word_index = WordSpanIndex(page.words or [])
         for line in page.lines:
             line_copy = copy.copy(line)
             contained_words = list()
             for span in line_copy.spans:
                 # Find words in the page that are fully contained within the span
-                span_offset_start = span.offset
-                span_offset_end = span_offset_start + span.length
-                words_contained = [
-                    word
-                    for word in page.words
-                    if word.span.offset >= span_offset_start
-                    and word.span.offset + word.span.length <= span_offset_end
-                ]
-                contained_words.extend(words_contained)
+                contained_words.extend(word_index.find_contained_words(
+                    span.offset, span.offset + span.length))
 
             contained_words_conf_scores = [
                 word.confidence for word in contained_words
@@ -191,16 +245,124 @@ def extract_lines(
                 ),
                 normalized_polygon=normalize_polygon(
                     page, line_copy.polygon
-                )
+                ) if normalize_polygons else None
             )
             di_lines.append(di_line)
     return di_lines
 
 
+class DILineIndex:
+    """
+    An index of the text of DIDocumentLine instances, normalized once, for matching field values without scanning every line.
+
+    Exact, case-insensitive matches are found with a hash lookup. Containment matches, ignoring case and spaces, are found by intersecting the n-gram postings of the value and verifying the candidate lines.
+
+    Attributes:
+        di_lines (list[DIDocumentLine]): The indexed lines.
+        ngram_size (int): The length of the n-grams used to find candidate lines for containment matches.
+    """
+
+    def __init__(self, di_lines: list[DIDocumentLine], ngram_size: int = 3) -> None:
+        """
+        Initializes a new instance of the DILineIndex class.
+
+        Args:
+            di_lines: The lines to index.
+            ngram_size: The length of the n-grams used to find candidate lines for containment matches.
+        """
+
+        self.di_lines = di_lines
+        self.ngram_size = ngram_size
+        self._exact_lines: dict[str, list[int]] = dict()
+        self._normalized_lines: list[str] = list()
+        self._ngram_lines: dict[str, list[int]] = dict()
+
+        for line_index, line in enumerate(di_lines):
+            content = line.content or ""
+            self._exact_lines.setdefault(content.lower(), []).append(line_index)
+
+            normalized_content = normalize_text(content)
+            self._normalized_lines.append(normalized_content)
+            for ngram in self.__get_ngrams__(normalized_content):
+                self._ngram_lines.setdefault(ngram, []).append(line_index)
+
+    def find_exact(self, value: str) -> list[DIDocumentLine]:
+        """
+        Find the lines whose text matches a value, ignoring case. Equivalent to matching with value_match.
+
+        Args:
+            value: The value to match.
+
+        Returns:
+            list: The matching lines, in line order.
+        """
+
+        return [self.di_lines[line_index] for line_index in self._exact_lines.get(value.lower(), [])]
+
+    def find_containing(self, value: str) -> list[DIDocumentLine]:
+        """
+        Find the lines whose text contains a value, ignoring case and spaces. Equivalent to matching with value_contains.
+
+        Args:
+            value: The value to match.
+
+        Returns:
+            list: The matching lines, in line order.
+        """
+
+        normalized_value = normalize_text(value)
+
+        if len(normalized_value) < self.ngram_size:
+            candidate_indices = range(len(self.di_lines))
+        else:
+            postings = list()
+            for ngram in self.__get_ngrams__(normalized_value):
+                ngram_lines = self._ngram_lines.get(ngram)
+                if not ngram_lines:
+                    return list()
+                postings.append(ngram_lines)
+
+            # Intersect the shortest postings first to keep the candidate set small.
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for ngram_lines in postings[1:]:
+                candidates.intersection_update(ngram_lines)
+                if not candidates:
+                    return list()
+            candidate_indices = sorted(candidates)
+
+        return [
+            self.di_lines[line_index]
+            for line_index in candidate_indices
+            if normalized_value in self._normalized_lines[line_index]
+        ]
+
+    def __get_ngrams__(self, text: str) -> set[str]:
+        return {
+            text[i:i + self.ngram_size]
+            for i in range(len(text) - self.ngram_size + 1)
+        }
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for containment matching, removing spaces and lowercasing, as in value_contains.
+
+    Args:
+        text: The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+
+    return text.replace(" ", "").lower()
+
+
 def find_matching_lines(
     value: str,
     di_lines: list[DIDocumentLine],
     value_matcher: callable = value_match,
+    line_index: Optional[DILineIndex] = None
 ) -> list[DIDocumentLine]:
     """
     Find lines in the pre-computed di_lines that match a given value.
@@ -209,6 +371,7 @@ def find_matching_lines(
         value: The value to match.
         di_lines: Precomputed list of DIDocumentLine instances.
         value_matcher: The function to use for matching values.
+        line_index: The optional index of di_lines. Used instead of scanning the lines when matching with value_match.
 
     Returns:
         list: The list of DIDocumentLine instances that match the given value.
@@ -219,6 +382,9 @@ def find_matching_lines(
     if not isinstance(value, str):
         value = str(value)
 
+    if line_index is not None and value_matcher is value_match:
+        return line_index.find_exact(value) or line_index.find_containing(value)
+
     matching_lines = [
         line for line in di_lines if value_matcher(value, line.content)
     ]
@@ -258,7 +424,8 @@ def get_field_confidence_score(
 
 def evaluate_confidence(
     extract_result: dict,
-    analyze_result: AnalyzeResult
+    analyze_result: AnalyzeResult,
+    detail: ConfidenceDetail = ConfidenceDetail.POLYGONS
 ):
     """
     Evaluate the confidence of extracted fields based on the Azure AI Document Intelligence analysis result.
@@ -266,12 +433,23 @@ def evaluate_confidence(
     Args:
         extract_result: The extracted fields to evaluate.
         analyze_result: The Azure AI Document Intelligence analysis result to evaluate against.
+        detail: The level of detail of the confidence evaluation of each field. Only `ConfidenceDetail.FULL` keeps references to the analysis result after evaluation. Defaults to `ConfidenceDetail.POLYGONS`.
 
     Returns:
         dict: The confidence evaluation of the extracted fields.
     """
 
-    di_lines = extract_lines(analyze_result, multiple_score_resolver=min)
+    di_lines = extract_lines(
+        analyze_result,
+        multiple_score_resolver=min,
+        normalize_polygons=detail != ConfidenceDetail.SCORES)
+    line_index = DILineIndex(di_lines)
+
+    # Leaf values are matched once per distinct value, e.g., repeated quantities or dates across line items.
+    evaluated_values: dict[str, tuple[list[DIDocumentLine], float]] = dict()
+
+    # The non-zero scores of the leaf values, collected in field order while evaluating, for the overall confidence.
+    confidence_scores: list[float] = list()
 
     def evaluate_field_value_confidence(
         value: any,
@@ -297,36 +475,40 @@ def evaluate_confidence(
                 for item in value
             ]
         else:
-            matching_lines = find_matching_lines(
-                value, di_lines, value_matcher=value_match)
-            field_confidence_score = get_field_confidence_score(
-                scores=[match.confidence for match in matching_lines],
-                default_score=0.0,
-                multiple_score_resolver=min
-            )
-            normalized_polygons = [
-                line.normalized_polygon for line in matching_lines
-            ]
-            return {
+            value_key = str(value) if value else ""
+            evaluated_value = evaluated_values.get(value_key)
+            if evaluated_value is None:
+                matching_lines = find_matching_lines(
+                    value_key, di_lines, value_matcher=value_match, line_index=line_index)
+                field_confidence_score = get_field_confidence_score(
+                    scores=[match.confidence for match in matching_lines],
+                    default_score=0.0,
+                    multiple_score_resolver=min
+                )
+                evaluated_value = (matching_lines, field_confidence_score)
+                evaluated_values[value_key] = evaluated_value
+
+            matching_lines, field_confidence_score = evaluated_value
+            if field_confidence_score:
+                confidence_scores.append(field_confidence_score)
+
+            field_confidence = {
                 "confidence": field_confidence_score,
-                "matching_lines": matching_lines,
-                "normalized_polygons": normalized_polygons,
                 "value": value
             }
+            if detail == ConfidenceDetail.FULL:
+                field_confidence["matching_lines"] = list(matching_lines)
+            if detail != ConfidenceDetail.SCORES:
+                field_confidence["normalized_polygons"] = [
+                    line.normalized_polygon for line in matching_lines
+                ]
+            return field_confidence
 
-    confidence = dict()
-
-    # Process each field concurrently.
-    with ThreadPoolExecutor() as executor:
-        future_to_field = {
-            executor.submit(evaluate_field_value_confidence, value): field
-            for field, value in extract_result.items()
-        }
-        for future in as_completed(future_to_field):
-            field = future_to_field[future]
-            confidence[field] = future.result()
+    confidence = {
+        field: evaluate_field_value_confidence(value)
+        for field, value in extract_result.items()
+    }
 
-    confidence_scores = get_confidence_values(confidence)
     confidence[OVERALL_CONFIDENCE_KEY] = sum(
         confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
 
@@ -1,14 +1,99 @@
-import tiktoken
+import json
 import math
+import re
+from bisect import bisect_left, bisect_right
 from openai.types.chat.chat_completion import Choice
 from shared.confidence.confidence_utils import get_confidence_values
 from shared.confidence.confidence_result import OVERALL_CONFIDENCE_KEY
 
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+JSON_STRING_END = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+JSON_LITERAL = re.compile(
+    r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null")
+
+
+def find_json_value_spans(text: str) -> dict[tuple, tuple[int, int]]:
+    """
+    Find the character spans of the values in a JSON document in a single pass.
+
+    Args:
+        text: The JSON document, e.g., the content of a structured output response.
+
+    Returns:
+        dict: The (start, end) character span of each string, number, boolean, and null value, keyed by its path of object keys and list indices. The span of a string excludes its quotes.
+
+    Raises:
+        ValueError: If the text is not a valid JSON document.
+    """
+
+    spans = dict()
+
+    def skip_whitespace(pos: int) -> int:
+        return JSON_WHITESPACE.match(text, pos).end()
+
+    def expect(pos: int, char: str) -> int:
+        if not text.startswith(char, pos):
+            raise ValueError(f"Expected '{char}' at position {pos}.")
+        return pos + 1
+
+    def parse_string(pos: int) -> int:
+        string_end = JSON_STRING_END.match(text, expect(pos, '"'))
+        if string_end is None:
+            raise ValueError(f"Unterminated string at position {pos}.")
+        return string_end.end()
+
+    def parse_value(pos: int, path: tuple) -> int:
+        pos = skip_whitespace(pos)
+
+        if text.startswith("{", pos):
+            pos = skip_whitespace(pos + 1)
+            if text.startswith("}", pos):
+                return pos + 1
+            while True:
+                key_end = parse_string(pos)
+                key = text[pos + 1:key_end - 1]
+                if "\\" in key:
+                    key = json.loads(text[pos:key_end])
+                pos = expect(skip_whitespace(key_end), ":")
+                pos = skip_whitespace(parse_value(pos, path + (key,)))
+                if text.startswith(",", pos):
+                    pos = skip_whitespace(pos + 1)
+                    continue
+                return expect(pos, "}")
+
+        if text.startswith("[", pos):
+            pos = skip_whitespace(pos + 1)
+            if text.startswith("]", pos):
+                return pos + 1
+            index = 0
+            while True:
+                pos = skip_whitespace(parse_value(pos, path + (index,)))
+                index += 1
+                if text.startswith(",", pos):
+                    pos += 1
+                    continue
+                return expect(pos, "]")
+
+        if text.startswith('"', pos):
+            end = parse_string(pos)
+            spans[path] = (pos + 1, end - 1)
+            return end
+
+        literal = JSON_LITERAL.match(text, pos)
+        if literal is None:
+            raise ValueError(f"Unexpected value at position {pos}.")
+        spans[path] = literal.span()
+        return literal.end()
+
+    if skip_whitespace(parse_value(0, ())) != len(text):
+        raise ValueError("Unexpected content after the JSON document.")
+
+    return spans
+
 
 def evaluate_confidence(
     extract_result: dict,
-    choice: Choice,
-    model: str = "gpt-4o"
+    choice: Choice
 ):
     """
     Evaluate confidence for each field value in the extracted result based on the logprobs of the response from Azure OpenAI.
@@ -16,7 +101,6 @@ def evaluate_confidence(
     Args:
         extract_result: The extraction result.
         choice: The choice object from the OpenAI response.
-        model: The model used for the response.
 
     Returns:
         dict: The confidence evaluation of the extraction result.
@@ -24,9 +108,6 @@ def evaluate_confidence(
 
     confidence = dict()
 
-    # Retrieves the specific encoding used for the OpenAI model that generated the response.
-    encoding = tiktoken.encoding_for_model(model)
-
     # To perform the confidence evaluation, we need the original text from the response, not just the object result.
     generated_text = choice.message.content
 
@@ -39,82 +120,76 @@ def evaluate_confidence(
     tokens = [token_logprob.token for token_logprob in logprobs]
     token_logprobs = [token_logprob.logprob for token_logprob in logprobs]
 
-    # Encode the entire generated text to map tokens to character positions
-    token_offsets = []
+    # Map tokens to character positions in the generated text. The token strings are the decoded text of each token, so their lengths give the offsets without re-encoding them.
+    token_starts = []
+    token_ends = []
     current_pos = 0
     for token in tokens:
-        token_bytes = encoding.encode(token, disallowed_special=())
-        token_str = encoding.decode(token_bytes)
-        token_length = len(token_str)
-        token_offsets.append((current_pos, current_pos + token_length))
-        current_pos += token_length
+        token_starts.append(current_pos)
+        current_pos += len(token)
+        token_ends.append(current_pos)
 
-    substr_offset = 0
+    # Align the response once, mapping the path of each value to its span, so repeated values, e.g., null or 0, are attributed to their own fields.
+    try:
+        value_spans = find_json_value_spans(generated_text or "")
+    except ValueError:
+        value_spans = dict()
 
-    def find_token_indices(substring: str, start_char: int):
+    def find_token_indices(start_char: int, end_char: int):
         """
-        Find the indices of tokens that contain a given substring.
+        Find the indices of tokens that cover a span of the generated text.
 
         Args:
-            substring: The substring to search for.
-            start_char: The starting character position of the substring.
+            start_char: The starting character position of the span.
+            end_char: The ending character position of the span.
 
         Returns:
-            list: The list of token indices that contain the substring.
+            list: The list of token indices that cover the span.
         """
 
-        substring_length = len(substring)
-        end_char = start_char + substring_length
-        indices = []
-        for idx, (start, end) in enumerate(token_offsets):
-            if start >= end_char:
-                break
-            if end > start_char:
-                indices.append(idx)
-        return indices
+        # The offsets are contiguous and ascending, so the covering tokens are the range from the first token ending after the start to the last token starting before the end.
+        first_index = bisect_right(token_ends, start_char)
+        last_index = bisect_left(token_starts, end_char, lo=first_index)
+        return list(range(first_index, last_index))
 
     def evaluate_field_value_confidence(
-        value: any
+        value: any,
+        path: tuple
     ):
         """
         Evaluate confidence for a field value based on the logprobs of the response.
 
         Args:
             value: The value to evaluate.
+            path: The path of object keys and list indices of the value in the response.
 
         Returns:
-            tuple: The confidence evaluation of the value and the updated substr_offset.
+            dict: The confidence evaluation of the value.
         """
 
-        nonlocal substr_offset
-
         if isinstance(value, dict):
             # Recursively evaluate confidence for nested values
             return {
-                key: evaluate_field_value_confidence(val)
+                key: evaluate_field_value_confidence(val, path + (key,))
                 for key, val in value.items()
             }
         elif isinstance(value, list):
             # Evaluate confidence for each item in the list
             return [
-                evaluate_field_value_confidence(item)
-                for item in value
+                evaluate_field_value_confidence(item, path + (index,))
+                for index, item in enumerate(value)
             ]
         else:
-            value_str = str(value)
-
-            try:
-                # Find the start index of the value in the generated text
-                start_index = generated_text.index(value_str, substr_offset)
-                substr_offset = start_index + len(value_str)
-            except ValueError:
+            # Find the span of the value in the generated text
+            value_span = value_spans.get(path)
+            if value_span is None:
                 return {
                     "confidence": 0.0,
                     "value": value
                 }
 
-            # Find all the token indices that cover the value string
-            token_indices = find_token_indices(value_str, start_index)
+            # Find all the token indices that cover the value
+            token_indices = find_token_indices(*value_span)
 
             if not token_indices:
                 return {
@@ -160,7 +235,7 @@ def evaluate_confidence(
             }
 
     for field, value in extract_result.items():
-        confidence[field] = evaluate_field_value_confidence(value)
+        confidence[field] = evaluate_field_value_confidence(value, (field,))
 
     confidence_scores = get_confidence_values(confidence)
 
@@ -4,6 +4,7 @@ When running locally, the Azure CLI credentials are used. When running in Azure,
 """
 
 from azure.identity import DefaultAzureCredential
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
 from shared import app_settings
 
 default_credential = DefaultAzureCredential(
@@ -17,3 +18,15 @@ default_credential = DefaultAzureCredential(
     process_timeout=10,
     managed_identity_client_id=app_settings.azure_client_id
 )
+
+# The asyncio-native equivalent of the default credential for async activities. The async credential chain has no interactive browser credential to exclude.
+default_async_credential = AsyncDefaultAzureCredential(
+    exclude_environment_credential=True,
+    exclude_visual_studio_code_credential=True,
+    exclude_shared_token_cache_credential=True,
+    exclude_developer_cli_credential=True,
+    exclude_powershell_credential=True,
+    exclude_workload_identity_credential=True,
+    process_timeout=10,
+    managed_identity_client_id=app_settings.azure_client_id
+)
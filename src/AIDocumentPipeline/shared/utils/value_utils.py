@@ -11,18 +11,28 @@ def flatten_dict(data, parent_key='', sep='_'):
         dict: The flattened dictionary with keys separated by the separator.
     """
 
-    items = []
-    for k, v in data.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
+    def prefix_keys(prefix, items):
+        for k, v in items:
+            yield (f"{prefix}{k}" if prefix else k), v
+
+    flattened = dict()
+
+    # Walk the dictionary iteratively with a stack of (key, value) iterators, so keys are flattened in order without recursion.
+    stack = [prefix_keys(f"{parent_key}{sep}" if parent_key else '', data.items())]
+    while stack:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+            continue
+
+        new_key, v = item
         if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
+            stack.append(prefix_keys(f"{new_key}{sep}", v.items()))
         elif isinstance(v, list):
-            for i, item in enumerate(v):
-                items.extend(flatten_dict(
-                    {f"{new_key}_{i}": item}, '', sep=sep).items())
+            stack.append(prefix_keys(f"{new_key}_", enumerate(v)))
         else:
-            items.append((new_key, v))
-    return dict(items)
+            flattened[new_key] = v
+    return flattened
 
 
 def value_match(value_a: any, value_b: any) -> bool:
@@ -0,0 +1,51 @@
+"""Defines helpers for fanning out Durable Functions tasks from an orchestrator with bounded concurrency.
+
+The helpers are generators that must be delegated to from an orchestrator using `yield from`, e.g.:
+
+    results = yield from task_all_bounded(context, [lambda: context.call_activity(name, input) for input in inputs], max_concurrency=10)
+"""
+
+from typing import Any, Callable, Generator
+import azure.durable_functions as df
+from azure.durable_functions.models.Task import TaskBase
+
+
+def task_all_bounded(context: df.DurableOrchestrationContext, task_factories: list[Callable[[], TaskBase]], max_concurrency: int) -> Generator[TaskBase, Any, list]:
+    """Schedules the tasks created by the specified factories, keeping at most `max_concurrency` tasks in flight, and waits for all of them to complete.
+
+    A new task is scheduled as soon as one in flight completes. Tasks are always scheduled in the order of the factories, so the orchestration replays deterministically.
+
+    :param context: The Durable Orchestration Context to schedule the tasks with.
+    :param task_factories: The functions that create the tasks to schedule, e.g., calling `context.call_activity`.
+    :param max_concurrency: The maximum number of tasks in flight. Values less than 1 schedule the tasks one at a time.
+    :return: The results of the tasks, in the order of the factories.
+    :raises Exception: The error of the first task that failed, matching the behavior of `context.task_all`.
+    """
+
+    max_concurrency = max(max_concurrency, 1)
+
+    # Scheduling everything at once is cheaper on history, so only window when required.
+    if len(task_factories) <= max_concurrency:
+        tasks = [task_factory() for task_factory in task_factories]
+        if not tasks:
+            return []
+        return (yield context.task_all(tasks))
+
+    results: list = [None] * len(task_factories)
+    in_flight: dict[TaskBase, int] = {}
+    next_index = 0
+
+    while next_index < len(task_factories) or in_flight:
+        while next_index < len(task_factories) and len(in_flight) < max_concurrency:
+            in_flight[task_factories[next_index]()] = next_index
+            next_index += 1
+
+        completed_task: TaskBase = yield context.task_any(list(in_flight))
+
+        index = in_flight.pop(completed_task)
+        if isinstance(completed_task.result, Exception):
+            raise completed_task.result
+
+        results[index] = completed_task.result
+
+    return results
@@ -0,0 +1,74 @@
+"""Sets the metadata of a blob in Azure Blob Storage.
+
+This module provides the blueprint for an Azure Function activity that sets the metadata of a blob in Azure Blob Storage without transferring its content.
+"""
+
+from __future__ import annotations
+from pydantic import Field
+from shared.workflows.validation_result import ValidationResult
+from storage.models.blob_storage_request import BlobStorageRequest
+from storage.services.azure_storage_client_factory import AsyncAzureStorageClientFactory
+import shared.identity as identity
+import azure.durable_functions as df
+import logging
+
+name = "SetBlobMetadata"
+bp = df.Blueprint()
+storage_factory = AsyncAzureStorageClientFactory(
+    identity.default_async_credential)
+
+
+@bp.function_name(name)
+@bp.activity_trigger(input_name="input", activity=name)
+async def run(input: Request) -> bool:
+    """Sets the metadata of a blob in Azure Blob Storage.
+
+    :param input: The blob storage information including the storage account, container, blob name, and metadata.
+    :return: True if the metadata was successfully set on the blob; otherwise, False.
+    """
+
+    validation_result = input.validate()
+    if not validation_result.is_valid:
+        logging.error(f"Invalid input: {validation_result.to_str()}")
+        return False
+
+    await storage_factory.set_blob_metadata(
+        input.storage_account_name, input.container_name, input.blob_name, input.metadata)
+
+    return True
+
+
+class Request(BlobStorageRequest):
+    """Defines the request payload for the `SetBlobMetadata` activity."""
+
+    metadata: dict[str, str] = Field(
+        description="The metadata to set on the blob, replacing any existing metadata.")
+
+    def validate(self) -> ValidationResult:
+        result = ValidationResult()
+
+        if not self.storage_account_name:
+            result.add_error("storage_account_name is required")
+
+        if not self.container_name:
+            result.add_error("container_name is required")
+
+        if not self.blob_name:
+            result.add_error("blob_name is required")
+
+        if not self.metadata:
+            result.add_error("metadata is required")
+
+        return result
+
+    @staticmethod
+    def to_json(obj: Request) -> str:
+        """Converts the object instance to a JSON string."""
+
+        return obj.model_dump_json()
+
+    @staticmethod
+    def from_json(json_str: str) -> Request:
+        """Converts a JSON string to the object instance."""
+
+        return Request.model_validate_json(json_str)
@@ -5,21 +5,23 @@ This module provides the blueprint for an Azure Function activity that writes a
 
 from __future__ import annotations
 from pydantic import Field
+from typing import Optional
 from shared.workflows.validation_result import ValidationResult
 from storage.models.blob_storage_request import BlobStorageRequest
-from storage.services.azure_storage_client_factory import AzureStorageClientFactory
+from storage.services.azure_storage_client_factory import AsyncAzureStorageClientFactory
 import shared.identity as identity
 import azure.durable_functions as df
 import logging
 
 name = "WriteBytesToBlob"
 bp = df.Blueprint()
-storage_factory = AzureStorageClientFactory(identity.default_credential)
+storage_factory = AsyncAzureStorageClientFactory(
+    identity.default_async_credential)
 
 
 @bp.function_name(name)
 @bp.activity_trigger(input_name="input", activity=name)
-def run(input: Request) -> bool:
+async def run(input: Request) -> bool:
     """Writes a byte array to a blob in Azure Blob Storage.
 
     :param input: The blob storage information including the buffer byte array, storage account, container, and blob name.
@@ -31,15 +33,15 @@ def run(input: Request) -> bool:
         logging.error(f"Invalid input: {validation_result.to_str()}")
         return False
 
-    blob_container_client = storage_factory.get_blob_service_client(
-        input.storage_account_name).get_container_client(input.container_name)
+    blob_container_client = storage_factory.get_container_client(
+        input.storage_account_name, input.container_name)
 
-    if not blob_container_client.exists():
-        blob_container_client.create_container()
+    if not await blob_container_client.exists():
+        await blob_container_client.create_container()
 
     blob_client = blob_container_client.get_blob_client(input.blob_name)
 
-    blob_client.upload_blob(input.content, overwrite=input.overwrite)
+    await blob_client.upload_blob(input.content, overwrite=input.overwrite, metadata=input.metadata)
 
     return True
 
@@ -53,6 +55,10 @@ class Request(BlobStorageRequest):
         default=True,
         description="A flag indicating whether to overwrite an existing blob with the same name. Default is `True`."
     )
+    metadata: Optional[dict[str, str]] = Field(
+        default=None,
+        description="The optional metadata to set on the blob."
+    )
 
     def validate(self) -> ValidationResult:
         result = ValidationResult()
@@ -1,36 +1,314 @@
 from typing import Optional
+from collections import OrderedDict
+import asyncio
 import re
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from azure.core.pipeline.transport import RequestsTransport
 from azure.identity import DefaultAzureCredential
-from azure.storage.blob import BlobServiceClient
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
+from azure.storage.blob import BlobServiceClient, ContainerClient, BlobPrefix, BlobProperties
+from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient, ContainerClient as AsyncContainerClient, BlobPrefix as AsyncBlobPrefix
+
+DEVELOPMENT_STORAGE_CONNECTION_STRING = "AccountName=devstoreaccount1;AccountKey=Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==;DefaultEndpointsProtocol=http;BlobEndpoint=http://127.0.0.1:10000/devstoreaccount1;QueueEndpoint=http://127.0.0.1:10001/devstoreaccount1;TableEndpoint=http://127.0.0.1:10002/devstoreaccount1;"
 
 
 class AzureStorageClientFactory:
-    """Defines a factory class for creating Azure Storage service client instances."""
+    """Defines a factory class for creating Azure Storage service client instances.
+
+    Service and container clients are cached per storage account in a bounded, thread-safe cache and share a single HTTP transport, so blob operations reuse warm connections.
+    """
 
-    def __init__(self, credential: DefaultAzureCredential):
+    def __init__(self, credential: DefaultAzureCredential, max_clients: int = 16, idle_timeout: float = 300.0, max_connections: int = 100):
         """Initializes a new instance of the AzureStorageClientFactory class.
 
         :param credential: The Azure credential to use for authenticating with the Azure Storage service.
+        :param max_clients: The maximum number of service and container clients to cache. The least recently used client is evicted when the limit is reached. Default is 16.
+        :param idle_timeout: The number of seconds after which an unused client is evicted from the cache. Default is 300.
+        :param max_connections: The maximum number of connections per host in the shared connection pool. Default is 100.
         """
 
         self.credential = credential
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.clients_created = 0
+        self.clients_reused = 0
+        self.clients_evicted = 0
+        self._clients: OrderedDict[tuple, tuple[object, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_clients,
+                              pool_maxsize=max_connections)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        self._transport = RequestsTransport(
+            session=session, session_owner=False)
 
     def get_blob_service_client(self, storage_account_name: str) -> BlobServiceClient:
-        """Retrieves a `BlobServiceClient` instance for the specified Azure Storage account.
+        """Retrieves a cached `BlobServiceClient` instance for the specified Azure Storage account.
 
         :param storage_account_name: The name of the Azure Storage account. If the account is a development storage account (i.e., devstoreaccount1 or UseDevelopmentStorage=true), the client will be created using the development storage connection string.
         :return: A `BlobServiceClient` instance for the specified storage account.
         """
 
+        return self.__get_or_create__(
+            (storage_account_name,),
+            lambda: self.__create_blob_service_client__(storage_account_name))
+
+    def get_container_client(self, storage_account_name: str, container_name: str) -> ContainerClient:
+        """Retrieves a cached `ContainerClient` instance for the specified container in an Azure Storage account.
+
+        :param storage_account_name: The name of the Azure Storage account.
+        :param container_name: The name of the container within the storage account.
+        :return: A `ContainerClient` instance for the specified container.
+        """
+
+        return self.__get_or_create__(
+            (storage_account_name, container_name),
+            lambda: self.get_blob_service_client(storage_account_name).get_container_client(container_name))
+
+    def get_stats(self) -> dict[str, int]:
+        """Retrieves the size and reuse counters of the client cache.
+
+        :return: A dictionary containing the number of cached clients, and the number of clients created, reused, and evicted.
+        """
+
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "clients_created": self.clients_created,
+                "clients_reused": self.clients_reused,
+                "clients_evicted": self.clients_evicted
+            }
+
+    def get_blob_content(self, storage_account_name: str, container_name: str, blob_name: str) -> bytes:
+        """Retrieves the content of a specific blob in Azure Blob Storage as a byte array.
+
+        :param storage_account_name: The name of the Azure Storage account.
+        :param container_name: The name of the container within the storage account.
+        :param blob_name: The name of the blob to retrieve.
+        :return: The byte array content of the specified blob.
+        """
+
+        blob_client = self.get_container_client(
+            storage_account_name, container_name).get_blob_client(blob_name)
+        return blob_client.download_blob().readall()
+
+    def get_blob_content_and_etag(self, storage_account_name: str, container_name: str, blob_name: str) -> tuple[bytes, str]:
+        """Retrieves the content of a specific blob in Azure Blob Storage as a byte array, along with the ETag of the downloaded version.
+
+        :param storage_account_name: The name of the Azure Storage account.
+        :param container_name: The name of the container within the storage account.
+        :param blob_name: The name of the blob to retrieve.
+        :return: A tuple containing the byte array content and the ETag of the specified blob.
+        """
+
+        blob_client = self.get_container_client(
+            storage_account_name, container_name).get_blob_client(blob_name)
+        downloader = blob_client.download_blob()
+        return downloader.readall(), downloader.properties.etag
+
+    def get_blobs_by_folder_at_root(self, storage_account_name: str, container_name: str, regex_filter: Optional[str | re.Pattern] = None) -> dict[str, list[str]]:
+        """Retrieves a list of blob names grouped by folder at the root level of the container.
+
+        Any blobs in the root of the container are grouped by the folder name.
+
+        :param storage_account_name: The name of the Azure Storage account.
+        :param container_name: The name of the container within the storage account.
+        :param regex_filter: An optional regular expression filter to apply to the blob names.
+        :return: A dictionary containing the blob names grouped by folder.
+        """
+
+        container_client = self.get_container_client(
+            storage_account_name, container_name)
+
+        blob_filter = compile_blob_filter(regex_filter)
+        blob_names = []
+
+        for blob in container_client.list_blobs():
+            if not blob_filter or blob_filter.match(blob.name):
+                blob_names.append(blob.name)
+
+        return group_blob_names_by_folder(container_name, blob_names)
+
+    def get_blobs_by_folder_page(self, storage_account_name: str, container_name: str, regex_filter: Optional[str | re.Pattern] = None, continuation_token: Optional[str] = None, page_size: int = 100) -> tuple[dict[str, list[str]], Optional[str]]:
+        """Retrieves a page of blob names grouped by folder at the root level of the container, using a hierarchical listing of the container.
+
+        Only the folders in the page are listed in full, so callers can start processing folders before a large container has been listed.
+        Any blobs in the root of the container are grouped by the folder name.
+
+        :param storage_account_name: The name of the Azure Storage account.
+        :param container_name: The name of the container within the storage account.
+        :param regex_filter: An optional regular expression filter to apply to the blob names.
+        :param continuation_token: The optional continuation token returned by the previous page.
+        :param page_size: The maximum number of folders and root blobs in the page. Default is 100.
+        :return: A tuple containing the blob names grouped by folder, and the continuation token of the next page, or None if this is the last page.
+        """
+
+        folders, next_continuation_token = self.get_blob_properties_by_folder_page(
+            storage_account_name, container_name, continuation_token, page_size)
+
+        return group_blob_names_by_folder(container_name, filter_blob_names(folders, regex_filter)), next_continuation_token
+
+    def get_blob_properties_by_folder_page(self, storage_account_name: str, container_name: str, continuation_token: Optional[str] = None, page_size: int = 100, include: Optional[list[str]] = None) -> tuple[dict[str, list[BlobProperties]], Optional[str]]:
+        """Retrieves a page of blob properties grouped by folder at the root level of the container, using a hierarchical listing of the container.
+
+        Any blobs in the root of the container are grouped by the container name.
+
+        :param storage_account_name: The name of the Azure Storage account.
+        :param container_name: The name of the container within the storage account.
+        :param continuation_token: The optional continuation token returned by the previous page.
+        :param page_size: The maximum number of folders and root blobs in the page. Default is 100.
+        :param include: The optional additional datasets to include in the blob properties, e.g., metadata.
+        :return: A tuple containing the blob properties grouped by folder, and the continuation token of the next page, or None if this is the last page.
+        """
+
+        container_client = self.get_container_client(
+            storage_account_name, container_name)
+
+        pages = container_client.walk_blobs(
+            delimiter="/", include=include, results_per_page=page_size).by_page(continuation_token=continuation_token)
+        page = next(pages)
+
+        folders: dict[str, list[BlobProperties]] = {}
+        for item in page:
+            if isinstance(item, BlobPrefix):
+                folders.setdefault(item.name.rstrip("/"), []).extend(
+                    container_client.list_blobs(name_starts_with=item.name, include=include))
+            else:
+                folders.setdefault(container_name, []).append(item)
+
+        return folders, pages.continuation_token
+
+    def __get_or_create__(self, key: tuple, factory: callable):
+        now = time.monotonic()
+
+        with self._lock:
+            self.__evict_idle_clients__(now)
+
+            cached = self._clients.get(key)
+            if cached is not None:
+                self._clients[key] = (cached[0], now)
+                self._clients.move_to_end(key)
+                self.clients_reused += 1
+                return cached[0]
+
+        client = factory()
+
+        with self._lock:
+            cached = self._clients.get(key)
+            if cached is not None:
+                self.clients_reused += 1
+                return cached[0]
+
+            self._clients[key] = (client, now)
+            self.clients_created += 1
+
+            while len(self._clients) > self.max_clients:
+                _, (evicted_client, _) = self._clients.popitem(last=False)
+                self.__close_client__(evicted_client)
+
+            return client
+
+    def __evict_idle_clients__(self, now: float):
+        idle_keys = [
+            key for key, (_, last_used) in self._clients.items()
+            if now - last_used > self.idle_timeout
+        ]
+        for key in idle_keys:
+            client, _ = self._clients.pop(key)
+            self.__close_client__(client)
+
+    def __close_client__(self, client):
+        # The shared transport is not owned by the client, so closing it does not close pooled connections.
+        self.clients_evicted += 1
+        client.close()
+
+    def __create_blob_service_client__(self, storage_account_name: str) -> BlobServiceClient:
         if self.__is_development_storage_account__(storage_account_name):
-            return BlobServiceClient.from_connection_string("AccountName=devstoreaccount1;AccountKey=Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==;DefaultEndpointsProtocol=http;BlobEndpoint=http://127.0.0.1:10000/devstoreaccount1;QueueEndpoint=http://127.0.0.1:10001/devstoreaccount1;TableEndpoint=http://127.0.0.1:10002/devstoreaccount1;")
+            return BlobServiceClient.from_connection_string(DEVELOPMENT_STORAGE_CONNECTION_STRING, transport=self._transport)
         else:
             return BlobServiceClient(
+                f"https://{storage_account_name}.blob.core.windows.net",
+                credential=self.credential,
+                transport=self._transport
+            )
+
+    def __is_development_storage_account__(self, storage_account_name: str) -> bool:
+        return is_development_storage_account(storage_account_name)
+
+
+class AsyncAzureStorageClientFactory:
+    """Defines an asyncio-native factory class for creating Azure Storage service client instances.
+
+    Service clients are cached per storage account for the lifetime of the factory, so blob operations reuse the warm connections of each client's aiohttp session.
+    """
+
+    def __init__(self, credential: AsyncDefaultAzureCredential):
+        """Initializes a new instance of the AsyncAzureStorageClientFactory class.
+
+        :param credential: The asynchronous Azure credential to use for authenticating with the Azure Storage service.
+        """
+
+        self.credential = credential
+        self.clients_created = 0
+        self.clients_reused = 0
+        self._clients: dict[str, AsyncBlobServiceClient] = {}
+
+    def get_blob_service_client(self, storage_account_name: str) -> AsyncBlobServiceClient:
+        """Retrieves a cached asynchronous `BlobServiceClient` instance for the specified Azure Storage account.
+
+        :param storage_account_name: The name of the Azure Storage account. If the account is a development storage account (i.e., devstoreaccount1 or UseDevelopmentStorage=true), the client will be created using the development storage connection string.
+        :return: An asynchronous `BlobServiceClient` instance for the specified storage account.
+        """
+
+        # Clients are only accessed from the event loop, so no lock is required.
+        client = self._clients.get(storage_account_name)
+        if client is not None:
+            self.clients_reused += 1
+            return client
+
+        if is_development_storage_account(storage_account_name):
+            client = AsyncBlobServiceClient.from_connection_string(
+                DEVELOPMENT_STORAGE_CONNECTION_STRING)
+        else:
+            client = AsyncBlobServiceClient(
                 f"https://{storage_account_name}.blob.core.windows.net",
                 credential=self.credential
             )
 
-    def get_blob_content(self, storage_account_name: str, container_name: str, blob_name: str) -> bytes:
+        self._clients[storage_account_name] = client
+        self.clients_created += 1
+        return client
+
+    def get_container_client(self, storage_account_name: str, container_name: str) -> AsyncContainerClient:
+        """Retrieves an asynchronous `ContainerClient` instance for the specified container in an Azure Storage account.
+
+        Container clients share the pipeline of the cached service client, so they are cheap to create.
+
+        :param storage_account_name: The name of the Azure Storage account.
+        :param container_name: The name of the container within the storage account.
+        :return: An asynchronous `ContainerClient` instance for the specified container.
+        """
+
+        return self.get_blob_service_client(storage_account_name).get_container_client(container_name)
+
+    def get_stats(self) -> dict[str, int]:
+        """Retrieves the size and reuse counters of the client cache.
+
+        :return: A dictionary containing the number of cached clients, and the number of clients created and reused.
+        """
+
+        return {
+            "clients": len(self._clients),
+            "clients_created": self.clients_created,
+            "clients_reused": self.clients_reused
+        }
+
+    async def get_blob_content(self, storage_account_name: str, container_name: str, blob_name: str) -> bytes:
         """Retrieves the content of a specific blob in Azure Blob Storage as a byte array.
 
         :param storage_account_name: The name of the Azure Storage account.
@@ -39,13 +317,54 @@ class AzureStorageClientFactory:
         :return: The byte array content of the specified blob.
         """
 
-        blob_service_client = self.get_blob_service_client(
-            storage_account_name)
-        blob_client = blob_service_client.get_blob_client(
-            container_name, blob_name)
-        return blob_client.download_blob().readall()
+        blob_client = self.get_container_client(
+            storage_account_name, container_name).get_blob_client(blob_name)
+        downloader = await blob_client.download_blob()
+        return await downloader.readall()
+
+    async def get_blob_content_and_etag(self, storage_account_name: str, container_name: str, blob_name: str) -> tuple[bytes, str]:
+        """Retrieves the content of a specific blob in Azure Blob Storage as a byte array, along with the ETag of the downloaded version.
+
+        :param storage_account_name: The name of the Azure Storage account.
+        :param container_name: The name of the container within the storage account.
+        :param blob_name: The name of the blob to retrieve.
+        :return: A tuple containing the byte array content and the ETag of the specified blob.
+        """
+
+        blob_client = self.get_container_client(
+            storage_account_name, container_name).get_blob_client(blob_name)
+        downloader = await blob_client.download_blob()
+        return await downloader.readall(), downloader.properties.etag
+
+    async def upload_blob_content(self, storage_account_name: str, container_name: str, blob_name: str, content: bytes, overwrite: bool = True, metadata: Optional[dict[str, str]] = None):
+        """Uploads a byte array as the content of a specific blob in Azure Blob Storage.
+
+        :param storage_account_name: The name of the Azure Storage account.
+        :param container_name: The name of the container within the storage account. The container must exist.
+        :param blob_name: The name of the blob to upload.
+        :param content: The byte array content to upload.
+        :param overwrite: A flag indicating whether to overwrite an existing blob with the same name, replacing its metadata. Default is `True`.
+        :param metadata: The optional metadata to set on the blob.
+        """
+
+        blob_client = self.get_container_client(
+            storage_account_name, container_name).get_blob_client(blob_name)
+        await blob_client.upload_blob(content, overwrite=overwrite, metadata=metadata)
 
-    def get_blobs_by_folder_at_root(self, storage_account_name: str, container_name: str, regex_filter: Optional[str] = None) -> dict[str, list[str]]:
+    async def set_blob_metadata(self, storage_account_name: str, container_name: str, blob_name: str, metadata: dict[str, str]):
+        """Sets the metadata of a specific blob in Azure Blob Storage, replacing any existing metadata, without transferring its content.
+
+        :param storage_account_name: The name of the Azure Storage account.
+        :param container_name: The name of the container within the storage account.
+        :param blob_name: The name of the blob.
+        :param metadata: The metadata to set on the blob.
+        """
+
+        blob_client = self.get_container_client(
+            storage_account_name, container_name).get_blob_client(blob_name)
+        await blob_client.set_blob_metadata(metadata)
+
+    async def get_blobs_by_folder_at_root(self, storage_account_name: str, container_name: str, regex_filter: Optional[str | re.Pattern] = None) -> dict[str, list[str]]:
         """Retrieves a list of blob names grouped by folder at the root level of the container.
 
         Any blobs in the root of the container are grouped by the folder name.
@@ -56,30 +375,148 @@ class AzureStorageClientFactory:
         :return: A dictionary containing the blob names grouped by folder.
         """
 
-        blob_service_client = self.get_blob_service_client(
-            storage_account_name)
-        container_client = blob_service_client.get_container_client(
-            container_name)
+        container_client = self.get_container_client(
+            storage_account_name, container_name)
 
+        blob_filter = compile_blob_filter(regex_filter)
         blob_names = []
 
-        for blob in container_client.list_blobs():
-            if not regex_filter or re.match(regex_filter, blob.name):
+        async for blob in container_client.list_blobs():
+            if not blob_filter or blob_filter.match(blob.name):
                 blob_names.append(blob.name)
 
-        # If there are blob names that don't contain a '/', append the container name to the start of the blob name
-        # Otherwise, return the blob names as is
-        blob_names = list(
-            map(lambda x: f"{container_name}/{x}" if x.find('/') == -1 else x, blob_names))
+        return group_blob_names_by_folder(container_name, blob_names)
 
-        grouped_folders = {}
-        for blob_name in blob_names:
-            folder_name = blob_name.split('/')[0]
-            if folder_name not in grouped_folders:
-                grouped_folders[folder_name] = []
-            grouped_folders[folder_name].append(blob_name)
+    async def get_blobs_by_folder_page(self, storage_account_name: str, container_name: str, regex_filter: Optional[str | re.Pattern] = None, continuation_token: Optional[str] = None, page_size: int = 100) -> tuple[dict[str, list[str]], Optional[str]]:
+        """Retrieves a page of blob names grouped by folder at the root level of the container, using a hierarchical listing of the container.
 
-        return grouped_folders
+        Only the folders in the page are listed in full, concurrently, so callers can start processing folders before a large container has been listed.
+        Any blobs in the root of the container are grouped by the folder name.
 
-    def __is_development_storage_account__(self, storage_account_name: str) -> bool:
-        return storage_account_name and (storage_account_name.lower() == "devstoreaccount1" or storage_account_name.lower().startswith("usedevelopmentstorage"))
+        :param storage_account_name: The name of the Azure Storage account.
+        :param container_name: The name of the container within the storage account.
+        :param regex_filter: An optional regular expression filter to apply to the blob names.
+        :param continuation_token: The optional continuation token returned by the previous page.
+        :param page_size: The maximum number of folders and root blobs in the page. Default is 100.
+        :return: A tuple containing the blob names grouped by folder, and the continuation token of the next page, or None if this is the last page.
+        """
+
+        folders, next_continuation_token = await self.get_blob_properties_by_folder_page(
+            storage_account_name, container_name, continuation_token, page_size)
+
+        return group_blob_names_by_folder(container_name, filter_blob_names(folders, regex_filter)), next_continuation_token
+
+    async def get_blob_properties_by_folder_page(self, storage_account_name: str, container_name: str, continuation_token: Optional[str] = None, page_size: int = 100, include: Optional[list[str]] = None) -> tuple[dict[str, list[BlobProperties]], Optional[str]]:
+        """Retrieves a page of blob properties grouped by folder at the root level of the container, using a hierarchical listing of the container.
+
+        The folders in the page are listed concurrently. Any blobs in the root of the container are grouped by the container name.
+
+        :param storage_account_name: The name of the Azure Storage account.
+        :param container_name: The name of the container within the storage account.
+        :param continuation_token: The optional continuation token returned by the previous page.
+        :param page_size: The maximum number of folders and root blobs in the page. Default is 100.
+        :param include: The optional additional datasets to include in the blob properties, e.g., metadata.
+        :return: A tuple containing the blob properties grouped by folder, and the continuation token of the next page, or None if this is the last page.
+        """
+
+        container_client = self.get_container_client(
+            storage_account_name, container_name)
+
+        pages = container_client.walk_blobs(
+            delimiter="/", include=include, results_per_page=page_size).by_page(continuation_token=continuation_token)
+        page = await pages.__anext__()
+
+        async def list_folder_blobs(prefix: str) -> list[BlobProperties]:
+            return [blob async for blob in container_client.list_blobs(name_starts_with=prefix, include=include)]
+
+        root_blobs = []
+        folder_prefixes = []
+        async for item in page:
+            if isinstance(item, AsyncBlobPrefix):
+                folder_prefixes.append(item.name)
+            else:
+                root_blobs.append(item)
+
+        folder_blobs = await asyncio.gather(
+            *[list_folder_blobs(prefix) for prefix in folder_prefixes])
+
+        folders: dict[str, list[BlobProperties]] = {}
+        if root_blobs:
+            folders[container_name] = root_blobs
+        for prefix, blobs in zip(folder_prefixes, folder_blobs):
+            folders.setdefault(prefix.rstrip("/"), []).extend(blobs)
+
+        return folders, pages.continuation_token
+
+    async def close(self):
+        """Closes the cached service clients and their connection pools."""
+
+        clients = list(self._clients.values())
+        self._clients.clear()
+
+        for client in clients:
+            await client.close()
+
+
+def group_blob_names_by_folder(container_name: str, blob_names: list[str]) -> dict[str, list[str]]:
+    """Groups blob names by the folder at the root level of the container.
+
+    :param container_name: The name of the container, used as the folder name of blobs in the root of the container.
+    :param blob_names: The blob names to group.
+    :return: A dictionary containing the blob names grouped by folder.
+    """
+
+    # If there are blob names that don't contain a '/', append the container name to the start of the blob name
+    # Otherwise, return the blob names as is
+    blob_names = list(
+        map(lambda x: f"{container_name}/{x}" if x.find('/') == -1 else x, blob_names))
+
+    grouped_folders = {}
+    for blob_name in blob_names:
+        folder_name = blob_name.split('/')[0]
+        if folder_name not in grouped_folders:
+            grouped_folders[folder_name] = []
+        grouped_folders[folder_name].append(blob_name)
+
+    return grouped_folders
+
+
+def filter_blob_names(folders: dict[str, list[BlobProperties]], regex_filter: Optional[str | re.Pattern]) -> list[str]:
+    """Retrieves the names of the blobs grouped by folder that match the specified filter.
+
+    :param folders: The blob properties grouped by folder.
+    :param regex_filter: The optional regular expression filter to apply to the blob names.
+    :return: The matching blob names, in folder order.
+    """
+
+    blob_filter = compile_blob_filter(regex_filter)
+
+    return [
+        blob.name
+        for blobs in folders.values()
+        for blob in blobs
+        if not blob_filter or blob_filter.match(blob.name)
+    ]
+
+
+def compile_blob_filter(regex_filter: Optional[str | re.Pattern]) -> Optional[re.Pattern]:
+    """Compiles the specified blob name filter once, so it is not looked up in the regular expression cache for every blob.
+
+    :param regex_filter: The optional regular expression filter, either a pattern string or a compiled pattern.
+    :return: The compiled pattern, or None if no filter was specified.
+    """
+
+    if not regex_filter:
+        return None
+
+    return regex_filter if isinstance(regex_filter, re.Pattern) else re.compile(regex_filter)
+
+
+def is_development_storage_account(storage_account_name: str) -> bool:
+    """Determines whether the specified storage account name refers to the local development storage emulator.
+
+    :param storage_account_name: The name of the Azure Storage account.
+    :return: True if the account is devstoreaccount1 or UseDevelopmentStorage=true; otherwise, False.
+    """
+
+    return bool(storage_account_name) and (storage_account_name.lower() == "devstoreaccount1" or storage_account_name.lower().startswith("usedevelopmentstorage"))
@@ -1,7 +1,8 @@
 import azure.durable_functions as df
-from storage.activities import write_bytes_to_blob
+from storage.activities import write_bytes_to_blob, set_blob_metadata
 
 
 def register_storage(app: df.DFApp):
     """Register the storage-related activities and workflows with the Durable Functions app."""
     app.register_functions(write_bytes_to_blob.bp)
+    app.register_functions(set_blob_metadata.bp)
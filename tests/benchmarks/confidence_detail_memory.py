@@ -0,0 +1,52 @@
+"""Measures the memory used by each `ConfidenceDetail` level of the Document Intelligence `evaluate_confidence` with tracemalloc.
+
+Run from the repository root:
+
+    python tests/benchmarks/confidence_detail_memory.py --line-items 500
+"""
+
+import argparse
+import gc
+import pathlib
+import sys
+import time
+import tracemalloc
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src" / "AIDocumentPipeline"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from shared.confidence.document_intelligence_confidence import ConfidenceDetail, evaluate_confidence  # noqa: E402
+from support.document_intelligence import create_invoice  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--line-items", type=int, default=500)
+    args = parser.parse_args()
+
+    extract_result, analyze_result = create_invoice(args.line_items)
+
+    for detail in ConfidenceDetail:
+        gc.collect()
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        confidence = evaluate_confidence(extract_result, analyze_result, detail=detail)
+        elapsed = time.perf_counter() - start
+
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{detail.value}, {args.line_items} line items: "
+              f"retained {(retained - baseline) / 1024:.0f} KiB, "
+              f"peak {(peak - baseline) / 1024:.0f} KiB, "
+              f"time {elapsed * 1000:.1f} ms")
+
+        del confidence
+
+
+if __name__ == "__main__":
+    main()
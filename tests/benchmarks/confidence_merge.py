@@ -0,0 +1,63 @@
+"""Benchmarks the iterative confidence utilities against the previous recursive implementations on the confidence trees of a large invoice.
+
+Run from the repository root:
+
+    python tests/benchmarks/confidence_merge.py --line-items 2000
+"""
+
+import argparse
+import math
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src" / "AIDocumentPipeline"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from shared.confidence.confidence_utils import get_confidence_values, merge_confidence_values  # noqa: E402
+from shared.utils.value_utils import flatten_dict  # noqa: E402
+from support.confidence_utils import create_confidence, flatten_dict_recursive, get_confidence_values_recursive, merge_confidence_values_recursive  # noqa: E402
+
+
+def measure(function, iterations: int, *args) -> tuple[float, any]:
+    # Report the fastest run, as the shared benchmark host and garbage collection add noise to the mean.
+    best_time = math.inf
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = function(*args)
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--line-items", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    confidence_a = create_confidence(1, args.line_items)
+    confidence_b = create_confidence(2, args.line_items)
+
+    for name, recursive, iterative, function_args in [
+        ("merge_confidence_values", merge_confidence_values_recursive, merge_confidence_values, (confidence_a, confidence_b)),
+        ("get_confidence_values", get_confidence_values_recursive, get_confidence_values, (confidence_a,)),
+        ("flatten_dict", flatten_dict_recursive, flatten_dict, (confidence_a,)),
+    ]:
+        recursive_time, recursive_result = measure(recursive, args.iterations, *function_args)
+        iterative_time, iterative_result = measure(iterative, args.iterations, *function_args)
+        assert recursive_result == iterative_result, name
+        print(f"{name}, {args.line_items} line items: "
+              f"recursive {recursive_time * 1000:.1f} ms, "
+              f"iterative {iterative_time * 1000:.1f} ms, "
+              f"speedup {recursive_time / iterative_time:.2f}x")
+
+    # Lists of different lengths keep the confidence of the evaluation containing the extra items.
+    shorter_b = dict(confidence_b, items=confidence_b["items"][:args.line_items // 2])
+    merged = merge_confidence_values(confidence_a, shorter_b)
+    assert len(merged["items"]) == args.line_items
+    assert math.isclose(merged["items"][-1]["quantity"]["confidence"], confidence_a["items"][-1]["quantity"]["confidence"])
+
+
+if __name__ == "__main__":
+    main()
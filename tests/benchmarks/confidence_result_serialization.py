@@ -0,0 +1,58 @@
+"""Benchmarks the serialized size and encode/decode time of `ConfidenceResult` payloads for invoices, against the previous serialization.
+
+Run from the repository root:
+
+    python tests/benchmarks/confidence_result_serialization.py --line-items 200
+"""
+
+import argparse
+import math
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src" / "AIDocumentPipeline"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from shared.confidence.confidence_result import ConfidenceResult  # noqa: E402
+from support.confidence_result import create_result, from_json_previous, to_json_previous  # noqa: E402
+
+
+def measure(encode, decode, result: ConfidenceResult, iterations: int) -> tuple[int, float, float]:
+    encode_time = decode_time = math.inf
+    for _ in range(iterations):
+        start = time.perf_counter()
+        json_str = encode(result)
+        encode_time = min(encode_time, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        decoded = decode(json_str)
+        decode_time = min(decode_time, time.perf_counter() - start)
+
+    assert decoded.data == result.data
+    return len(json_str), encode_time, decode_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--line-items", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    result = create_result(args.line_items, seed=42)
+
+    for name, encode, decode in [
+        ("previous", to_json_previous, from_json_previous),
+        ("compact", lambda obj: ConfidenceResult.to_json(obj, compression_threshold=None), ConfidenceResult.from_json),
+        ("compact + compressed", lambda obj: ConfidenceResult.to_json(obj, compression_threshold=0), ConfidenceResult.from_json),
+    ]:
+        size, encode_time, decode_time = measure(encode, decode, result, args.iterations)
+        print(f"{name}, {args.line_items} line items: "
+              f"{size / 1024:.1f} KiB, "
+              f"encode {encode_time * 1000:.2f} ms, "
+              f"decode {decode_time * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmarks `evaluate_confidence` against the previous evaluation, which fanned out each top-level field to a thread pool and matched every leaf value.
+
+Run from the repository root:
+
+    python tests/benchmarks/field_confidence_evaluation.py --line-items 500
+"""
+
+import argparse
+import math
+import pathlib
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src" / "AIDocumentPipeline"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from azure.ai.documentintelligence.models import AnalyzeResult  # noqa: E402
+from shared.confidence.confidence_result import OVERALL_CONFIDENCE_KEY  # noqa: E402
+from shared.confidence.confidence_utils import get_confidence_values  # noqa: E402
+from shared.confidence.document_intelligence_confidence import DILineIndex, evaluate_confidence, extract_lines, find_matching_lines, get_field_confidence_score  # noqa: E402
+from support.document_intelligence import create_invoice  # noqa: E402
+
+
+def evaluate_confidence_thread_pool(extract_result: dict, analyze_result: AnalyzeResult) -> dict:
+    # The previous implementation, evaluating each top-level field in a thread pool created per call.
+    di_lines = extract_lines(analyze_result, multiple_score_resolver=min)
+    line_index = DILineIndex(di_lines)
+
+    def evaluate_field_value_confidence(value):
+        if isinstance(value, dict):
+            return {key: evaluate_field_value_confidence(val) for key, val in value.items()}
+        elif isinstance(value, list):
+            return [evaluate_field_value_confidence(item) for item in value]
+        else:
+            matching_lines = find_matching_lines(value, di_lines, line_index=line_index)
+            return {
+                "confidence": get_field_confidence_score(
+                    scores=[match.confidence for match in matching_lines], default_score=0.0, multiple_score_resolver=min),
+                "matching_lines": matching_lines,
+                "normalized_polygons": [line.normalized_polygon for line in matching_lines],
+                "value": value
+            }
+
+    confidence = dict()
+    with ThreadPoolExecutor() as executor:
+        future_to_field = {
+            executor.submit(evaluate_field_value_confidence, value): field
+            for field, value in extract_result.items()
+        }
+        for future in as_completed(future_to_field):
+            confidence[future_to_field[future]] = future.result()
+
+    confidence_scores = get_confidence_values(confidence)
+    confidence[OVERALL_CONFIDENCE_KEY] = sum(
+        confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
+    return confidence
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--line-items", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    extract_result, analyze_result = create_invoice(args.line_items)
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        thread_pool_confidence = evaluate_confidence_thread_pool(extract_result, analyze_result)
+    thread_pool_time = (time.perf_counter() - start) / args.iterations
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        confidence = evaluate_confidence(extract_result, analyze_result)
+    evaluate_time = (time.perf_counter() - start) / args.iterations
+
+    # The thread pool completes fields in any order, so the overall scores may differ by rounding.
+    assert math.isclose(confidence[OVERALL_CONFIDENCE_KEY], thread_pool_confidence[OVERALL_CONFIDENCE_KEY])
+    assert [item["quantity"]["confidence"] for item in confidence["items"]] == [
+        item["quantity"]["confidence"] for item in thread_pool_confidence["items"]]
+
+    print(f"{args.line_items} line items: "
+          f"thread pool {thread_pool_time * 1000:.1f} ms, "
+          f"evaluate_confidence {evaluate_time * 1000:.1f} ms, "
+          f"speedup {thread_pool_time / evaluate_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmarks matching field values with a `DILineIndex` against scanning every line for every value.
+
+Run from the repository root:
+
+    python tests/benchmarks/line_text_index.py --lines 2000 --values 200
+"""
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src" / "AIDocumentPipeline"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from shared.confidence.document_intelligence_confidence import DILineIndex, find_matching_lines  # noqa: E402
+from support.document_intelligence import LINE_WORDS, create_lines  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--values", type=int, default=200)
+    args = parser.parse_args()
+
+    di_lines = create_lines(42, args.lines)
+    rng = random.Random(7)
+    values = [rng.choice(di_lines[:args.lines]).content for _ in range(args.values // 2)]
+    values += [f"{rng.choice(LINE_WORDS)} {rng.randint(0, args.lines)}" for _ in range(args.values - len(values))]
+
+    start = time.perf_counter()
+    scan_matches = [find_matching_lines(value, di_lines) for value in values]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    line_index = DILineIndex(di_lines)
+    build_time = time.perf_counter() - start
+    index_matches = [find_matching_lines(value, di_lines, line_index=line_index) for value in values]
+    index_time = time.perf_counter() - start
+
+    assert scan_matches == index_matches
+
+    print(f"{args.lines} lines x {args.values} values: "
+          f"scan {scan_time * 1000:.1f} ms, "
+          f"index {index_time * 1000:.1f} ms (build {build_time * 1000:.1f} ms), "
+          f"speedup {scan_time / index_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
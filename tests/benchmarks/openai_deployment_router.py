@@ -0,0 +1,146 @@
+"""Simulates a batch of concurrent requests balanced across a pool of Azure OpenAI deployments with different latencies and quotas, one of which fails for a period, comparing round-robin routing with the deployment router.
+
+Run from the repository root:
+
+    python tests/benchmarks/openai_deployment_router.py --requests 300 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import datetime
+import itertools
+import pathlib
+import sys
+import time
+from collections import deque
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src" / "AIDocumentPipeline"))
+
+import httpx  # noqa: E402
+from openai import InternalServerError, RateLimitError  # noqa: E402
+from shared.clients.deployment_router import DeploymentRouter, OpenAIDeployment  # noqa: E402
+from shared.clients.rate_limiter import RateLimiter, RateLimitOptions  # noqa: E402
+
+WINDOW_SECONDS = 1.0
+
+
+class RawResponse:
+    """Simulates the raw response of `with_raw_response`."""
+
+    def __init__(self, headers: dict, elapsed: float, tokens: int):
+        self.headers = httpx.Headers(headers)
+        self.elapsed = datetime.timedelta(seconds=elapsed)
+        self.tokens = tokens
+
+    def parse(self) -> int:
+        return self.tokens
+
+
+class SimulatedDeployment:
+    """Simulates a deployment admitting a number of tokens per sliding window with a fixed latency, failing with 503 during an outage."""
+
+    def __init__(self, name: str, latency: float, tokens_per_window: int, outage: tuple[float, float] = (0.0, 0.0)):
+        self.deployment = OpenAIDeployment(f"https://{name}.openai.azure.com", "gpt-4o")
+        self.latency = latency
+        self.tokens_per_window = tokens_per_window
+        self.outage = outage
+        self.admitted: deque[tuple[float, int]] = deque()
+        self.completed = 0
+        self.throttled = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+
+    def __error__(self, status_code: int, error_type, headers: dict):
+        response = httpx.Response(
+            status_code, headers=headers, request=httpx.Request("POST", self.deployment.endpoint))
+        return error_type("Simulated failure", response=response, body=None)
+
+    async def complete(self, tokens: int) -> RawResponse:
+        now = time.monotonic()
+        if self.outage[0] <= now - self.started_at < self.outage[1]:
+            self.failed += 1
+            await asyncio.sleep(0.05)
+            raise self.__error__(503, InternalServerError, {})
+
+        while self.admitted and self.admitted[0][0] <= now - WINDOW_SECONDS:
+            self.admitted.popleft()
+        used = sum(admitted_tokens for _, admitted_tokens in self.admitted)
+        if used + tokens > self.tokens_per_window:
+            self.throttled += 1
+            retry_after = self.admitted[0][0] + WINDOW_SECONDS - now
+            raise self.__error__(429, RateLimitError, {"retry-after-ms": str(int(retry_after * 1000))})
+
+        self.admitted.append((now, tokens))
+        await asyncio.sleep(self.latency)
+        self.completed += 1
+        return RawResponse({"x-ratelimit-remaining-tokens": str(self.tokens_per_window - used - tokens)}, self.latency, tokens)
+
+
+def create_pool() -> list[SimulatedDeployment]:
+    return [
+        SimulatedDeployment("eastus", latency=0.05, tokens_per_window=60000),
+        SimulatedDeployment("westeurope", latency=0.15, tokens_per_window=40000, outage=(0.5, 2.0)),
+        SimulatedDeployment("swedencentral", latency=0.3, tokens_per_window=20000),
+    ]
+
+
+async def run_round_robin(requests: int, concurrency: int, tokens: int, options: RateLimitOptions) -> tuple[float, list[SimulatedDeployment]]:
+    pool = create_pool()
+    rate_limiter = RateLimiter()
+    next_deployment = itertools.cycle(pool)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send():
+        async with semaphore:
+            simulated = next(next_deployment)
+            return await rate_limiter.call_async(
+                simulated.deployment.key, options, lambda: simulated.complete(tokens), tokens)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send() for _ in range(requests)))
+    return time.perf_counter() - start, pool
+
+
+async def run_router(requests: int, concurrency: int, tokens: int, options: RateLimitOptions) -> tuple[float, list[SimulatedDeployment], dict]:
+    pool = create_pool()
+    router = DeploymentRouter(RateLimiter())
+    simulated_by_key = {simulated.deployment.key: simulated for simulated in pool}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send():
+        async with semaphore:
+            return await router.call_async(
+                [simulated.deployment for simulated in pool], options,
+                lambda deployment: simulated_by_key[deployment.key].complete(tokens), tokens)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(send() for _ in range(requests)))
+    assert results == [tokens] * requests
+    return time.perf_counter() - start, pool, router.get_stats()
+
+
+def describe(pool: list[SimulatedDeployment]) -> str:
+    return ", ".join(
+        f"{simulated.deployment.endpoint.split('//')[1].split('.')[0]} {simulated.completed} ok/{simulated.throttled} 429/{simulated.failed} 503"
+        for simulated in pool)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--tokens", type=int, default=2000)
+    args = parser.parse_args()
+
+    options = RateLimitOptions(max_retries=100, initial_backoff=0.05, max_backoff=1.0)
+
+    elapsed, pool = asyncio.run(run_round_robin(args.requests, args.concurrency, args.tokens, options))
+    print(f"round robin: {elapsed:.1f} s ({describe(pool)})")
+
+    elapsed, pool, stats = asyncio.run(run_router(args.requests, args.concurrency, args.tokens, options))
+    print(f"deployment router: {elapsed:.1f} s, {stats['failovers']} failovers ({describe(pool)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Simulates a batch of concurrent requests to an Azure OpenAI deployment that throttles above its tokens per minute, with and without client-side rate limiting.
+
+Run from the repository root:
+
+    python tests/benchmarks/openai_rate_limiter.py --requests 200 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import pathlib
+import sys
+import time
+from collections import deque
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src" / "AIDocumentPipeline"))
+
+import httpx  # noqa: E402
+from openai import RateLimitError  # noqa: E402
+from shared.clients.rate_limiter import RateLimiter, RateLimitOptions  # noqa: E402
+
+WINDOW_SECONDS = 1.0
+
+
+class ThrottlingDeployment:
+    """Simulates a deployment admitting a number of tokens per sliding window, returning 429 with a Retry-After header above it."""
+
+    def __init__(self, tokens_per_window: int):
+        self.tokens_per_window = tokens_per_window
+        self.admitted: deque[tuple[float, int]] = deque()
+        self.throttled = 0
+
+    async def complete(self, tokens: int) -> int:
+        now = time.monotonic()
+        while self.admitted and self.admitted[0][0] <= now - WINDOW_SECONDS:
+            self.admitted.popleft()
+
+        if sum(admitted_tokens for _, admitted_tokens in self.admitted) + tokens > self.tokens_per_window:
+            self.throttled += 1
+            retry_after = self.admitted[0][0] + WINDOW_SECONDS - now
+            response = httpx.Response(
+                429,
+                headers={"retry-after-ms": str(int(retry_after * 1000))},
+                request=httpx.Request("POST", "https://example.openai.azure.com"))
+            raise RateLimitError("Too Many Requests", response=response, body=None)
+
+        self.admitted.append((now, tokens))
+        await asyncio.sleep(0.01)
+        return tokens
+
+
+async def run_batch(requests: int, concurrency: int, tokens: int, tokens_per_window: int, limit: bool) -> tuple[float, int, dict]:
+    deployment = ThrottlingDeployment(tokens_per_window)
+    rate_limiter = RateLimiter()
+    # Scale the per-minute limit to the simulated window.
+    options = RateLimitOptions(
+        tokens_per_minute=int(tokens_per_window * 60 / WINDOW_SECONDS) if limit else None,
+        burst_seconds=WINDOW_SECONDS,
+        max_retries=100,
+        initial_backoff=0.05)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send():
+        async with semaphore:
+            return await rate_limiter.call_async(
+                key=("endpoint", "deployment"),
+                options=options,
+                request=lambda: deployment.complete(tokens),
+                estimated_tokens=tokens,
+                get_used_tokens=lambda used: used)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send() for _ in range(requests)))
+    return time.perf_counter() - start, deployment.throttled, rate_limiter.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--tokens", type=int, default=5000)
+    parser.add_argument("--tokens-per-window", type=int, default=100000)
+    args = parser.parse_args()
+
+    ideal = args.requests * args.tokens / args.tokens_per_window * WINDOW_SECONDS
+    print(f"{args.requests} requests of {args.tokens} tokens, {args.tokens_per_window} tokens per {WINDOW_SECONDS:.0f} s window, "
+          f"ideal {ideal:.1f} s")
+
+    for name, limit in [("retry only", False), ("token bucket + retry", True)]:
+        elapsed, throttled, stats = asyncio.run(run_batch(
+            args.requests, args.concurrency, args.tokens, args.tokens_per_window, limit))
+        # Every request sent, including retries, is counted in the stats, but only completed requests use tokens.
+        assert round(stats["used_tokens_per_request"] * stats["requests"]) == args.requests * args.tokens
+        print(f"{name}: {elapsed:.1f} s, {throttled} throttled responses, "
+              f"queue wait {stats['queue_wait_seconds_per_request'] * 1000:.0f} ms/request, "
+              f"backoff {stats['backoff_seconds_per_request'] * 1000:.0f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmarks the OpenAI `evaluate_confidence` against the previous evaluation, which scanned the token offsets from the start for every field value.
+
+Run from the repository root:
+
+    python tests/benchmarks/openai_token_offsets.py --line-items 250
+"""
+
+import argparse
+import json
+import pathlib
+import random
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src" / "AIDocumentPipeline"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from shared.confidence.openai_confidence import evaluate_confidence  # noqa: E402
+from support.openai_confidence import create_choice, create_invoice, evaluate_confidence_previous  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--line-items", type=int, default=250)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    extract_result = create_invoice(rng, args.line_items)
+    choice = create_choice(json.dumps(extract_result), rng)
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        previous_confidence = evaluate_confidence_previous(extract_result, choice)
+    scan_time = (time.perf_counter() - start) / args.iterations
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        confidence = evaluate_confidence(extract_result, choice)
+    evaluate_time = (time.perf_counter() - start) / args.iterations
+
+    assert confidence == previous_confidence
+
+    print(f"{args.line_items} line items, {len(choice.logprobs.content)} tokens: "
+          f"previous scan {scan_time * 1000:.1f} ms, "
+          f"evaluate_confidence {evaluate_time * 1000:.1f} ms, "
+          f"speedup {scan_time / evaluate_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmarks the parallel `DocumentPageRenderer` against the serial pdf2image rasterization path.
+
+Run from the repository root, with poppler-utils installed:
+
+    python tests/benchmarks/page_rendering.py --workers 4 --repeat 5
+"""
+
+import argparse
+import io
+import os
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src" / "AIDocumentPipeline"))
+
+from pdf2image import convert_from_bytes  # noqa: E402
+from documents.services.document_page_cache import DocumentPageCache  # noqa: E402
+from documents.services.document_page_renderer import DocumentPageRenderer  # noqa: E402
+
+
+def render_serial(document_bytes: bytes) -> list[bytes]:
+    pages = []
+    for page in convert_from_bytes(document_bytes):
+        byteIO = io.BytesIO()
+        page.save(byteIO, format='PNG')
+        pages.append(byteIO.getvalue())
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--pages-per-worker", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    renderer = DocumentPageRenderer(
+        page_cache=DocumentPageCache(),
+        max_workers=args.workers,
+        pages_per_worker=args.pages_per_worker)
+
+    try:
+        for pdf_path in sorted((ROOT / "tests" / "InvoiceBatch").rglob("*.pdf")):
+            document_bytes = pdf_path.read_bytes()
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                serial_pages = render_serial(document_bytes)
+            serial_time = (time.perf_counter() - start) / args.repeat
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                # No cache key, so each iteration rasterizes the document again.
+                parallel_pages = list(renderer.iter_pages(document_bytes))
+            parallel_time = (time.perf_counter() - start) / args.repeat
+
+            print(f"{pdf_path.relative_to(ROOT)}: {len(serial_pages)} pages, "
+                  f"serial {serial_time * 1000:.1f} ms, "
+                  f"parallel ({renderer.max_workers} workers) {parallel_time * 1000:.1f} ms, "
+                  f"speedup {serial_time / parallel_time:.2f}x")
+
+            assert len(parallel_pages) == len(serial_pages)
+    finally:
+        renderer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmarks the index-based `extract_lines` against the previous scan of every word on the page for every line span.
+
+Run from the repository root:
+
+    python tests/benchmarks/word_line_containment.py --pages 20 --lines-per-page 100
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "src" / "AIDocumentPipeline"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from shared.confidence.document_intelligence_confidence import extract_lines  # noqa: E402
+from support.document_intelligence import create_analyze_result, find_contained_words_scan  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--lines-per-page", type=int, default=100)
+    parser.add_argument("--max-words-per-line", type=int, default=8)
+    args = parser.parse_args()
+
+    analyze_result = create_analyze_result(
+        42, args.pages, args.lines_per_page, args.max_words_per_line)
+    words = sum(len(page.words) for page in analyze_result.pages)
+
+    start = time.perf_counter()
+    scan_words = [find_contained_words_scan(page, line) for page in analyze_result.pages for line in page.lines]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    di_lines = extract_lines(analyze_result)
+    index_time = time.perf_counter() - start
+
+    assert scan_words == [line.contained_words for line in di_lines]
+
+    print(f"{args.pages} pages, {words} words, {len(di_lines)} lines: "
+          f"scan {scan_time * 1000:.1f} ms (word containment only), "
+          f"extract_lines {index_time * 1000:.1f} ms (including line enrichment), "
+          f"speedup {scan_time / index_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import pathlib
+import sys
+
+# The function app's packages are imported from its root folder, as they are by the Azure Functions host.
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src" / "AIDocumentPipeline"))
+# The shared test factories and reference implementations are imported from the tests folder by the unit tests and benchmarks.
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
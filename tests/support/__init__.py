@@ -0,0 +1 @@
+"""Shared factories of test inputs and frozen copies of previous implementations, used as references by the unit tests and benchmarks."""
@@ -0,0 +1,73 @@
+"""Factories of invoice confidence results and the previous ConfidenceResult serialization."""
+
+import importlib
+import json
+import random
+
+from pydantic import BaseModel
+from invoices.models.invoice import Invoice, InvoiceAddress, InvoiceCurrency, InvoiceItem
+from shared.confidence.confidence_result import ConfidenceResult, OVERALL_CONFIDENCE_KEY
+
+
+def create(model: type[BaseModel], **values) -> BaseModel:
+    # The invoice models have no defaults, as all fields are required by structured outputs.
+    return model(**{**{name: None for name in model.model_fields}, **values})
+
+
+def create_result(line_items: int, seed: int = 0) -> ConfidenceResult:
+    """Creates the confidence result of an invoice, with a score and polygon for every field."""
+
+    rng = random.Random(seed)
+    address = create(InvoiceAddress, street="1 Main St", city="Redmond", state="WA", postal_code="98052", country="USA")
+    invoice = create(
+        Invoice,
+        customer_name="Fabrikam Inc", invoice_id="INV-0001", invoice_date="2024-01-05", vendor_name="Contoso Ltd",
+        customer_address=address, vendor_address=address,
+        invoice_total=create(InvoiceCurrency, currency_code="USD", amount=1234.5),
+        items=[
+            create(
+                InvoiceItem,
+                product_code=f"P{i:05d}", description=f"Item {i} – naïve", quantity=rng.randint(1, 10),
+                unit_price=create(InvoiceCurrency, currency_code="USD", amount=9.99),
+                total=create(InvoiceCurrency, currency_code="USD", amount=99.9))
+            for i in range(line_items)
+        ])
+
+    def evaluate(value):
+        if isinstance(value, dict):
+            return {key: evaluate(val) for key, val in value.items()}
+        if isinstance(value, list):
+            return [evaluate(item) for item in value]
+        return {
+            "confidence": rng.uniform(0.5, 1.0),
+            "value": value,
+            "normalized_polygons": [[{"x": rng.randint(0, 1000), "y": rng.randint(0, 1000)} for _ in range(4)]]
+        }
+
+    confidence_scores = evaluate(invoice.model_dump())
+    confidence_scores[OVERALL_CONFIDENCE_KEY] = 0.9
+    return ConfidenceResult(data=invoice, confidence_scores=confidence_scores, overall_confidence=0.9)
+
+
+def to_json_previous(obj: ConfidenceResult) -> str:
+    """The previous serialization."""
+
+    obj_dict = obj.model_dump()
+    if isinstance(obj.data, BaseModel):
+        obj_dict["_data_model"] = obj.data.__class__.__module__ + "." + obj.data.__class__.__qualname__
+    return json.dumps(obj_dict)
+
+
+def from_json_previous(json_str: str) -> ConfidenceResult:
+    """The previous deserialization."""
+
+    obj = json.loads(json_str)
+    data = obj.get("data")
+    model_name = obj.get("_data_model")
+    if model_name and isinstance(data, dict):
+        module_name, class_name = model_name.rsplit(".", 1)
+        model_cls = getattr(importlib.import_module(module_name), class_name)
+        if issubclass(model_cls, BaseModel):
+            obj["data"] = model_cls.model_validate(data)
+    obj.pop("_data_model", None)
+    return ConfidenceResult.model_validate(obj)
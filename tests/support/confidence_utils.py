@@ -0,0 +1,92 @@
+"""Factories of confidence trees and the previous recursive confidence utilities."""
+
+import random
+
+from shared.confidence.confidence_result import OVERALL_CONFIDENCE_KEY
+
+
+def create_confidence(seed: int, line_items: int = 50) -> dict:
+    """Creates the confidence tree of an invoice, with some zero confidences, an empty list and an overall score."""
+
+    rng = random.Random(seed)
+
+    def field(value):
+        return {"confidence": rng.choice([0.0, round(rng.uniform(0.5, 1.0), 4)]), "value": value}
+
+    return {
+        "invoice_id": field("INV-0001"),
+        "vendor": {"name": field("Contoso Ltd"), "address": {"street": field("1 Main St"), "city": field("Redmond")}},
+        "items": [
+            {"product_code": field(f"P{i:05d}"), "quantity": field(i % 10), "unit_price": field(9.99), "total": field(None)}
+            for i in range(line_items)
+        ],
+        "tags": [],
+        "total": field(1234.5),
+        OVERALL_CONFIDENCE_KEY: 0.5
+    }
+
+
+def get_confidence_values_recursive(data, key='confidence'):
+    """The previous implementation."""
+
+    confidence_values = []
+
+    def recursive_search(d):
+        if isinstance(d, dict):
+            for k, v in d.items():
+                if k == key and (v is not None and v != 0):
+                    confidence_values.append(v)
+                if isinstance(v, (dict, list)):
+                    recursive_search(v)
+        elif isinstance(d, list):
+            for item in d:
+                recursive_search(item)
+
+    recursive_search(data)
+    return confidence_values
+
+
+def merge_confidence_values_recursive(confidence_a: dict, confidence_b: dict, score_resolver=min):
+    """The previous implementation, which required both evaluations to have the same fields and list lengths."""
+
+    def merge_field_confidence_value(field_a, field_b):
+        if isinstance(field_a, dict) and 'confidence' not in field_a:
+            return {
+                key: merge_field_confidence_value(field_a[key], field_b[key])
+                for key in field_a if not key.startswith('_')
+            }
+        elif isinstance(field_a, list):
+            return [
+                merge_field_confidence_value(field_a[i], field_b[i])
+                for i in range(len(field_a))
+            ]
+        else:
+            valid_confidences = [conf for conf in [
+                field_a['confidence'], field_b['confidence']] if conf not in (None, 0)]
+            return {
+                'confidence': score_resolver(valid_confidences) if valid_confidences else 0.0,
+                'value': field_a['value'] if field_a['confidence'] > field_b['confidence'] else field_b['value']
+            }
+
+    merged_confidence = merge_field_confidence_value(confidence_a, confidence_b)
+    confidence_scores = get_confidence_values_recursive(merged_confidence)
+    merged_confidence[OVERALL_CONFIDENCE_KEY] = sum(
+        confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
+    return merged_confidence
+
+
+def flatten_dict_recursive(data, parent_key='', sep='_'):
+    """The previous implementation."""
+
+    items = []
+    for k, v in data.items():
+        new_key = f"{parent_key}{sep}{k}" if parent_key else k
+        if isinstance(v, dict):
+            items.extend(flatten_dict_recursive(v, new_key, sep=sep).items())
+        elif isinstance(v, list):
+            for i, item in enumerate(v):
+                items.extend(flatten_dict_recursive(
+                    {f"{new_key}_{i}": item}, '', sep=sep).items())
+        else:
+            items.append((new_key, v))
+    return dict(items)
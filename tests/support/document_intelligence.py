@@ -0,0 +1,136 @@
+"""Factories of Document Intelligence analysis results and the previous word containment scan."""
+
+import random
+
+from azure.ai.documentintelligence.models import AnalyzeResult, DocumentLine, DocumentPage, DocumentSpan, DocumentWord
+from shared.confidence.document_intelligence_confidence import DIDocumentLine
+
+LINE_WORDS = ["Invoice", "INVOICE", "Total", "Sub total", "Tax", "Contoso", "Ltd.", "123", "Main St", "Due", "2024-01-31", "$1,234.56"]
+PRODUCTS = ["Widget", "Gadget", "Bracket", "Bolt", "Washer", "Panel", "Cable", "Adapter"]
+LINES_PER_PAGE = 50
+
+
+def create_analyze_result(seed: int, pages: int = 3, lines_per_page: int = 20, max_words_per_line: int = 8) -> AnalyzeResult:
+    """Creates pages of lines whose spans cover their words, with gaps between words, and lines split into two spans that may cut through a word."""
+
+    rng = random.Random(seed)
+    document_pages = []
+    offset = 0
+
+    for page_number in range(1, pages + 1):
+        words = []
+        lines = []
+        for _ in range(lines_per_page):
+            line_start = offset
+            first_word_end = None
+            for _ in range(rng.randint(1, max_words_per_line)):
+                content = "w" * rng.randint(1, 6)
+                words.append(DocumentWord(
+                    content=content,
+                    polygon=[0, 0, 1, 0, 1, 1, 0, 1],
+                    span=DocumentSpan(offset=offset, length=len(content)),
+                    confidence=round(rng.uniform(0.5, 1.0), 3)))
+                first_word_end = first_word_end or offset + len(content)
+                offset += len(content) + rng.randint(1, 2)
+            line_end = offset - 1
+
+            # Split some lines into two spans after their first word, cutting through a later word or between words.
+            if rng.random() < 0.3 and line_end - first_word_end > 1:
+                split = rng.randint(first_word_end, line_end - 1)
+                spans = [DocumentSpan(offset=line_start, length=split - line_start),
+                         DocumentSpan(offset=split, length=line_end - split)]
+            else:
+                spans = [DocumentSpan(offset=line_start, length=line_end - line_start)]
+
+            lines.append(DocumentLine(content="", polygon=[0, 0, 8.5, 0, 8.5, 11, 0, 11], spans=spans))
+
+        document_pages.append(DocumentPage(
+            page_number=page_number, width=8.5, height=11, unit="inch", spans=[], words=words, lines=lines))
+
+    return AnalyzeResult(api_version="2024-11-30", model_id="prebuilt-layout", content="", pages=document_pages)
+
+
+def find_contained_words_scan(page: DocumentPage, line: DocumentLine) -> list[DocumentWord]:
+    """The previous implementation, scanning every word on the page for every line span."""
+
+    contained_words = []
+    for span in line.spans:
+        span_offset_start = span.offset
+        span_offset_end = span_offset_start + span.length
+        contained_words.extend([
+            word
+            for word in page.words
+            if word.span.offset >= span_offset_start
+            and word.span.offset + word.span.length <= span_offset_end
+        ])
+    return contained_words
+
+
+def create_lines(seed: int, count: int = 300) -> list[DIDocumentLine]:
+    """Creates lines of common invoice words, followed by empty lines and lines whose case folding changes their length."""
+
+    rng = random.Random(seed)
+    contents = [" ".join(rng.choice(LINE_WORDS) for _ in range(rng.randint(1, 4))) for _ in range(count)]
+    contents += ["", None, "   ", "İstanbul", "Straße"]
+
+    return [
+        DIDocumentLine(
+            normalized_polygon=None,
+            confidence=1.0,
+            page_number=0,
+            contained_words=[],
+            content=content,
+            polygon=[0, 0, 1, 0, 1, 1, 0, 1],
+            spans=[DocumentSpan(offset=0, length=len(content or ""))])
+        for content in contents
+    ]
+
+
+def create_invoice(line_items: int, seed: int = 42) -> tuple[dict, AnalyzeResult]:
+    """Creates an extracted invoice and an analysis result with one line per field value, across pages of `LINES_PER_PAGE` lines."""
+
+    rng = random.Random(seed)
+    items = [
+        {
+            "product_code": f"P{item_number:05d}",
+            "description": f"{rng.choice(PRODUCTS)} {rng.choice(PRODUCTS)}",
+            "quantity": rng.randint(1, 10),
+            "unit_price": rng.choice([1.5, 2.25, 10.0, 99.99]),
+            "total": None
+        }
+        for item_number in range(line_items)
+    ]
+    extract_result = {
+        "invoice_id": "INV-0001",
+        "vendor_name": "Contoso Ltd",
+        "customer_name": "Fabrikam Inc",
+        "invoice_date": "2024-01-05",
+        "items": items,
+        "total": 1234.5
+    }
+
+    line_contents = ["Invoice INV-0001", "Contoso Ltd", "Fabrikam Inc", "Date 2024-01-05", "Total 1234.5"]
+    for item in items:
+        line_contents.extend([item["product_code"], item["description"], str(item["quantity"]), str(item["unit_price"])])
+
+    pages = []
+    offset = 0
+    for page_start in range(0, len(line_contents), LINES_PER_PAGE):
+        words = []
+        lines = []
+        for content in line_contents[page_start:page_start + LINES_PER_PAGE]:
+            polygon = [rng.uniform(0, 8.5), rng.uniform(0, 11)] * 4
+            words.append(DocumentWord(
+                content=content,
+                polygon=polygon,
+                span=DocumentSpan(offset=offset, length=len(content)),
+                confidence=round(rng.uniform(0.5, 1.0), 3)))
+            lines.append(DocumentLine(
+                content=content,
+                polygon=polygon,
+                spans=[DocumentSpan(offset=offset, length=len(content))]))
+            offset += len(content) + 1
+        pages.append(DocumentPage(
+            page_number=len(pages) + 1, width=8.5, height=11, unit="inch", spans=[], words=words, lines=lines))
+
+    return extract_result, AnalyzeResult(api_version="2024-11-30", model_id="prebuilt-layout", content="", pages=pages)
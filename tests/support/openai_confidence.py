@@ -0,0 +1,101 @@
+"""Factories of OpenAI chat completion choices with logprobs and the previous evaluation scanning token offsets."""
+
+import math
+import random
+
+from openai.types.chat.chat_completion import Choice, ChoiceLogprobs
+from openai.types.chat.chat_completion_message import ChatCompletionMessage
+from openai.types.chat.chat_completion_token_logprob import ChatCompletionTokenLogprob
+from shared.confidence.confidence_result import OVERALL_CONFIDENCE_KEY
+from shared.confidence.confidence_utils import get_confidence_values
+
+
+def create_choice(content: str, rng: random.Random, max_token_length: int = 7) -> Choice:
+    """Splits the content into tokens of random lengths with random logprobs, including some unlikely tokens."""
+
+    token_logprobs = []
+    position = 0
+    while position < len(content):
+        token = content[position:position + rng.randint(1, max_token_length)]
+        logprob = -10000.0 if rng.random() < 0.02 else math.log(rng.uniform(0.2, 1.0))
+        token_logprobs.append(ChatCompletionTokenLogprob(token=token, logprob=logprob, top_logprobs=[]))
+        position += len(token)
+
+    return Choice(
+        finish_reason="stop",
+        index=0,
+        message=ChatCompletionMessage(role="assistant", content=content),
+        logprobs=ChoiceLogprobs(content=token_logprobs))
+
+
+def create_invoice(rng: random.Random, items: int) -> dict:
+    """Creates an extracted invoice whose keys contain no digits and whose values appear in order, so the previous search by string finds each value at its own position."""
+
+    return {
+        "invoice_id": f"INV-{rng.randint(1000, 9999)}",
+        "customer_name": "Contoso Ltd",
+        "items": [
+            {
+                "description": f"Item {index}",
+                "quantity": rng.randint(1, 10),
+                "unit_price": rng.choice([1.5, 2.25, 10.0, 99.99])
+            }
+            for index in range(items)
+        ],
+        "total": round(rng.uniform(100, 1000), 2)
+    }
+
+
+def evaluate_confidence_previous(extract_result: dict, choice: Choice) -> dict:
+    """The previous implementation, locating each value from the end of the previous one and scanning the token offsets from the start."""
+
+    generated_text = choice.message.content
+    logprobs = choice.logprobs.content
+    token_logprobs = [token_logprob.logprob for token_logprob in logprobs]
+
+    token_offsets = []
+    current_pos = 0
+    for token_logprob in logprobs:
+        token_offsets.append((current_pos, current_pos + len(token_logprob.token)))
+        current_pos += len(token_logprob.token)
+
+    substr_offset = 0
+
+    def find_token_indices(substring: str, start_char: int):
+        end_char = start_char + len(substring)
+        indices = []
+        for idx, (start, end) in enumerate(token_offsets):
+            if start >= end_char:
+                break
+            if end > start_char:
+                indices.append(idx)
+        return indices
+
+    def evaluate_field_value_confidence(value):
+        nonlocal substr_offset
+
+        if isinstance(value, dict):
+            return {key: evaluate_field_value_confidence(val) for key, val in value.items()}
+        if isinstance(value, list):
+            return [evaluate_field_value_confidence(item) for item in value]
+
+        value_str = str(value)
+        try:
+            start_index = generated_text.index(value_str, substr_offset)
+            substr_offset = start_index + len(value_str)
+        except ValueError:
+            return {"confidence": 0.0, "value": value}
+
+        filtered_logprobs = [
+            token_logprobs[idx] for idx in find_token_indices(value_str, start_index)
+            if token_logprobs[idx] is not None and token_logprobs[idx] > -9999.0]
+        if not filtered_logprobs:
+            return {"confidence": 0.0, "value": value}
+
+        confidence = math.exp(sum(filtered_logprobs) / len(filtered_logprobs))
+        return {"confidence": min(max(confidence, 0.0), 1.0), "value": value}
+
+    confidence = {field: evaluate_field_value_confidence(value) for field, value in extract_result.items()}
+    confidence_scores = get_confidence_values(confidence)
+    confidence[OVERALL_CONFIDENCE_KEY] = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
+    return confidence
@@ -0,0 +1,75 @@
+import time
+from email.utils import formatdate
+
+import pytest
+from azure.core.utils import CaseInsensitiveDict
+from shared.clients.adaptive_polling import AdaptiveLROPolling, AdaptivePollingOptions, PollingMetrics
+from shared.clients.retry_after import parse_retry_after
+
+
+class FakeHttpResponse:
+    def __init__(self, headers: dict):
+        self.headers = CaseInsensitiveDict(headers)
+
+
+class FakePipelineResponse:
+    def __init__(self, headers: dict):
+        self.http_response = FakeHttpResponse(headers)
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "250"}, 0.25),
+    ({"x-ms-retry-after-ms": "1500"}, 1.5),
+    ({"Retry-After": "3"}, 3.0),
+    ({"Retry-After": "3", "retry-after-ms": "500"}, 0.5),
+    ({"retry-after-ms": "invalid", "Retry-After": "2"}, 2.0),
+    ({"Retry-After": "-1"}, 0.0),
+    ({"Retry-After": "invalid"}, None),
+    ({}, None),
+    (None, None),
+])
+def test_parse_retry_after(headers, expected):
+    assert parse_retry_after(CaseInsensitiveDict(headers) if headers is not None else None) == expected
+
+
+def test_parse_retry_after_http_date():
+    retry_after = parse_retry_after(CaseInsensitiveDict({"Retry-After": formatdate(time.time() + 30, usegmt=True)}))
+
+    assert 28 <= retry_after <= 30
+
+
+def create_polling(options: AdaptivePollingOptions, headers: dict) -> AdaptiveLROPolling:
+    polling = AdaptiveLROPolling(options, PollingMetrics())
+    polling._pipeline_response = FakePipelineResponse(headers)
+    return polling
+
+
+def test_backs_off_without_retry_after():
+    polling = create_polling(AdaptivePollingOptions(initial_delay=0.5, backoff_factor=2, max_delay=3), {})
+
+    assert [polling._extract_delay() for _ in range(4)] == [0.5, 1.0, 2.0, 3.0]
+    assert polling.metrics.get_stats()["status_requests"] == 4
+
+
+def test_respects_retry_after_by_default_capped_at_max_delay():
+    assert AdaptivePollingOptions().respect_retry_after
+
+    assert create_polling(AdaptivePollingOptions(max_delay=5), {"Retry-After": "2"})._extract_delay() == 2.0
+    assert create_polling(AdaptivePollingOptions(max_delay=5), {"retry-after-ms": "30000"})._extract_delay() == 5.0
+
+
+def test_ignores_retry_after_when_disabled():
+    polling = create_polling(AdaptivePollingOptions(initial_delay=0.5, respect_retry_after=False), {"Retry-After": "2"})
+
+    assert polling._extract_delay() == 0.5
+
+
+def test_deadline_caps_delay_and_raises_when_exceeded():
+    polling = create_polling(AdaptivePollingOptions(initial_delay=0.5, deadline=0.2), {})
+
+    assert polling._extract_delay() <= 0.2
+
+    polling._started_at -= 1
+    with pytest.raises(TimeoutError):
+        polling._extract_delay()
+    assert polling.metrics.get_stats()["deadlines_exceeded"] == 1
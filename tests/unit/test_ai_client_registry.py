@@ -0,0 +1,33 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from azure.core.credentials import AccessToken
+from shared.clients.ai_client_registry import AIClientRegistry
+
+
+class StaticCredential:
+    def get_token(self, *scopes, **kwargs) -> AccessToken:
+        return AccessToken("token", int(time.time()) + 3600)
+
+
+def test_get_openai_client_reuses_clients_per_endpoint():
+    registry = AIClientRegistry()
+    credential = StaticCredential()
+
+    client = registry.get_openai_client(credential, "https://a.openai.azure.com")
+
+    assert registry.get_openai_client(credential, "https://a.openai.azure.com") is client
+    assert registry.get_openai_client(credential, "https://b.openai.azure.com") is not client
+
+    stats = registry.get_stats()
+    assert (stats["clients"], stats["clients_created"], stats["clients_reused"]) == (2, 2, 1)
+
+
+def test_token_requests_are_counted_across_threads():
+    registry = AIClientRegistry()
+    token_provider = registry.__get_token_provider__(StaticCredential())
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        tokens = list(executor.map(lambda _: token_provider(), range(200)))
+
+    assert tokens == ["token"] * 200
+    assert registry.get_stats()["token_requests"] == 200
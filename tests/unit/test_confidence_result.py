@@ -0,0 +1,60 @@
+import json
+
+import pytest
+from invoices.models.invoice import Invoice
+from shared.confidence.confidence_result import COMPRESSED_KEY, ConfidenceResult, OVERALL_CONFIDENCE_KEY
+from support.confidence_result import create_result, from_json_previous, to_json_previous
+
+
+@pytest.mark.parametrize("line_items", [0, 5, 200])
+@pytest.mark.parametrize("compression_threshold", [None, 0, 64 * 1024])
+def test_round_trip_matches_previous_serialization(line_items, compression_threshold):
+    result = create_result(line_items)
+
+    decoded = ConfidenceResult.from_json(ConfidenceResult.to_json(result, compression_threshold=compression_threshold))
+
+    assert decoded == from_json_previous(to_json_previous(result))
+    assert isinstance(decoded.data, Invoice)
+    assert decoded == result
+
+
+def test_reads_previous_serialization():
+    result = create_result(5)
+
+    assert ConfidenceResult.from_json(to_json_previous(result)) == result
+
+
+@pytest.mark.parametrize("data", [None, {"total": 1}, [1, 2], "text"])
+def test_round_trip_of_data_without_model(data):
+    result = ConfidenceResult(data=data, confidence_scores={OVERALL_CONFIDENCE_KEY: 0.0}, overall_confidence=0.0)
+
+    assert ConfidenceResult.from_json(ConfidenceResult.to_json(result)) == result
+
+
+def test_compresses_only_payloads_above_threshold():
+    small = ConfidenceResult.to_json(create_result(1))
+    large = ConfidenceResult.to_json(create_result(500))
+
+    assert COMPRESSED_KEY not in json.loads(small)
+    assert list(json.loads(large)) == [COMPRESSED_KEY]
+    assert len(large) < len(to_json_previous(create_result(500))) / 2
+
+
+def test_drops_matching_lines_without_modifying_result():
+    result = ConfidenceResult(
+        data={"total": 1},
+        confidence_scores={
+            "total": {"confidence": 0.9, "value": 1, "matching_lines": [object()], "normalized_polygons": [[{"x": 0, "y": 0}]]},
+            "items": [{"quantity": {"confidence": 0.8, "value": 2, "matching_lines": []}}],
+            OVERALL_CONFIDENCE_KEY: 0.85
+        },
+        overall_confidence=0.85)
+
+    decoded = ConfidenceResult.from_json(ConfidenceResult.to_json(result))
+
+    assert decoded.confidence_scores == {
+        "total": {"confidence": 0.9, "value": 1, "normalized_polygons": [[{"x": 0, "y": 0}]]},
+        "items": [{"quantity": {"confidence": 0.8, "value": 2}}],
+        OVERALL_CONFIDENCE_KEY: 0.85
+    }
+    assert "matching_lines" in result.confidence_scores["total"]
@@ -0,0 +1,77 @@
+import pytest
+from shared.confidence.confidence_result import OVERALL_CONFIDENCE_KEY
+from shared.confidence.confidence_utils import get_confidence_values, merge_confidence_values
+from shared.utils.value_utils import flatten_dict
+from support.confidence_utils import create_confidence, flatten_dict_recursive, get_confidence_values_recursive, merge_confidence_values_recursive
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_get_confidence_values_matches_recursive(seed):
+    confidence = create_confidence(seed)
+
+    assert get_confidence_values(confidence) == get_confidence_values_recursive(confidence)
+    assert get_confidence_values(confidence, key="value") == get_confidence_values_recursive(confidence, key="value")
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("score_resolver", [min, max])
+def test_merge_confidence_values_matches_recursive(seed, score_resolver):
+    confidence_a = create_confidence(seed)
+    confidence_b = create_confidence(seed + 100)
+
+    merged = merge_confidence_values(confidence_a, confidence_b, score_resolver)
+
+    assert merged == merge_confidence_values_recursive(confidence_a, confidence_b, score_resolver)
+    # The evaluations are not modified.
+    assert confidence_a == create_confidence(seed)
+    assert confidence_b == create_confidence(seed + 100)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("sep", ["_", "."])
+def test_flatten_dict_matches_recursive(seed, sep):
+    confidence = create_confidence(seed)
+
+    assert flatten_dict(confidence, sep=sep) == flatten_dict_recursive(confidence, sep=sep)
+    assert flatten_dict(confidence, parent_key="invoice", sep=sep) == flatten_dict_recursive(confidence, parent_key="invoice", sep=sep)
+
+
+def test_merge_keeps_fields_present_in_one_evaluation():
+    confidence_a = {
+        "total": {"confidence": 0.9, "value": 10},
+        "items": [{"quantity": {"confidence": 0.8, "value": 1}}, {"quantity": {"confidence": 0.6, "value": 2}}],
+    }
+    confidence_b = {
+        "total": {"confidence": 0.7, "value": 11},
+        "items": [{"quantity": {"confidence": 0.0, "value": 3}}],
+        "due_date": {"confidence": 0.5, "value": "2024-01-31"},
+    }
+
+    merged = merge_confidence_values(confidence_a, confidence_b)
+
+    assert merged == {
+        "total": {"confidence": 0.7, "value": 10},
+        "items": [{"quantity": {"confidence": 0.8, "value": 1}}, {"quantity": {"confidence": 0.6, "value": 2}}],
+        "due_date": {"confidence": 0.5, "value": "2024-01-31"},
+        OVERALL_CONFIDENCE_KEY: pytest.approx((0.7 + 0.8 + 0.6 + 0.5) / 4),
+    }
+
+
+def test_get_confidence_values_skips_missing_and_zero_scores():
+    confidence = {
+        "total": {"confidence": 0.9, "value": 10},
+        "items": [{"quantity": {"confidence": 0.0, "value": 1}}, {"quantity": {"confidence": None, "value": 2}}, {"quantity": {"confidence": 0.4, "value": 3}}],
+        "vendor": {"name": {"confidence": 0.7, "value": "Contoso"}},
+    }
+
+    assert get_confidence_values(confidence) == [0.9, 0.4, 0.7]
+    assert get_confidence_values(confidence, key="value") == [10, 1, 2, 3, "Contoso"]
+
+
+def test_flatten_dict_joins_keys_and_list_indices():
+    assert flatten_dict({"vendor": {"name": "Contoso", "tags": ["a", {"b": 1}]}, "empty": {}, "total": None}, sep=".") == {
+        "vendor.name": "Contoso",
+        "vendor.tags_0": "a",
+        "vendor.tags_1.b": 1,
+        "total": None,
+    }
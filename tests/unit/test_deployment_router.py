@@ -0,0 +1,166 @@
+import asyncio
+import datetime
+import json
+
+import httpx
+import pytest
+from openai import BadRequestError, InternalServerError, RateLimitError
+from shared.clients.deployment_router import DeploymentRouter, OpenAIDeployment
+from shared.clients.rate_limiter import RateLimiter, RateLimitOptions
+
+FAST = OpenAIDeployment("https://fast.openai.azure.com", "gpt-4o")
+SLOW = OpenAIDeployment("https://slow.openai.azure.com", "gpt-4o")
+
+
+class RawResponse:
+    """Simulates the raw response of `with_raw_response`."""
+
+    def __init__(self, elapsed: float, tokens: int = 10, headers: dict = None):
+        self.headers = httpx.Headers(headers or {})
+        self.elapsed = datetime.timedelta(seconds=elapsed)
+        self.tokens = tokens
+
+    def parse(self) -> int:
+        return self.tokens
+
+
+def create_error(error_type: type, status_code: int, headers: dict = None) -> Exception:
+    request = httpx.Request("POST", "https://example.openai.azure.com/openai/deployments/gpt-4o/chat/completions")
+    response = httpx.Response(status_code, headers=headers or {}, request=request)
+    return error_type("Simulated failure", response=response, body=None)
+
+
+def test_from_settings_creates_pool():
+    deployments = OpenAIDeployment.from_settings(json.dumps([
+        {"endpoint": FAST.endpoint, "deployment_name": "gpt-4o", "tokens_per_minute": 1000},
+        {"endpoint": SLOW.endpoint, "deployment_name": "gpt-4o", "requests_per_minute": 10},
+    ]), "https://default.openai.azure.com", "default")
+
+    assert [deployment.key for deployment in deployments] == [FAST.key, SLOW.key]
+    assert deployments[0].tokens_per_minute == 1000
+    assert deployments[1].requests_per_minute == 10
+
+
+def test_from_settings_falls_back_to_single_deployment():
+    assert [d.key for d in OpenAIDeployment.from_settings(None, FAST.endpoint, "gpt-4o")] == [FAST.key]
+    assert OpenAIDeployment.from_settings("", None, None) == []
+
+
+@pytest.mark.parametrize("deployments_json, message", [
+    ("[{", "not valid JSON"),
+    ("{}", "non-empty JSON array"),
+    ("[]", "non-empty JSON array"),
+    ('["gpt-4o"]', "deployment 0 must be a JSON object"),
+    ('[{"endpoint": "https://fast.openai.azure.com"}]', "deployment 0 is missing deployment_name"),
+    ('[{"endpoint": "e", "deployment_name": "d"}, {"endpoint": "e", "deployment_name": "d", "tpm": 1}]',
+     "deployment 1 has unknown keys tpm"),
+])
+def test_from_settings_rejects_invalid_deployments(deployments_json, message):
+    with pytest.raises(ValueError, match="AZURE_OPENAI_CHAT_DEPLOYMENTS") as error:
+        OpenAIDeployment.from_settings(deployments_json, None, None)
+
+    assert message in str(error.value)
+
+
+def test_routes_to_deployment_with_lower_latency():
+    router = DeploymentRouter(RateLimiter())
+    latencies = {FAST.key: 0.1, SLOW.key: 1.0}
+    selected = []
+
+    def request(deployment):
+        selected.append(deployment.key)
+        return RawResponse(latencies[deployment.key])
+
+    # Deployments without observed latency are tried first, after which the faster deployment is preferred.
+    for _ in range(4):
+        assert router.call([FAST, SLOW], RateLimitOptions(), request, 10, lambda tokens: tokens) == 10
+
+    assert set(selected[:2]) == {FAST.key, SLOW.key}
+    assert selected[2:] == [FAST.key, FAST.key]
+    assert router.rate_limiter.get_stats()["used_tokens_per_request"] == 10
+
+
+def test_fails_over_to_other_deployment_and_counts_retries():
+    router = DeploymentRouter(RateLimiter())
+    selected = []
+
+    def request(deployment):
+        selected.append(deployment.key)
+        if len(selected) == 1:
+            raise create_error(InternalServerError, 503)
+        return RawResponse(0.1)
+
+    router.call([FAST, SLOW], RateLimitOptions(), request, 10)
+
+    assert selected[0] != selected[1]
+    stats = router.get_stats()
+    assert stats["failovers"] == 1
+    failed = stats["deployments"]["/".join(selected[0])]
+    assert failed["failures"] == 1
+    assert not failed["healthy"]
+    assert stats["deployments"]["/".join(selected[1])]["healthy"]
+    # The rate limiter sends each attempt once, so the failover is its only retry.
+    assert router.rate_limiter.get_stats()["retries"] == 1
+
+
+def test_throttled_deployment_is_out_of_rotation_for_retry_after():
+    router = DeploymentRouter(RateLimiter())
+    options = RateLimitOptions(max_retries=2, jitter=0)
+    selected = []
+
+    def request(deployment):
+        selected.append(deployment.key)
+        raise create_error(RateLimitError, 429, {"retry-after-ms": "20"})
+
+    with pytest.raises(RateLimitError):
+        router.call([FAST, SLOW], options, request, 10)
+
+    # Both deployments are throttled after two attempts, so the last attempt waits for the first to recover.
+    assert len(selected) == 3
+    assert set(selected[:2]) == {FAST.key, SLOW.key}
+    assert selected[2] == selected[0]
+    stats = router.get_stats()
+    assert stats["failovers"] == 2
+    assert sum(health["throttled_requests"] for health in stats["deployments"].values()) == 3
+    assert all(health["in_flight"] == 0 for health in stats["deployments"].values())
+    rate_limiter_stats = router.rate_limiter.get_stats()
+    assert rate_limiter_stats["retries"] == 2
+    assert rate_limiter_stats["throttled_requests"] == 3
+    assert rate_limiter_stats["backoff_seconds_per_request"] > 0
+
+
+def test_does_not_fail_over_on_invalid_request():
+    router = DeploymentRouter(RateLimiter())
+
+    def request(deployment):
+        raise create_error(BadRequestError, 400)
+
+    with pytest.raises(BadRequestError):
+        router.call([FAST, SLOW], RateLimitOptions(), request, 10)
+
+    stats = router.get_stats()
+    assert stats["failovers"] == 0
+    assert all(health["healthy"] and health["failures"] == 0 for health in stats["deployments"].values())
+    assert router.rate_limiter.get_stats()["retries"] == 0
+
+
+def test_requires_deployments():
+    with pytest.raises(ValueError):
+        DeploymentRouter(RateLimiter()).call([], RateLimitOptions(), lambda deployment: RawResponse(0.1), 10)
+
+
+def test_call_async_fails_over_to_other_deployment():
+    router = DeploymentRouter(RateLimiter())
+    selected = []
+
+    async def request(deployment):
+        selected.append(deployment.key)
+        if len(selected) == 1:
+            raise create_error(RateLimitError, 429, {"retry-after-ms": "1000"})
+        return RawResponse(0.1, tokens=20)
+
+    assert asyncio.run(router.call_async([FAST, SLOW], RateLimitOptions(), request, 10)) == 20
+
+    assert selected[0] != selected[1]
+    assert router.get_stats()["failovers"] == 1
+    assert router.rate_limiter.get_stats()["retries"] == 1
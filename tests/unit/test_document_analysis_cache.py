@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from documents.services.document_analysis_cache import DocumentAnalysisCache
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for the condition."
+        time.sleep(0.001)
+
+
+def test_hits_and_misses():
+    cache = DocumentAnalysisCache()
+    first = cache.get_or_analyze("document", lambda: "result")
+    second = cache.get_or_analyze("document", lambda: pytest.fail("The document was analyzed twice."))
+
+    assert first == second == "result"
+    assert cache.get_stats() == {"documents": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_evicts_least_recently_used():
+    cache = DocumentAnalysisCache(max_documents=2)
+    cache.get_or_analyze("a", lambda: "a")
+    cache.get_or_analyze("b", lambda: "b")
+    cache.get_or_analyze("a", lambda: "a")
+    cache.get_or_analyze("c", lambda: "c")
+
+    assert cache.get_or_analyze("a", lambda: "a again") == "a"
+    assert cache.get_or_analyze("b", lambda: "b again") == "b again"
+
+
+def test_concurrent_callers_share_one_analysis():
+    cache = DocumentAnalysisCache()
+    analyzing = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def analyze():
+        calls.append(threading.current_thread().name)
+        analyzing.set()
+        release.wait()
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_analyze("document", analyze)), daemon=True) for _ in range(4)]
+    threads[0].start()
+    analyzing.wait()
+    for thread in threads[1:]:
+        thread.start()
+
+    try:
+        # Every caller references the lock of the key while the first analysis is in progress.
+        wait_for(lambda: cache._key_locks["document"].waiters == 4)
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+    assert len(calls) == 1
+    assert results == ["result"] * 4
+    assert cache._key_locks == {}
+
+
+def test_lock_is_released_when_analysis_raises():
+    cache = DocumentAnalysisCache()
+
+    def fail():
+        raise RuntimeError("Analysis failed.")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_analyze("document", fail)
+
+    assert cache._key_locks == {}
+    assert cache.get_or_analyze("document", lambda: "result") == "result"
+    assert cache._key_locks == {}
+
+
+def test_async_concurrent_callers_share_one_analysis():
+    cache = DocumentAnalysisCache()
+    calls = []
+
+    async def analyze():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_analyze_async("document", analyze) for _ in range(4)))
+
+    assert asyncio.run(run()) == ["result"] * 4
+    assert len(calls) == 1
+    assert cache._async_key_locks == {}
+
+
+def test_async_waiter_retries_when_analysis_raises():
+    cache = DocumentAnalysisCache()
+    calls = []
+
+    async def analyze():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise RuntimeError("Analysis failed.")
+        return "result"
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_analyze_async("document", analyze) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    # The first caller fails, the next waiter analyzes the document again, and the last one hits the cache.
+    assert isinstance(results[0], RuntimeError)
+    assert results[1:] == ["result", "result"]
+    assert len(calls) == 2
+    assert cache._async_key_locks == {}
+
+
+def test_async_lock_is_released_when_analysis_raises():
+    cache = DocumentAnalysisCache()
+
+    async def fail():
+        raise RuntimeError("Analysis failed.")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_analyze_async("document", fail))
+
+    assert cache._async_key_locks == {}
+
+
+def test_async_lock_is_kept_until_last_waiter_completes():
+    cache = DocumentAnalysisCache()
+    waiters = []
+
+    async def analyze():
+        await asyncio.sleep(0.01)
+        waiters.append(cache._async_key_locks["document"].waiters)
+        return "result"
+
+    async def run():
+        first = asyncio.create_task(cache.get_or_analyze_async("document", analyze))
+        await asyncio.sleep(0)
+        others = [asyncio.create_task(cache.get_or_analyze_async("document", analyze)) for _ in range(2)]
+        results = await asyncio.gather(first, *others)
+        # A caller arriving after the first analysis completes hits the cache.
+        results.append(await cache.get_or_analyze_async("document", analyze))
+        return results
+
+    assert asyncio.run(run()) == ["result"] * 4
+    assert waiters == [3]
+    assert cache._async_key_locks == {}
@@ -0,0 +1,131 @@
+import random
+
+import pytest
+from azure.ai.documentintelligence.models import AnalyzeResult, DocumentLine, DocumentPage, DocumentSpan, DocumentWord
+from shared.confidence.confidence_result import OVERALL_CONFIDENCE_KEY
+from shared.confidence.document_intelligence_confidence import ConfidenceDetail, DIDocumentLine, DILineIndex, WordSpanIndex, evaluate_confidence, extract_lines, find_matching_lines
+from support.document_intelligence import create_analyze_result, create_invoice, create_lines, find_contained_words_scan
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_extract_lines_matches_word_scan(seed):
+    analyze_result = create_analyze_result(seed)
+    di_lines = extract_lines(analyze_result)
+
+    expected = [
+        (page_number, find_contained_words_scan(page, line))
+        for page_number, page in enumerate(analyze_result.pages)
+        for line in page.lines
+    ]
+    actual = [(di_line.page_number, di_line.contained_words) for di_line in di_lines]
+
+    assert actual == expected
+    assert [di_line.confidence for di_line in di_lines] == [min(word.confidence for word in words) for _, words in expected]
+    assert di_lines[0].normalized_polygon == [{"x": 0, "y": 0}, {"x": 1, "y": 0}, {"x": 1, "y": 1}, {"x": 0, "y": 1}]
+
+
+def test_extract_lines_assigns_words_contained_in_line_spans():
+    words = [
+        DocumentWord(content=content, polygon=[], span=DocumentSpan(offset=offset, length=len(content)), confidence=confidence)
+        for offset, content, confidence in [(0, "Total", 0.9), (6, "due", 0.6), (10, "$12", 0.8), (14, "Tax", 0.7)]
+    ]
+    # The second line is split into two spans, the first of which cuts through "$12", so "$12" belongs to no line.
+    lines = [
+        DocumentLine(content="Total due", polygon=[0, 0, 2, 0, 2, 1, 0, 1], spans=[DocumentSpan(offset=0, length=9)]),
+        DocumentLine(content="$12 Tax", polygon=[], spans=[DocumentSpan(offset=11, length=2), DocumentSpan(offset=14, length=3)]),
+    ]
+    page = DocumentPage(page_number=1, width=4, height=2, unit="inch", spans=[], words=words, lines=lines)
+
+    di_lines = extract_lines(AnalyzeResult(api_version="2024-11-30", model_id="prebuilt-layout", content="", pages=[page]))
+
+    assert [[word.content for word in di_line.contained_words] for di_line in di_lines] == [["Total", "due"], ["Tax"]]
+    assert [di_line.confidence for di_line in di_lines] == [0.6, 0.7]
+    assert di_lines[0].normalized_polygon == [{"x": 0, "y": 0}, {"x": 0.5, "y": 0}, {"x": 0.5, "y": 0.5}, {"x": 0, "y": 0.5}]
+
+
+def test_word_span_index_finds_words_fully_contained_in_span():
+    words = [
+        DocumentWord(content=content, polygon=[], span=DocumentSpan(offset=offset, length=len(content)), confidence=1.0)
+        for offset, content in [(10, "ccc"), (0, "aaa"), (4, "bbb")]
+    ]
+    index = WordSpanIndex(words)
+
+    assert [word.content for word in index.find_contained_words(0, 7)] == ["aaa", "bbb"]
+    assert [word.content for word in index.find_contained_words(1, 13)] == ["bbb", "ccc"]
+    assert index.find_contained_words(5, 12) == []
+    assert index.find_contained_words(20, 30) == []
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_find_matching_lines_with_index_matches_scan(seed):
+    di_lines = create_lines(seed)
+    line_index = DILineIndex(di_lines)
+    rng = random.Random(seed)
+
+    values = [line.content for line in rng.sample(di_lines[:300], 50)]
+    values += [value.upper() for value in values[:10]] + [value.replace(" ", "") for value in values[:10]]
+    values += ["Contoso Ltd", "contosoltd.", "Sub", "ub to", "Tax 1", "St", "t", "$1,234", "Missing", "Invoice Missing",
+               "  Total  ", "istanbul", "STRASSE", "straße", 123, 2024.5, "", None]
+
+    for value in values:
+        assert find_matching_lines(value, di_lines, line_index=line_index) == find_matching_lines(value, di_lines), value
+
+
+def test_line_index_finds_exact_before_containing():
+    di_lines = create_lines(0, count=0) + [
+        DIDocumentLine(normalized_polygon=None, confidence=1.0, page_number=0, contained_words=[], content=content,
+                       polygon=[], spans=[])
+        for content in ["Total", "Sub Total", "TOTAL"]
+    ]
+    line_index = DILineIndex(di_lines)
+
+    assert [line.content for line in find_matching_lines("total", di_lines, line_index=line_index)] == ["Total", "TOTAL"]
+    assert [line.content for line in find_matching_lines("subtotal", di_lines, line_index=line_index)] == ["Sub Total"]
+    assert [line.content for line in find_matching_lines("otal", di_lines, line_index=line_index)] == ["Total", "Sub Total", "TOTAL"]
+
+
+def strip_fields(confidence, keys: set[str]):
+    if isinstance(confidence, dict):
+        if "confidence" in confidence:
+            return {key: value for key, value in confidence.items() if key not in keys}
+        return {key: strip_fields(value, keys) for key, value in confidence.items()}
+    if isinstance(confidence, list):
+        return [strip_fields(item, keys) for item in confidence]
+    return confidence
+
+
+def test_detail_levels_are_subsets_of_full_evaluation():
+    extract_result, analyze_result = create_invoice(20)
+    extract_result["notes"] = "Missing"
+
+    full = evaluate_confidence(extract_result, analyze_result, detail=ConfidenceDetail.FULL)
+    polygons = evaluate_confidence(extract_result, analyze_result)
+    scores = evaluate_confidence(extract_result, analyze_result, detail=ConfidenceDetail.SCORES)
+
+    assert polygons == strip_fields(full, {"matching_lines"})
+    assert scores == strip_fields(full, {"matching_lines", "normalized_polygons"})
+    assert full[OVERALL_CONFIDENCE_KEY] > 0
+
+    # The full evaluation keeps the matching lines, with their contained words, as the evaluation did before detail levels.
+    assert [line.content for line in full["items"][3]["product_code"]["matching_lines"]] == ["P00003"]
+    assert full["items"][3]["product_code"]["matching_lines"][0].contained_words[0].content == "P00003"
+    assert full["notes"] == {"confidence": 0.0, "value": "Missing", "matching_lines": [], "normalized_polygons": []}
+
+
+def test_scores_detail_does_not_reference_analysis_result():
+    extract_result, analyze_result = create_invoice(5)
+
+    scores = evaluate_confidence(extract_result, analyze_result, detail=ConfidenceDetail.SCORES)
+
+    def get_fields(confidence):
+        if isinstance(confidence, dict):
+            if "confidence" in confidence:
+                yield confidence
+            else:
+                for value in confidence.values():
+                    yield from get_fields(value)
+        elif isinstance(confidence, list):
+            for item in confidence:
+                yield from get_fields(item)
+
+    assert all(set(field) == {"confidence", "value"} for field in get_fields(scores))
@@ -0,0 +1,54 @@
+from documents.services.document_page_cache import DocumentPageCache
+
+
+def test_get_page_records_hits_and_misses():
+    cache = DocumentPageCache()
+    cache.set_page("doc", 1, b"page-1")
+
+    assert cache.get_page("doc", 1) == b"page-1"
+    assert cache.get_page("doc", 2) is None
+    assert cache.get_page("other", 1) is None
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_set_page_evicts_least_recently_used_documents_over_max_bytes():
+    cache = DocumentPageCache(max_bytes=100)
+    cache.set_page("a", 1, b"a" * 40)
+    cache.set_page("b", 1, b"b" * 40)
+    cache.get_page("a", 1)
+    cache.set_page("c", 1, b"c" * 40)
+
+    assert cache.get_page("b", 1) is None
+    assert cache.get_page("a", 1) is not None
+    assert cache.get_page("c", 1) is not None
+    assert cache.get_stats()["bytes"] == 80
+
+
+def test_set_page_keeps_pages_of_current_document_and_skips_pages_that_do_not_fit():
+    cache = DocumentPageCache(max_bytes=100)
+    cache.set_page("a", 1, b"a" * 60)
+    cache.set_page("a", 2, b"a" * 60)
+
+    assert cache.get_page("a", 1) is not None
+    assert cache.get_page("a", 2) is None
+    assert cache.get_stats()["bytes"] == 60
+
+
+def test_set_page_replaces_page_bytes():
+    cache = DocumentPageCache(max_bytes=100)
+    cache.set_page("a", 1, b"a" * 60)
+    cache.set_page("a", 1, b"a" * 30)
+
+    assert cache.get_stats()["bytes"] == 30
+
+
+def test_evicting_by_document_count_releases_bytes_and_page_counts():
+    cache = DocumentPageCache(max_documents=1)
+    cache.set_page_count("a", 3)
+    cache.set_page("a", 1, b"a" * 10)
+    cache.set_page("b", 1, b"b" * 20)
+
+    assert cache.get_page_count("a") is None
+    assert cache.get_stats()["bytes"] == 20
@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import documents.services.document_page_renderer as document_page_renderer
+from documents.services.document_page_cache import DocumentPageCache
+from documents.services.document_page_renderer import DocumentPageRenderer
+
+
+class ChunkRecorder:
+    """Renders fake page bytes in place of poppler, recording the chunks rendered."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def render_pages(self, document_bytes, first_page, last_page, dpi=200, fmt="png"):
+        self.chunks.append((first_page, last_page))
+        return [f"page-{page_number}".encode() for page_number in range(first_page, last_page + 1)]
+
+    def iter_rendered_pages(self, document_bytes, first_page, last_page, dpi=200, fmt="png"):
+        yield from self.render_pages(document_bytes, first_page, last_page, dpi, fmt)
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = ChunkRecorder()
+    monkeypatch.setattr(document_page_renderer, "render_pages", recorder.render_pages)
+    monkeypatch.setattr(document_page_renderer, "iter_rendered_pages", recorder.iter_rendered_pages)
+    return recorder
+
+
+def create_renderer(max_workers: int, page_count: int) -> DocumentPageRenderer:
+    page_cache = DocumentPageCache()
+    renderer = DocumentPageRenderer(page_cache=page_cache, max_workers=max_workers, pages_per_worker=2)
+    # The page count is cached so that pdfinfo is not called.
+    page_cache.set_page_count("doc:200:png", page_count)
+    return renderer
+
+
+def test_default_renderer_renders_in_calling_thread(recorder):
+    renderer = create_renderer(max_workers=None, page_count=10)
+
+    pages = list(renderer.iter_pages(b"pdf", cache_key="doc"))
+
+    assert renderer.max_workers == 1
+    assert renderer._executor is None
+    assert pages == [f"page-{i}".encode() for i in range(1, 11)]
+
+
+def test_parallel_rendering_yields_pages_in_order(recorder):
+    renderer = create_renderer(max_workers=3, page_count=11)
+    renderer._executor = ThreadPoolExecutor(max_workers=3)
+
+    try:
+        pages = list(renderer.iter_pages(b"pdf", cache_key="doc", page_start=2, page_end=11))
+    finally:
+        renderer.close()
+
+    assert pages == [f"page-{i}".encode() for i in range(2, 12)]
+    assert sorted(recorder.chunks) == [(2, 3), (4, 5), (6, 7), (8, 9), (10, 11)]
+
+
+def test_parallel_rendering_submits_a_bounded_window_of_chunks(recorder):
+    renderer = create_renderer(max_workers=2, page_count=20)
+    renderer._executor = ThreadPoolExecutor(max_workers=2)
+
+    try:
+        pages = renderer.iter_pages(b"pdf", cache_key="doc")
+        assert next(pages) == b"page-1"
+        # The first chunk is consumed and replaced, so only the window of chunks has been submitted.
+        renderer._executor.shutdown(wait=True)
+        assert len(recorder.chunks) == 3
+        pages.close()
+    finally:
+        renderer._executor = None
+
+
+def test_executor_uses_spawned_processes():
+    renderer = DocumentPageRenderer(max_workers=2)
+    try:
+        executor = renderer.__get_executor__()
+        assert executor._mp_context.get_start_method() == "spawn"
+    finally:
+        renderer.close()
@@ -0,0 +1,157 @@
+import logging
+
+import pytest
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError, ServiceRequestError
+from documents.models.document_classification import Classification, ClassificationDefinitions, Classifications
+from documents.services.document_data_classifier import DocumentDataClassifier, DocumentDataClassifierOptions
+from documents.services.document_result_cache import (
+    BlobResultCacheStore, DiskResultCacheStore, DocumentResultCache, MemoryResultCacheStore, ResultCacheStore)
+from shared.clients.deployment_router import OpenAIDeployment
+from shared.confidence.confidence_result import ConfidenceResult
+
+
+def create_result() -> ConfidenceResult:
+    return ConfidenceResult(
+        data=Classifications(page_classifications=[
+            Classification(classification="Invoice", image_range_start=0, image_range_end=1)]),
+        confidence_scores={"_overall": 0.9},
+        overall_confidence=0.9)
+
+
+class FakeBlobClient:
+    def __init__(self, container: "FakeContainerClient", name: str):
+        self.container = container
+        self.name = name
+
+    def download_blob(self):
+        if self.container.error:
+            raise self.container.error
+        if self.name not in self.container.blobs:
+            raise ResourceNotFoundError("The specified blob does not exist.")
+        value = self.container.blobs[self.name]
+        return type("Downloader", (), {"readall": lambda _: value})()
+
+    def upload_blob(self, value: bytes, overwrite: bool = False):
+        if self.container.error:
+            raise self.container.error
+        self.container.blobs[self.name] = value
+
+
+class FakeContainerClient:
+    def __init__(self):
+        self.blobs: dict[str, bytes] = {}
+        self.error = None
+
+    def get_blob_client(self, name: str) -> FakeBlobClient:
+        return FakeBlobClient(self, name)
+
+
+class FakeStorageFactory:
+    def __init__(self):
+        self.container = FakeContainerClient()
+
+    def get_container_client(self, storage_account_name: str, container_name: str) -> FakeContainerClient:
+        return self.container
+
+
+def test_store_is_abstract():
+    with pytest.raises(TypeError):
+        ResultCacheStore()
+
+
+def test_key_depends_on_document_and_inputs():
+    key = DocumentResultCache.create_key(b"document", operation="classify", temperature=0.1)
+
+    assert key == DocumentResultCache.create_key(b"document", temperature=0.1, operation="classify")
+    assert key != DocumentResultCache.create_key(b"other document", operation="classify", temperature=0.1)
+    assert key != DocumentResultCache.create_key(b"document", operation="classify", temperature=0.2)
+
+
+@pytest.mark.parametrize("store_type", ["memory", "disk", "blob"])
+def test_hits_and_misses(store_type, tmp_path):
+    store = {
+        "memory": lambda: MemoryResultCacheStore(),
+        "disk": lambda: DiskResultCacheStore(str(tmp_path)),
+        "blob": lambda: BlobResultCacheStore(FakeStorageFactory(), "account", "cache"),
+    }[store_type]()
+    cache = DocumentResultCache(store)
+    key = DocumentResultCache.create_key(b"document", operation="classify")
+
+    assert cache.get(key) is None
+
+    cache.set(key, create_result(), total_tokens=1200)
+    cached = cache.get(key)
+
+    assert cached == create_result()
+    assert isinstance(cached.data, Classifications)
+    assert cache.get_stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "tokens_saved": 1200}
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryResultCacheStore(max_entries=2)
+    store.set("a", b"1")
+    store.set("b", b"2")
+    store.get("a")
+    store.set("c", b"3")
+
+    assert store.get("a") == b"1"
+    assert store.get("b") is None
+    assert store.get("c") == b"3"
+
+
+@pytest.mark.parametrize("value", [b"not json", b'{"total_tokens": 10}', b'{"result": "{\\"_zlib\\": \\"bm90IHpsaWI=\\"}"}'])
+def test_corrupt_entry_is_a_miss(value, caplog):
+    store = MemoryResultCacheStore()
+    store.set("key", value)
+    cache = DocumentResultCache(store)
+
+    with caplog.at_level(logging.WARNING):
+        assert cache.get("key") is None
+
+    assert cache.get_stats()["misses"] == 1
+    assert "Failed to read cached result key" in caplog.text
+
+
+@pytest.mark.parametrize("error", [ServiceRequestError("Connection refused"), HttpResponseError("Server busy")])
+def test_blob_store_errors_are_misses_and_skipped_writes(error, caplog):
+    storage_factory = FakeStorageFactory()
+    cache = DocumentResultCache(BlobResultCacheStore(storage_factory, "account", "cache"))
+    storage_factory.container.error = error
+
+    with caplog.at_level(logging.WARNING):
+        cache.set("key", create_result())
+        assert cache.get("key") is None
+
+    assert storage_factory.container.blobs == {}
+    assert "Failed to write cached result key" in caplog.text
+    assert "Failed to read cached result key" in caplog.text
+
+
+def create_classifier_options(**kwargs) -> DocumentDataClassifierOptions:
+    return DocumentDataClassifierOptions(
+        classification_definitions=ClassificationDefinitions(classifications=[]),
+        endpoint="https://a.openai.azure.com", deployment_name="gpt-4o", **kwargs)
+
+
+def test_classifier_key_depends_on_deployment_pool():
+    classifier = DocumentDataClassifier(credential=None, result_cache=DocumentResultCache())
+
+    key = classifier.__get_result_cache_key__(b"document", create_classifier_options())
+    pool_key = classifier.__get_result_cache_key__(b"document", create_classifier_options(deployments=[
+        OpenAIDeployment("https://a.openai.azure.com", "gpt-4o"), OpenAIDeployment("https://b.openai.azure.com", "gpt-4o")]))
+    other_endpoint_key = classifier.__get_result_cache_key__(b"document", DocumentDataClassifierOptions(
+        classification_definitions=ClassificationDefinitions(classifications=[]),
+        endpoint="https://b.openai.azure.com", deployment_name="gpt-4o"))
+
+    assert len({key, pool_key, other_endpoint_key}) == 3
+
+
+def test_classifier_key_inputs_are_sent_with_the_request():
+    classifier = DocumentDataClassifier(credential=None, result_cache=DocumentResultCache())
+    options = create_classifier_options(max_tokens=1024, temperature=0.0, top_p=0.5)
+
+    completion_args = classifier.__get_completion_args__(options, [])
+
+    assert (completion_args["max_tokens"], completion_args["temperature"], completion_args["top_p"]) == (1024, 0.0, 0.5)
+    assert classifier.__get_result_cache_key__(b"document", options) != \
+        classifier.__get_result_cache_key__(b"document", create_classifier_options())
@@ -0,0 +1,137 @@
+import json
+import math
+import random
+
+import pytest
+from openai.types.chat.chat_completion import Choice, ChoiceLogprobs
+from openai.types.chat.chat_completion_message import ChatCompletionMessage
+from openai.types.chat.chat_completion_token_logprob import ChatCompletionTokenLogprob
+from shared.confidence.confidence_result import OVERALL_CONFIDENCE_KEY
+from shared.confidence.openai_confidence import evaluate_confidence, find_json_value_spans
+from support.openai_confidence import create_choice, create_invoice, evaluate_confidence_previous
+
+
+@pytest.mark.parametrize("seed, items, max_token_length", [(0, 1, 1), (1, 5, 4), (2, 20, 7), (3, 50, 12)])
+def test_evaluate_confidence_matches_previous_scan(seed, items, max_token_length):
+    rng = random.Random(seed)
+    extract_result = create_invoice(rng, items)
+    choice = create_choice(json.dumps(extract_result), rng, max_token_length)
+
+    assert evaluate_confidence(extract_result, choice) == evaluate_confidence_previous(extract_result, choice)
+
+
+def create_tokens_choice(tokens: list[tuple[str, float]]) -> Choice:
+    return Choice(
+        finish_reason="stop",
+        index=0,
+        message=ChatCompletionMessage(role="assistant", content="".join(token for token, _ in tokens)),
+        logprobs=ChoiceLogprobs(content=[
+            ChatCompletionTokenLogprob(token=token, logprob=math.log(probability), top_logprobs=[])
+            for token, probability in tokens]))
+
+
+def test_evaluate_confidence_scores_value_tokens():
+    # The total spans two tokens, scored by their geometric mean, and the token shared by the currency and the closing quote counts once.
+    choice = create_tokens_choice([
+        ('{"total": ', 0.1), ("12", 0.5), ("34", 0.8), (', "currency": "', 0.1), ("US", 0.9), ('D"}', 0.6)])
+
+    confidence = evaluate_confidence({"total": 1234, "currency": "USD"}, choice)
+
+    assert confidence == {
+        "total": {"confidence": pytest.approx(math.sqrt(0.5 * 0.8)), "value": 1234},
+        "currency": {"confidence": pytest.approx(math.sqrt(0.9 * 0.6)), "value": "USD"},
+        OVERALL_CONFIDENCE_KEY: pytest.approx((math.sqrt(0.5 * 0.8) + math.sqrt(0.9 * 0.6)) / 2),
+    }
+
+
+def test_evaluate_confidence_without_logprobs():
+    choice = Choice(
+        finish_reason="stop",
+        index=0,
+        message=ChatCompletionMessage(role="assistant", content='{"total": 1}'),
+        logprobs=None)
+
+    assert evaluate_confidence({"total": 1}, choice) == {OVERALL_CONFIDENCE_KEY: 0.0}
+
+
+def create_value(rng: random.Random, depth: int = 0):
+    kind = rng.choice(["object", "list"] if depth == 0 else ["object", "list", "scalar", "scalar", "scalar"] if depth < 3 else ["scalar"])
+    if kind == "object":
+        return {rng.choice(["a", "b", "c\"d", "é", "e f", "g\\h"]) + str(i): create_value(rng, depth + 1) for i in range(rng.randint(0, 4))}
+    if kind == "list":
+        return [create_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return rng.choice([0, 0, -1, 1.5, 1e-07, True, False, None, "", "0", "null", "text", "quote \" here", "back\\slash", "new\nline", "naïve €", "😀"])
+
+
+def get_leaves(value, path=()):
+    if isinstance(value, dict):
+        for key, val in value.items():
+            yield from get_leaves(val, path + (key,))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from get_leaves(item, path + (index,))
+    else:
+        yield path, value
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("dumps_args", [{}, {"indent": 2}, {"ensure_ascii": False}, {"separators": (",", ":")}])
+def test_find_json_value_spans_maps_every_leaf_to_its_text(seed, dumps_args):
+    value = create_value(random.Random(seed))
+    text = json.dumps(value, **dumps_args)
+
+    spans = find_json_value_spans(text)
+
+    leaves = dict(get_leaves(value))
+    assert spans.keys() == leaves.keys()
+    for path, leaf in leaves.items():
+        start, end = spans[path]
+        if isinstance(leaf, str):
+            assert json.loads(f'"{text[start:end]}"') == leaf
+        else:
+            assert json.loads(text[start:end]) == leaf
+
+
+@pytest.mark.parametrize("text", ['{"a": 1', '{"a": 1}}', '{"a" 1}', '{"a": tru}', '{"a": "x}', '[1, 2,]', ''])
+def test_find_json_value_spans_rejects_invalid_json(text):
+    with pytest.raises(ValueError):
+        find_json_value_spans(text)
+
+
+def test_evaluate_confidence_attributes_repeated_values_to_their_own_fields():
+    # The previous search by string found the 0 of the tax in its key, and never found null or booleans, whose str() differs from their JSON.
+    extract_result = {"discount": 0, "tax_2020": 0, "due_date": None, "paid": True}
+    content = json.dumps(extract_result)
+    probabilities = {"0": [0.5, 0.9], "null": [0.7], "true": [0.8]}
+
+    # One token per value, and one token for the text between values.
+    token_logprobs = []
+    position = 0
+    for path, value in get_leaves(extract_result):
+        value_text = json.dumps(value)
+        value_start = content.index(f": {value_text}", position) + 2
+        token_logprobs.append(ChatCompletionTokenLogprob(token=content[position:value_start], logprob=0.0, top_logprobs=[]))
+        token_logprobs.append(ChatCompletionTokenLogprob(
+            token=value_text, logprob=math.log(probabilities[value_text].pop(0)), top_logprobs=[]))
+        position = value_start + len(value_text)
+    token_logprobs.append(ChatCompletionTokenLogprob(token=content[position:], logprob=0.0, top_logprobs=[]))
+
+    choice = Choice(
+        finish_reason="stop",
+        index=0,
+        message=ChatCompletionMessage(role="assistant", content=content),
+        logprobs=ChoiceLogprobs(content=token_logprobs))
+
+    confidence = evaluate_confidence(extract_result, choice)
+
+    assert confidence["discount"]["confidence"] == pytest.approx(0.5)
+    assert confidence["tax_2020"]["confidence"] == pytest.approx(0.9)
+    assert confidence["due_date"]["confidence"] == pytest.approx(0.7)
+    assert confidence["paid"]["confidence"] == pytest.approx(0.8)
+
+
+def test_evaluate_confidence_scores_invalid_json_as_zero():
+    rng = random.Random(0)
+    choice = create_choice('{"total": 1', rng)
+
+    assert evaluate_confidence({"total": 1}, choice) == {"total": {"confidence": 0.0, "value": 1}, OVERALL_CONFIDENCE_KEY: 0.0}
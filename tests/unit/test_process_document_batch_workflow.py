@@ -0,0 +1,146 @@
+from documents.activities import get_document_folders
+from documents.models.document_batch_request import DocumentBatchRequest, DocumentBatchSummary, MAX_FAILED_FOLDER_NAMES
+from documents.models.document_folder import DocumentFolder, DocumentFolders
+from documents.workflows import process_document_batch_workflow, process_document_workflow
+from shared.workflows.workflow_result import WorkflowResult
+
+orchestrator = process_document_batch_workflow.run._function._func.__closure__[0].cell_contents
+
+
+class FakeTask:
+    def __init__(self, result):
+        self.result = result
+
+
+class FakeContext:
+    """Completes activities and sub-orchestrations immediately, recording what the orchestrator scheduled."""
+
+    def __init__(self, input: DocumentBatchRequest, folders: DocumentFolders, folder_results: dict[str, WorkflowResult]):
+        self.input = input
+        self.folders = folders
+        self.folder_results = folder_results
+        self.activity_inputs = []
+        self.started_folders = []
+        self.max_in_flight = 0
+        self.continued_with = None
+
+    def get_input(self):
+        return self.input
+
+    def call_activity(self, name, input):
+        assert name == get_document_folders.name
+        self.activity_inputs.append(input)
+        return FakeTask(self.folders)
+
+    def call_sub_orchestrator(self, name, folder: DocumentFolder):
+        assert name == process_document_workflow.name
+        self.started_folders.append(folder.name)
+        return FakeTask(self.folder_results[folder.name].model_dump())
+
+    def task_all(self, tasks):
+        self.max_in_flight = max(self.max_in_flight, len(tasks))
+        return ("all", tasks)
+
+    def task_any(self, tasks):
+        self.max_in_flight = max(self.max_in_flight, len(tasks))
+        return ("any", tasks)
+
+    def continue_as_new(self, input):
+        self.continued_with = input
+
+
+def run_orchestrator(context: FakeContext):
+    generator = orchestrator(context)
+    sent = None
+    try:
+        while True:
+            yielded = generator.send(sent)
+            if isinstance(yielded, FakeTask):
+                sent = yielded.result
+            elif yielded[0] == "all":
+                sent = [task.result for task in yielded[1]]
+            else:
+                sent = yielded[1][0]
+    except StopIteration as stop:
+        return stop.value
+
+
+def create_folders(count: int, continuation_token=None) -> DocumentFolders:
+    return DocumentFolders(
+        folders=[
+            DocumentFolder(container_name="invoices", name=f"folder-{i}", document_file_names=[f"folder-{i}/invoice.pdf"])
+            for i in range(count)
+        ],
+        continuation_token=continuation_token)
+
+
+def create_folder_results(folders: DocumentFolders, failed: set[str] = frozenset()) -> dict[str, WorkflowResult]:
+    results = {}
+    for folder in folders.folders:
+        result = WorkflowResult(name=process_document_workflow.name)
+        if folder.name in failed:
+            result.add_error("ExtractInvoice", "Failed to extract the invoice.")
+        results[folder.name] = result
+    return results
+
+
+def test_continues_with_continuation_token_of_next_page():
+    folders = create_folders(5, continuation_token="page-2")
+    request = DocumentBatchRequest(container_name="invoices", max_concurrent_folders=2, continuation_token="page-1")
+    context = FakeContext(request, folders, create_folder_results(folders))
+
+    run_orchestrator(context)
+
+    assert context.activity_inputs[0].continuation_token == "page-1"
+    assert context.started_folders == [f"folder-{i}" for i in range(5)]
+    assert context.max_in_flight == 2
+    assert context.continued_with.continuation_token == "page-2"
+    assert context.continued_with.container_name == "invoices"
+
+
+def test_last_page_does_not_continue():
+    folders = create_folders(3)
+    context = FakeContext(DocumentBatchRequest(container_name="invoices"), folders, create_folder_results(folders))
+
+    result = run_orchestrator(context)
+
+    assert context.continued_with is None
+    assert len(result["activity_results"]) == 3
+
+
+def test_summary_is_carried_across_continue_as_new():
+    folders = create_folders(4, continuation_token="page-3")
+    summary = DocumentBatchSummary(processed_folders=10, failed_folders=1, failed_folder_names=["earlier-folder"])
+    request = DocumentBatchRequest(container_name="invoices", continuation_token="page-2", summary=summary)
+    context = FakeContext(request, folders, create_folder_results(folders, failed={"folder-1", "folder-3"}))
+
+    run_orchestrator(context)
+
+    assert context.continued_with.summary == DocumentBatchSummary(
+        processed_folders=14, failed_folders=3, failed_folder_names=["earlier-folder", "folder-1", "folder-3"])
+    # The summary of the previous instances is not modified.
+    assert summary.processed_folders == 10
+
+
+def test_last_page_reports_summary_of_all_pages():
+    folders = create_folders(2)
+    summary = DocumentBatchSummary(processed_folders=100, failed_folders=1, failed_folder_names=["earlier-folder"])
+    request = DocumentBatchRequest(container_name="invoices", summary=summary)
+    context = FakeContext(request, folders, create_folder_results(folders, failed={"folder-0"}))
+
+    result = run_orchestrator(context)
+
+    assert any(message.endswith("Processed 102 folders, 2 with errors. Failed folders: earlier-folder, folder-0.")
+               for message in result["messages"])
+
+
+def test_summary_caps_failed_folder_names():
+    summary = DocumentBatchSummary()
+    failed = WorkflowResult(name=process_document_workflow.name, is_valid=False)
+
+    for i in range(MAX_FAILED_FOLDER_NAMES + 5):
+        summary.add_folder_result(f"folder-{i}", failed)
+
+    assert summary.failed_folders == MAX_FAILED_FOLDER_NAMES + 5
+    assert len(summary.failed_folder_names) == MAX_FAILED_FOLDER_NAMES
+    assert summary.to_str().endswith("and 5 more.")
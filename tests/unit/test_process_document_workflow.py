@@ -0,0 +1,104 @@
+import pytest
+from documents.activities import classify_document
+from documents.models.document_classification import Classification
+from documents.models.document_folder import DocumentFolder, SOURCE_ETAG_METADATA_KEY
+from documents.workflows import process_document_workflow
+from invoices.activities import extract_invoice, validate_invoice
+from shared.workflows.workflow_result import WorkflowResult
+from storage.activities import set_blob_metadata
+
+orchestrator = process_document_workflow.run._function._func.__closure__[0].cell_contents
+
+CONFIDENT = 0.95
+UNCERTAIN = 0.5
+
+
+@pytest.fixture(autouse=True)
+def storage_account(monkeypatch):
+    # The app settings are not configured offline.
+    monkeypatch.setattr(process_document_workflow.app_settings, "azure_storage_account", "account")
+
+
+class FakeTask:
+    def __init__(self, result):
+        self.result = result
+
+
+class FakeContext:
+    """Completes activities immediately with the configured confidence of each document, recording the stamped documents."""
+
+    def __init__(self, folder: DocumentFolder, classification_confidence: dict[str, float], extraction_confidence: dict[str, float]):
+        self.folder = folder
+        self.classification_confidence = classification_confidence
+        self.extraction_confidence = extraction_confidence
+        self.stamped_blobs = []
+
+    def get_input(self):
+        return self.folder
+
+    def call_activity(self, name, input):
+        if name == classify_document.name:
+            return FakeTask(classify_document.Result(
+                blob_name=input.output_blob_name,
+                overall_confidence=self.classification_confidence[input.blob_name],
+                page_classifications=[Classification(classification="Invoice", image_range_start=0, image_range_end=1)]))
+
+        if name == extract_invoice.name:
+            return FakeTask(extract_invoice.Result(
+                blob_name=input.output_blob_name,
+                overall_confidence=self.extraction_confidence[input.blob_name]))
+
+        if name == validate_invoice.name:
+            return FakeTask(WorkflowResult(name=input.name))
+
+        assert name == set_blob_metadata.name
+        assert input.metadata == {SOURCE_ETAG_METADATA_KEY: f"etag-{input.blob_name.split('.')[0]}"}
+        self.stamped_blobs.append(input.blob_name)
+        return FakeTask(True)
+
+    def task_all(self, tasks):
+        return [task.result for task in tasks]
+
+
+def run_orchestrator(context: FakeContext):
+    generator = orchestrator(context)
+    sent = None
+    try:
+        while True:
+            sent = generator.send(sent)
+    except StopIteration as stop:
+        return stop.value
+
+
+def create_folder(*documents: str) -> DocumentFolder:
+    return DocumentFolder(
+        container_name="invoices",
+        name="folder",
+        document_file_names=list(documents),
+        document_etags={document: f"etag-{document.split('.')[0]}" for document in documents})
+
+
+def test_stamps_only_documents_with_confident_outputs():
+    folder = create_folder("confident.pdf", "uncertain-classification.pdf", "uncertain-extraction.pdf")
+    context = FakeContext(
+        folder,
+        classification_confidence={"confident.pdf": CONFIDENT, "uncertain-classification.pdf": UNCERTAIN, "uncertain-extraction.pdf": CONFIDENT},
+        extraction_confidence={"confident.pdf": CONFIDENT, "uncertain-extraction.pdf": UNCERTAIN})
+
+    result = run_orchestrator(context)
+
+    assert context.stamped_blobs == ["confident.pdf.Classification.json"]
+    assert not result["is_valid"]
+
+
+def test_stamps_all_documents_when_confident():
+    folder = create_folder("a.pdf", "b.pdf")
+    context = FakeContext(
+        folder,
+        classification_confidence={"a.pdf": CONFIDENT, "b.pdf": CONFIDENT},
+        extraction_confidence={"a.pdf": CONFIDENT, "b.pdf": CONFIDENT})
+
+    result = run_orchestrator(context)
+
+    assert context.stamped_blobs == ["a.pdf.Classification.json", "b.pdf.Classification.json"]
+    assert result["is_valid"]
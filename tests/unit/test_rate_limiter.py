@@ -0,0 +1,143 @@
+import time
+
+import httpx
+import pytest
+from openai import APIConnectionError, BadRequestError, RateLimitError
+from shared.clients.rate_limiter import RateLimiter, RateLimitOptions, TokenBucket, get_retry_after, is_retryable_error
+
+
+def create_error(error_type: type, status_code: int, headers: dict = None) -> Exception:
+    request = httpx.Request("POST", "https://example.openai.azure.com/openai/deployments/gpt-4o/chat/completions")
+    response = httpx.Response(status_code, headers=headers or {}, request=request)
+    return error_type("Simulated failure", response=response, body=None)
+
+
+def test_token_bucket_serves_reservations_from_capacity_then_refill_rate():
+    bucket = TokenBucket(rate_per_minute=600, burst_seconds=1)
+    now = bucket._updated_at
+
+    assert bucket.capacity == 10
+    assert bucket.reserve(10, now) == 0.0
+    # The bucket is overdrawn, so the next reservation waits for its capacity to refill at 10 per second.
+    assert bucket.reserve(5, now) == pytest.approx(0.5)
+    assert bucket.reserve(5, now) == pytest.approx(1.0)
+    assert bucket.reserve(5, now + 1.5) == pytest.approx(0.0)
+
+
+def test_token_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(rate_per_minute=600, burst_seconds=1)
+    now = bucket._updated_at
+
+    bucket.reserve(10, now)
+
+    assert bucket.get_delay(10, now + 0.5) == pytest.approx(0.5)
+    assert bucket.get_delay(10, now + 60) == 0.0
+    assert bucket.get_delay(11, now + 60) == pytest.approx(0.1)
+
+
+def test_token_bucket_reserves_requests_larger_than_capacity_in_full():
+    bucket = TokenBucket(rate_per_minute=600, burst_seconds=1)
+    now = bucket._updated_at
+
+    # A reservation of 3 times the capacity waits for the 20 tokens beyond the capacity to refill.
+    assert bucket.get_delay(30, now) == pytest.approx(2.0)
+    assert bucket.reserve(30, now) == pytest.approx(2.0)
+    # The next reservation queues behind the full amount, rather than behind the capacity.
+    assert bucket.reserve(1, now) == pytest.approx(2.1)
+
+
+def test_token_bucket_get_delay_does_not_reserve():
+    bucket = TokenBucket(rate_per_minute=600, burst_seconds=1)
+    now = bucket._updated_at
+
+    assert bucket.get_delay(10, now) == 0.0
+    assert bucket.get_delay(10, now) == 0.0
+    assert bucket.level == 10
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "250"}, 0.25),
+    ({"Retry-After": "3"}, 3.0),
+    ({"Retry-After": "3", "retry-after-ms": "500"}, 0.5),
+    ({"Retry-After": "invalid"}, None),
+    ({}, None),
+])
+def test_get_retry_after_from_error(headers, expected):
+    assert get_retry_after(create_error(RateLimitError, 429, headers)) == expected
+
+
+def test_get_retry_after_without_response():
+    error = APIConnectionError(request=httpx.Request("POST", "https://example.openai.azure.com"))
+
+    assert get_retry_after(error) is None
+    assert is_retryable_error(error)
+
+
+def test_is_retryable_error():
+    assert is_retryable_error(create_error(RateLimitError, 429))
+    assert not is_retryable_error(create_error(BadRequestError, 400))
+
+
+def test_call_retries_throttled_request_and_pauses_deployment():
+    rate_limiter = RateLimiter()
+    options = RateLimitOptions(max_retries=2, jitter=0)
+    errors = [create_error(RateLimitError, 429, {"retry-after-ms": "50"})]
+
+    def request():
+        if errors:
+            raise errors.pop()
+        return "response"
+
+    started_at = time.monotonic()
+    assert rate_limiter.call(("endpoint", "deployment"), options, request, 100, lambda response: 80) == "response"
+
+    assert time.monotonic() - started_at >= 0.05
+    stats = rate_limiter.get_stats()
+    assert stats["deployments"] == 1
+    assert stats["requests"] == 2
+    assert stats["throttled_requests"] == 1
+    assert stats["retries"] == 1
+    assert stats["used_tokens_per_request"] == 40
+
+
+def test_call_raises_after_max_retries():
+    rate_limiter = RateLimiter()
+    options = RateLimitOptions(max_retries=1, jitter=0)
+    attempts = []
+
+    def request():
+        attempts.append(1)
+        raise create_error(RateLimitError, 429, {"retry-after-ms": "10"})
+
+    with pytest.raises(RateLimitError):
+        rate_limiter.call(("endpoint", "deployment"), options, request, 100)
+
+    assert len(attempts) == 2
+    assert rate_limiter.get_stats()["retries"] == 1
+
+
+def test_call_does_not_retry_non_retryable_error():
+    rate_limiter = RateLimiter()
+    attempts = []
+
+    def request():
+        attempts.append(1)
+        raise create_error(BadRequestError, 400)
+
+    with pytest.raises(BadRequestError):
+        rate_limiter.call(("endpoint", "deployment"), RateLimitOptions(), request, 100)
+
+    assert len(attempts) == 1
+    assert rate_limiter.get_stats()["retries"] == 0
+
+
+def test_get_wait_reflects_reserved_tokens():
+    rate_limiter = RateLimiter()
+    options = RateLimitOptions(tokens_per_minute=6000, burst_seconds=1)
+    key = ("endpoint", "deployment")
+
+    assert rate_limiter.get_wait(key, 100) == 0.0
+    rate_limiter.call(key, options, lambda: "response", 100)
+
+    # The bucket holds 100 tokens and refills 100 per second.
+    assert 0.5 < rate_limiter.get_wait(key, 100) <= 1.0